@@ -1,14 +1,22 @@
 from flask import Flask
 from flask_restx import Api
-from flask_bcrypt import Bcrypt
-from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from app.cache import FragmentCache, ResponseCache
+from app.jwt_claims import CachingJWTManager
+from app.metrics import Metrics
+from app.password_hasher import PasswordHasher
+from app.query_budget import QueryBudget
 import config
 
-bcrypt = Bcrypt()
-jwt = JWTManager()
+password_hasher = PasswordHasher()
+jwt = CachingJWTManager()
 db = SQLAlchemy()
+response_cache = ResponseCache()
+fragment_cache = FragmentCache()
+metrics = Metrics()
+query_checker = QueryBudget()
+metrics.add_collector(jwt.collect_metrics)
 
 from app.api.v1.users import api as users_ns
 from app.api.v1.amenities import api as amenities_ns
@@ -16,6 +24,12 @@ from app.api.v1.places import api as places_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.auth import api as auth_ns
 from app.api.v1.protected import api as protected_ns
+from app.api.v1.cache import api as cache_ns
+from app.api.v1.batch import api as batch_ns
+from app.api.v1.export import api as export_ns
+from app.api.v1.changes import api as changes_ns
+from app.commands import register_commands
+from app.services.amenity_index import init_amenity_index
 
 def create_app(config_class=config.DevelopmentConfig):
     # Création de l'application
@@ -41,9 +55,13 @@ def create_app(config_class=config.DevelopmentConfig):
     })
 
     # Initialisation des extensions
-    bcrypt.init_app(app)
+    password_hasher.init_app(app)
     jwt.init_app(app)
     db.init_app(app)
+    response_cache.init_app(app)
+    fragment_cache.init_app(app)
+    metrics.init_app(app)
+    query_checker.init_app(app)
     
     # Configuration de l'API
     authorizations = {
@@ -65,5 +83,15 @@ def create_app(config_class=config.DevelopmentConfig):
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
     api.add_namespace(auth_ns, path='/api/v1/auth')
     api.add_namespace(protected_ns, path='/api/v1/protected')
+    api.add_namespace(cache_ns, path='/api/v1/cache')
+    api.add_namespace(batch_ns, path='/api/v1/batch')
+    api.add_namespace(export_ns, path='/api/v1/export')
+    api.add_namespace(changes_ns, path='/api/v1/changes')
+
+    # Commandes de maintenance (flask --app run ...)
+    register_commands(app)
+
+    # Index des équipements chargé au démarrage plutôt qu'à la première recherche
+    init_amenity_index(app)
 
     return app
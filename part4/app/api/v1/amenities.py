@@ -1,6 +1,12 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import fragment_cache, response_cache
 from app.services import facade
+from app.query_budget import query_budget
+from app.api.v1.pagination import by_ids_json, collection_parser, paginated_json, parse_ids
+from app.cache import json_response
+from app.api.v1.bulk import bulk_items, bulk_response
+from app.api.v1.conditional import collection_validators, entity_validators, is_not_modified, not_modified
 
 
 api = Namespace('amenities', description='Amenity operations')
@@ -24,7 +30,6 @@ class AmenityList(Resource):
         if not current_user:
             return {'error': 'Unauthorized'}, 401
         is_admin = get_jwt()['is_admin']
-        print(current_user, is_admin)
         if not is_admin:
             return {'error': 'Forbidden'}, 403
         """Register a new amenity"""
@@ -39,23 +44,66 @@ class AmenityList(Resource):
         except Exception as e:
             return {'error': str(e).strip("'")}, 400
 
+    @api.expect(collection_parser)
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(400, 'Invalid input data')
+    @query_budget(2)
+    @response_cache.cached('amenities')
     def get(self):
-        """Retrieve a list of all amenities"""
-        amenities = facade.get_all_amenities()
-        return [amenity.to_dict() for amenity in amenities], 200
+        """Retrieve a page of amenities, or the amenities listed by ?ids="""
+        args = collection_parser.parse_args()
+        headers = collection_validators(facade.get_amenities_version())
+        if is_not_modified(headers):
+            return not_modified(headers)
+        try:
+            if args['ids'] is not None:
+                amenities, missing = facade.get_amenities_by_ids(parse_ids(args['ids']))
+            else:
+                amenities, next_cursor = facade.get_all_amenities(args['limit'], args['cursor'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        response_cache.tag(*(f'amenity:{amenity.id}' for amenity in amenities))
+        if args['ids'] is not None:
+            return json_response(by_ids_json(fragment_cache.encode_all(amenities), missing), headers)
+        return json_response(paginated_json(fragment_cache.encode_all(amenities), next_cursor), headers)
+
 
+@api.route('/bulk')
+class AmenityBulk(Resource):
+    @api.expect([amenity_model])
+    @api.response(201, 'All amenities created')
+    @api.response(207, 'Some amenities created, see the per-item results')
+    @api.response(400, 'Invalid input data')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @api.doc(security='apikey')
+    @jwt_required()
+    def post(self):
+        """Register a batch of amenities (admin only)"""
+        if not get_jwt()['is_admin']:
+            return {'error': 'Forbidden'}, 403
+        try:
+            results = facade.create_amenities(bulk_items(api.payload))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return bulk_response(results)
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
     @api.response(404, 'Amenity not found')
+    @query_budget(1)
+    @response_cache.cached()
     def get(self, amenity_id):
         """Get amenity details by ID"""
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
-        return amenity.to_dict(), 200
+        headers = entity_validators(amenity)
+        if is_not_modified(headers):
+            return not_modified(headers)
+        response_cache.tag(f'amenity:{amenity.id}')
+        return amenity.to_dict(), 200, headers
 
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
@@ -1,5 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
+from app import jwt
+from app.password_hasher import PasswordHasherBusy
 from app.services import facade
 
 api = Namespace('auth', description='Authentication operations')
@@ -13,6 +15,7 @@ login_model = api.model('Login', {
 @api.route('/login')
 class Login(Resource):
 	@api.expect(login_model)
+	@api.response(503, 'Password hashing saturated, retry later')
 	def post(self):
 		"""Authenticate user and return a JWT token"""
 		credentials = api.payload  # Get the email and password from the request payload
@@ -21,8 +24,20 @@ class Login(Resource):
 		user = facade.get_user_by_email(credentials['email'])
 		
 		# Step 2: Check if the user exists and the password is correct
-		if not user or not user.verify_password(credentials['password']):
-			return {'error': 'Invalid credentials'}, 401
+		try:
+			if not user or not user.verify_password(credentials['password']):
+				return {'error': 'Invalid credentials'}, 401
+		except PasswordHasherBusy as e:
+			return {'error': str(e)}, 503, {'Retry-After': '1'}
+
+		# Le coût bcrypt configuré a changé : on rehache avec le mot de passe en clair
+		# (reporté à la prochaine connexion si le pool est saturé)
+		if user.password_needs_rehash():
+			try:
+				facade.update_user(user.id, {'password': credentials['password']})
+			except PasswordHasherBusy:
+				pass
+
 		try:
 			# Step 3: Create a JWT token with the user's id and is_admin flag
 			access_token = create_access_token(identity=user.id, additional_claims={'is_admin': user.is_admin})
@@ -31,3 +46,15 @@ class Login(Resource):
 
 		# Step 4: Return the JWT token to the client
 		return {'access_token': access_token}, 200
+
+
+@api.route('/logout')
+class Logout(Resource):
+	@api.doc(security='apikey')
+	@api.response(200, 'Token revoked')
+	@api.response(401, 'Unauthorized')
+	@jwt_required()
+	def post(self):
+		"""Revoke the JWT token used for this request"""
+		jwt.revoke(get_jwt())
+		return {'message': 'Successfully logged out'}, 200
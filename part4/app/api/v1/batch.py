@@ -0,0 +1,92 @@
+from flask import current_app, request
+from flask_restx import Namespace, Resource, fields
+from flask_jwt_extended import jwt_required
+from app.persistence.unit_of_work import transaction
+
+api = Namespace('batch', description='Several API calls in one request')
+
+# Requêtes groupées : chaque sous-requête est traitée dans le processus,
+# avec le jeton de l'appelant. atomic=true : une seule transaction, annulée
+# dès qu'une sous-requête échoue (les callbacks after_commit sont abandonnés).
+MAX_BATCH_REQUESTS = 50
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+sub_request_model = api.model('BatchRequest', {
+    'method': fields.String(required=True, description='GET, POST, PUT or DELETE'),
+    'path': fields.String(required=True, description='API path, e.g. /api/v1/places/'),
+    'body': fields.Raw(description='JSON body of the request')
+})
+
+batch_model = api.model('Batch', {
+    'atomic': fields.Boolean(default=False, description='Run every request in one transaction'),
+    'requests': fields.List(fields.Nested(sub_request_model), required=True,
+                            description=f'Requests to run in order (max {MAX_BATCH_REQUESTS})')
+})
+
+
+class BatchFailed(Exception):
+    """Raised to roll back an atomic batch after a failed request"""
+
+
+def check_sub_request(item):
+    """Return (method, path, body) of one request of the batch"""
+    if not isinstance(item, dict):
+        raise ValueError("Each request must be an object")
+    method = str(item.get('method', 'GET')).upper()
+    path = item.get('path')
+    if method not in BATCH_METHODS:
+        raise ValueError(f"method must be one of: {', '.join(BATCH_METHODS)}")
+    if not isinstance(path, str) or not path.startswith('/api/v1/') or path.startswith('/api/v1/batch'):
+        raise ValueError("path must be an API path other than /api/v1/batch")
+    return method, path, item.get('body')
+
+
+def dispatch(method, path, body):
+    """Run one request in-process with the caller's credentials"""
+    headers = {}
+    if 'Authorization' in request.headers:
+        headers['Authorization'] = request.headers['Authorization']
+    app = current_app._get_current_object()
+    kwargs = {'json': body} if body is not None else {}
+    # Même contexte d'application : même session, donc même unité de travail
+    with app.test_request_context(path, method=method, headers=headers, **kwargs):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            return {'status': 500, 'body': {'error': str(e)}}
+    return {'status': response.status_code, 'body': response.get_json(silent=True)}
+
+
+@api.route('/')
+class Batch(Resource):
+    @api.expect(batch_model)
+    @api.response(200, 'Every request was run, see the per-request responses')
+    @api.response(400, 'Invalid batch, or an atomic batch rolled back')
+    @api.doc(security='apikey')
+    @jwt_required(optional=True)
+    def post(self):
+        """Run several API requests in order, optionally in one transaction"""
+        payload = api.payload or {}
+        items = payload.get('requests')
+        if not isinstance(items, list) or not items:
+            return {'error': 'requests must be a non-empty list'}, 400
+        if len(items) > MAX_BATCH_REQUESTS:
+            return {'error': f'A batch accepts at most {MAX_BATCH_REQUESTS} requests'}, 400
+        try:
+            requests = [check_sub_request(item) for item in items]
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        if not payload.get('atomic'):
+            return {'atomic': False, 'responses': [dispatch(*sub_request) for sub_request in requests]}, 200
+
+        responses = []
+        try:
+            with transaction():
+                for sub_request in requests:
+                    responses.append(dispatch(*sub_request))
+                    if responses[-1]['status'] >= 400:
+                        raise BatchFailed()
+        except BatchFailed:
+            return {'atomic': True, 'committed': False, 'responses': responses}, 400
+        return {'atomic': True, 'committed': True, 'responses': responses}, 200
@@ -0,0 +1,19 @@
+# Créations en lot (POST .../bulk) : le corps est une liste d'éléments,
+# la réponse donne un résultat par élément, dans l'ordre reçu.
+MAX_BULK_ITEMS = 1000
+
+
+def bulk_items(payload):
+    """Check the body of a bulk request and return its list of items"""
+    if not isinstance(payload, list) or not payload:
+        raise ValueError("Expected a non-empty list of items")
+    if len(payload) > MAX_BULK_ITEMS:
+        raise ValueError(f"A bulk request accepts at most {MAX_BULK_ITEMS} items")
+    return payload
+
+
+def bulk_response(results):
+    """201 when every item was created, 400 when none was, 207 otherwise"""
+    created = sum('id' in result for result in results)
+    status = 201 if created == len(results) else 400 if not created else 207
+    return {'created': created, 'failed': len(results) - created, 'results': results}, status
@@ -0,0 +1,18 @@
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from app import fragment_cache, response_cache
+
+api = Namespace('cache', description='Response cache operations')
+
+@api.route('/stats')
+class CacheStats(Resource):
+    @api.response(200, 'Response cache counters')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @api.doc(security='apikey')
+    @jwt_required()
+    def get(self):
+        """Hit, miss and eviction counters of the response and fragment caches"""
+        if not get_jwt()['is_admin']:
+            return {'error': 'Forbidden'}, 403
+        return {**response_cache.stats(), 'fragments': fragment_cache.stats()}, 200
@@ -0,0 +1,37 @@
+from flask_restx import Namespace, Resource, reqparse
+from flask_jwt_extended import jwt_required, get_jwt
+from app.services import facade
+from app.persistence.repository import MAX_PAGE_SIZE
+
+api = Namespace('changes', description='Change feed (admin only)')
+
+# Flux des modifications : relire avec ?since=<next_since> jusqu'à has_more=false
+changes_parser = reqparse.RequestParser()
+changes_parser.add_argument('since', type=int, default=0, location='args',
+                            help='Return the changes with a seq greater than this one')
+changes_parser.add_argument('limit', type=int, location='args', help=f'Page size (max {MAX_PAGE_SIZE})')
+
+
+@api.route('/')
+class ChangeList(Resource):
+    @api.expect(changes_parser)
+    @api.response(200, 'Changes retrieved successfully')
+    @api.response(400, 'Invalid input data')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @api.doc(security='apikey')
+    @jwt_required()
+    def get(self):
+        """Retrieve the created, updated and deleted entities after a seq"""
+        if not get_jwt()['is_admin']:
+            return {'error': 'Forbidden'}, 403
+        args = changes_parser.parse_args()
+        try:
+            changes, has_more = facade.get_changes(args['since'], args['limit'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return {
+            'items': [change.to_dict() for change in changes],
+            'next_since': changes[-1].seq if changes else args['since'],
+            'has_more': has_more
+        }, 200
@@ -0,0 +1,49 @@
+from datetime import timezone
+from hashlib import sha1
+from email.utils import format_datetime, parsedate_to_datetime
+from flask import Response, request
+
+# Requêtes conditionnelles : ETag / If-None-Match et Last-Modified /
+# If-Modified-Since. Les validateurs sont calculés avant toute
+# sérialisation pour pouvoir répondre 304 sans construire le corps.
+
+
+def _validators(key, last_modified):
+    headers = {'ETag': f'"{sha1(key.encode("utf-8")).hexdigest()}"', 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        # updated_at est une heure locale naïve (datetime.now)
+        headers['Last-Modified'] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def entity_validators(obj):
+    """Validators of a single resource, from (id, updated_at)"""
+    updated_at = obj.updated_at.isoformat() if obj.updated_at else ''
+    return _validators(f'{type(obj).__name__}:{obj.id}:{updated_at}', obj.updated_at)
+
+
+def collection_validators(versions):
+    """Validators of a collection, from the (max updated_at, count) of its tables
+
+    The request path and query string are part of the key: every page and
+    every filter combination has its own ETag. No Last-Modified: a deletion
+    lowers the count but leaves max(updated_at) unchanged, so only the ETag
+    can tell that the collection changed.
+    """
+    key = request.full_path + '|' + '|'.join(
+        f'{updated_at.isoformat() if updated_at else ""}:{count}' for updated_at, count in versions)
+    return _validators(key, None)
+
+
+def is_not_modified(headers):
+    """True when the client copy matching these validators is still fresh"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(headers['ETag'].strip('"'))
+    if request.if_modified_since and 'Last-Modified' in headers:
+        return parsedate_to_datetime(headers['Last-Modified']) <= request.if_modified_since
+    return False
+
+
+def not_modified(headers):
+    """Empty 304 response carrying the validators"""
+    return Response(status=304, headers=headers)
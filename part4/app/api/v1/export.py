@@ -0,0 +1,45 @@
+from datetime import datetime
+import json
+from flask import Response, stream_with_context
+from flask_restx import Namespace, Resource, reqparse
+from flask_jwt_extended import jwt_required, get_jwt
+from app.services import facade
+
+api = Namespace('export', description='Streaming exports (admin only)')
+
+# Export NDJSON : une ligne JSON par entité, envoyée au fil de la lecture.
+# Reprendre un export : ?since= = plus grand updated_at déjà reçu.
+export_parser = reqparse.RequestParser()
+export_parser.add_argument('since', type=str, location='args',
+                           help='ISO 8601 date: only the rows updated at or after it')
+
+
+@api.route('/<string:entity>.ndjson')
+@api.param('entity', 'users, places, amenities or reviews')
+class Export(Resource):
+    @api.expect(export_parser)
+    @api.response(200, 'One JSON object per line, ordered by updated_at')
+    @api.response(400, 'Invalid input data')
+    @api.response(401, 'Unauthorized')
+    @api.response(403, 'Forbidden')
+    @api.response(404, 'Unknown entity')
+    @api.doc(security='apikey')
+    @jwt_required()
+    def get(self, entity):
+        """Stream every row of an entity as NDJSON"""
+        if not get_jwt()['is_admin']:
+            return {'error': 'Forbidden'}, 403
+        since = export_parser.parse_args()['since']
+        try:
+            since = datetime.fromisoformat(since) if since else None
+        except ValueError:
+            return {'error': 'since must be an ISO 8601 date'}, 400
+        if since is not None and since.tzinfo is not None:
+            # updated_at est une heure locale naïve (datetime.now)
+            since = since.astimezone().replace(tzinfo=None)
+        try:
+            rows = facade.export(entity, since)
+        except KeyError as e:
+            return {'error': str(e).strip("'")}, 404
+        lines = (json.dumps(row) + '\n' for row in rows)
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
@@ -0,0 +1,45 @@
+import json
+from flask_restx import reqparse
+from app.cache import json_object
+from app.persistence.repository import MAX_PAGE_SIZE
+
+# Nombre maximal d'identifiants acceptés par ?ids= (une seule requête IN)
+MAX_IDS = MAX_PAGE_SIZE
+
+# Paramètres communs à toutes les routes de liste : ?limit=&cursor=
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument('limit', type=int, location='args',
+                               help=f'Page size (max {MAX_PAGE_SIZE})')
+pagination_parser.add_argument('cursor', type=str, location='args',
+                               help='Opaque cursor returned as next_cursor by the previous page')
+
+# Routes de liste : pagination ou lot d'identifiants (?ids=a,b,c)
+collection_parser = pagination_parser.copy()
+collection_parser.add_argument('ids', type=str, location='args',
+                               help=f"Comma-separated ID's to fetch in one call (max {MAX_IDS})")
+
+
+def parse_ids(value):
+    """Ids of ?ids=, without duplicates, in the order given"""
+    ids = list(dict.fromkeys(obj_id.strip() for obj_id in value.split(',') if obj_id.strip()))
+    if not ids:
+        raise ValueError("ids must not be empty")
+    if len(ids) > MAX_IDS:
+        raise ValueError(f"ids accepts at most {MAX_IDS} values")
+    return ids
+
+
+def paginated(items, next_cursor):
+    """Build the body of a paginated list response"""
+    return {'items': items, 'next_cursor': next_cursor}
+
+
+def paginated_json(items, next_cursor, **extra):
+    """Encoded body of a paginated list whose items are an encoded JSON array"""
+    return json_object(json.dumps({'next_cursor': next_cursor, **extra}).encode('utf-8'), items=items)
+
+
+def by_ids_json(items, missing):
+    """Encoded body of a ?ids= response: the items found, in order, and the missing ids"""
+    return json_object(json.dumps({'missing': missing}).encode('utf-8'), items=items)
+
@@ -1,6 +1,13 @@
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, reqparse
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import fragment_cache, response_cache
 from app.services import facade
+from app.query_budget import query_budget
+from app.api.v1.pagination import (by_ids_json, collection_parser, pagination_parser, paginated,
+                                   paginated_json, parse_ids)
+from app.cache import json_array, json_object, json_response
+from app.api.v1.bulk import bulk_items, bulk_response
+from app.api.v1.conditional import collection_validators, is_not_modified, not_modified
 
 api = Namespace('places', description='Place operations')
 
@@ -17,6 +24,23 @@ user_model = api.model('PlaceUser', {
     'email': fields.String(description='Email of the owner')
 })
 
+def tag_places(places):
+    """Tag the cached response with the places and the owners/amenities they embed"""
+    for place in places:
+        response_cache.tag(f'place:{place.id}', f'user:{place.user_id}')
+
+def tag_place_details(place, include=('amenities',)):
+    tag_places([place])
+    if 'amenities' in include:
+        response_cache.tag(*(f'amenity:{amenity.id}' for amenity in place.amenities))
+
+def encode_place_list(place):
+    """to_dict_list() of a place, assembled from the encoded fragments of each entity"""
+    return json_object(fragment_cache.encode(place, 'to_dict_fields'),
+                       owner=fragment_cache.encode(place.owner),
+                       amenities=fragment_cache.encode_all(place.amenities),
+                       reviews=fragment_cache.encode_all(place.reviews))
+
 # Define the place model for input validation and documentation
 place_model = api.model('Place', {
     'title': fields.String(required=True, description='Title of the place'),
@@ -27,6 +51,36 @@ place_model = api.model('Place', {
     'amenities': fields.List(fields.String, description="List of amenities ID's")
 })
 
+# Réponses partielles : ?fields=title,price&include=owner,amenities,reviews
+sparse_parser = reqparse.RequestParser()
+sparse_parser.add_argument('fields', type=str, location='args',
+                           help='Comma-separated place fields to return (default: all)')
+sparse_parser.add_argument('include', type=str, location='args',
+                           help='Comma-separated relations to embed: owner, amenities, reviews')
+
+
+def sparse_fields(args):
+    """(fields, include) asked by ?fields=&include=, None for the full representation"""
+    if args['fields'] is None and args['include'] is None:
+        return None
+    def split(value):
+        return [name.strip() for name in value.split(',') if name.strip()]
+    fields = split(args['fields']) if args['fields'] is not None else None
+    return fields, split(args['include'] or '')
+
+# Liste des places : pagination + filtres et tri exécutés en SQL
+place_list_parser = collection_parser.copy()
+for argument in sparse_parser.args:
+    place_list_parser.add_argument(argument)
+place_list_parser.add_argument('min_price', type=float, location='args', help='Minimum price per night')
+place_list_parser.add_argument('max_price', type=float, location='args', help='Maximum price per night')
+place_list_parser.add_argument('sort', type=str, location='args',
+                               help='price, -price, created_at, -created_at, rating or -rating')
+place_list_parser.add_argument('amenities', type=str, location='args',
+                               help="Comma-separated amenity ID's the places must have")
+place_list_parser.add_argument('amenities_match', type=str, default='all', choices=('all', 'any'),
+                               location='args', help='all: every amenity (AND), any: at least one (OR)')
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -46,22 +100,150 @@ class PlaceList(Resource):
         except Exception as e:
             return {'error': str(e).strip("'")}, 400
 
+    @api.expect(place_list_parser)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid input data')
+    # ?amenities= : + lecture de change_log et rechargement des places modifiées
+    @query_budget(10)
+    @response_cache.cached('places')
+    def get(self):
+        """Retrieve a page of places, or the places listed by ?ids="""
+        args = place_list_parser.parse_args()
+        filters = {'min_price': args['min_price'], 'max_price': args['max_price'], 'sort': args['sort']}
+        amenity_ids = [a.strip() for a in (args['amenities'] or '').split(',') if a.strip()]
+        if args['ids'] is not None and (amenity_ids or any(value is not None for value in filters.values())):
+            # ?ids= renvoie les places demandées, dans l'ordre demandé : ni filtre ni tri
+            return {'error': 'ids cannot be combined with min_price, max_price, sort or amenities'}, 400
+        sparse = sparse_fields(args)
+        headers = collection_validators(facade.get_places_version())
+        if is_not_modified(headers):
+            return not_modified(headers)
+        try:
+            profile = 'list'
+            if sparse:
+                fields, include = sparse
+                fields, profile = facade.sparse_place_profile(fields, include, args['sort'])
+            if args['ids'] is not None:
+                places, missing = facade.get_places_by_ids(parse_ids(args['ids']), profile)
+            elif amenity_ids:
+                places, next_cursor, facets = facade.get_places_by_amenities(
+                    amenity_ids, args['amenities_match'] == 'all', args['limit'], args['cursor'],
+                    profile=profile, **filters)
+            else:
+                places, next_cursor = facade.get_all_places(args['limit'], args['cursor'],
+                                                            profile=profile, **filters)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if sparse:
+            for place in places:
+                tag_place_details(place, include)
+            items = [place.to_dict_partial(fields, include) for place in places]
+            if args['ids'] is not None:
+                return {'items': items, 'missing': missing}, 200, headers
+            body = paginated(items, next_cursor)
+            if amenity_ids:
+                body['facets'] = facets
+            return body, 200, headers
+        for place in places:
+            tag_place_details(place)
+        items = json_array([encode_place_list(place) for place in places])
+        if args['ids'] is not None:
+            return json_response(by_ids_json(items, missing), headers)
+        extra = {'facets': facets} if amenity_ids else {}
+        return json_response(paginated_json(items, next_cursor, **extra), headers)
+
+@api.route('/bulk')
+class PlaceBulk(Resource):
+    @api.expect([place_model])
+    @api.response(201, 'All places created')
+    @api.response(207, 'Some places created, see the per-item results')
+    @api.response(400, 'Invalid input data')
+    @api.response(401, 'Unauthorized')
+    @api.doc(security='apikey')
+    @jwt_required()
+    def post(self):
+        """Register a batch of places owned by the current user"""
+        try:
+            results = facade.create_places(bulk_items(api.payload), get_jwt_identity())
+        except (KeyError, ValueError) as e:
+            return {'error': str(e).strip("'")}, 400
+        return bulk_response(results)
+
+# Recherche plein texte (?q=&limit=&cursor=) ou "autour de moi" (?lat=&lon=&radius_km=&limit=)
+MAX_SEARCH_RADIUS_KM = 500
+search_parser = pagination_parser.copy()
+search_parser.add_argument('q', type=str, location='args', help='Words to find in titles and descriptions')
+search_parser.add_argument('lat', type=float, location='args', help='Latitude of the center')
+search_parser.add_argument('lon', type=float, location='args', help='Longitude of the center')
+search_parser.add_argument('radius_km', type=float, default=10.0, location='args',
+                           help=f'Search radius in kilometers (max {MAX_SEARCH_RADIUS_KM})')
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.expect(search_parser)
+    @api.response(200, 'Places ranked by relevance (q) or sorted by distance (lat/lon)')
+    @api.response(400, 'Invalid input data')
+    @query_budget(2)
+    @response_cache.cached('places')
     def get(self):
-        """Retrieve a list of all places"""
-        places = facade.get_all_places()
-        return [place.to_dict_list() for place in places], 200
+        """Search places by text or find the places closest to a point"""
+        args = search_parser.parse_args()
+        if args['q'] is not None:
+            if args['lat'] is not None or args['lon'] is not None:
+                return {'error': 'Use either q or lat/lon'}, 400
+            try:
+                results, next_cursor = facade.search_places(args['q'], args['limit'], args['cursor'])
+            except ValueError as e:
+                return {'error': str(e)}, 400
+            tag_places([place for place, _ in results])
+            return paginated([{**place.to_dict(), 'score': score}
+                              for place, score in results], next_cursor), 200
+
+        if args['lat'] is None or args['lon'] is None:
+            return {'error': 'q or lat and lon are required'}, 400
+        if not -90 <= args['lat'] <= 90 or not -180 <= args['lon'] <= 180:
+            return {'error': 'Invalid coordinates'}, 400
+        if not 0 < args['radius_km'] <= MAX_SEARCH_RADIUS_KM:
+            return {'error': f'radius_km must be between 0 and {MAX_SEARCH_RADIUS_KM}'}, 400
+        try:
+            results = facade.search_places_nearby(args['lat'], args['lon'], args['radius_km'], args['limit'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        tag_places([place for place, _ in results])
+        return {'items': [{**place.to_dict(), 'distance_km': round(distance, 3)}
+                          for place, distance in results]}, 200
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
+    @api.expect(sparse_parser)
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(400, 'Invalid input data')
     @api.response(404, 'Place not found')
+    @query_budget(7)
+    @response_cache.cached()
     def get(self, place_id):
         """Get place details by ID"""
-        place = facade.get_place(place_id)
+        sparse = sparse_fields(sparse_parser.parse_args())
+        profile = None
+        if sparse:
+            fields, include = sparse
+            try:
+                fields, profile = facade.sparse_place_profile(fields, include)
+            except ValueError as e:
+                return {'error': str(e)}, 400
+        place = facade.get_place(place_id, profile)
         if not place:
             return {'error': 'Place not found'}, 404
-        return place.to_dict_list(), 200
+        # Le détail embarque propriétaire, équipements et avis : mêmes versions que /page
+        headers = collection_validators([(place.updated_at, 1)] + facade.get_place_page_version(place_id))
+        if is_not_modified(headers):
+            return not_modified(headers)
+        if sparse:
+            tag_place_details(place, include)
+            return place.to_dict_partial(fields, include), 200, headers
+        place = facade.get_place(place_id, profile='detail')
+        tag_place_details(place)
+        return json_response(encode_place_list(place), headers)
 
     @api.expect(place_model)
     @api.response(200, 'Place updated successfully')
@@ -108,12 +290,50 @@ class PlaceResource(Resource):
         except Exception as e:
             return {'error': str(e).strip("'")}, 400
 
+# Page de détail en un seul appel : la place, une page d'avis avec le nom
+# des auteurs (résolus par la requête des avis) et les agrégats de notes
+PLACE_PAGE_FIELDS = ['id', 'title', 'description', 'price', 'latitude', 'longitude', 'owner_id']
+PLACE_PAGE_INCLUDE = ['owner', 'amenities']
+
+@api.route('/<place_id>/page')
+class PlacePage(Resource):
+    @api.expect(pagination_parser)
+    @api.response(200, 'Place, page of reviews and rating aggregates retrieved successfully')
+    @api.response(400, 'Invalid input data')
+    @api.response(404, 'Place not found')
+    @query_budget(6)
+    @response_cache.cached()
+    def get(self, place_id):
+        """Get everything the place page displays: details, reviews and ratings"""
+        args = pagination_parser.parse_args()
+        # Colonnes des agrégats chargées avec la place pour rating_to_dict()
+        _, profile = facade.sparse_place_profile(PLACE_PAGE_FIELDS + ['rating_average', 'rating_histogram'],
+                                                 PLACE_PAGE_INCLUDE)
+        place = facade.get_place(place_id, profile)
+        if not place:
+            return {'error': 'Place not found'}, 404
+        headers = collection_validators([(place.updated_at, 1)] + facade.get_place_page_version(place_id))
+        if is_not_modified(headers):
+            return not_modified(headers)
+        try:
+            reviews, next_cursor = facade.get_place_reviews_page(place_id, args['limit'], args['cursor'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        tag_place_details(place)
+        response_cache.tag(*(f'user:{review.user_id}' for review in reviews))
+        return {
+            'place': place.to_dict_partial(PLACE_PAGE_FIELDS, PLACE_PAGE_INCLUDE),
+            'reviews': paginated([review.to_dict_with_author() for review in reviews], next_cursor),
+            'ratings': place.rating_to_dict()
+        }, 200, headers
+
 @api.route('/<place_id>/amenities')
 class PlaceAmenities(Resource):
     @api.expect(amenity_model)
     @api.response(200, 'Amenities added successfully')
     @api.response(404, 'Place not found')
     @api.response(400, 'Invalid input data')
+    @query_budget(7)
     def post(self, place_id):
         amenities_data = api.payload
         if not amenities_data or len(amenities_data) == 0:
@@ -123,22 +343,27 @@ class PlaceAmenities(Resource):
         if not place:
             return {'error': 'Place not found'}, 404
         
-        for amenity in amenities_data:
-            a = facade.get_amenity(amenity['id'])
-            if not a:
-                return {'error': 'Invalid input data'}, 400
-        
-        for amenity in amenities_data:
-            place.add_amenity(amenity)
+        try:
+            facade.add_place_amenities(place_id, [amenity['id'] for amenity in amenities_data])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except (KeyError, TypeError):
+            return {'error': 'Invalid input data'}, 400
         return {'message': 'Amenities added successfully'}, 200
 
 @api.route('/<place_id>/reviews/')
 class PlaceReviewList(Resource):
     @api.response(200, 'List of reviews for the place retrieved successfully')
     @api.response(404, 'Place not found')
+    @query_budget(3)
+    @response_cache.cached()
     def get(self, place_id):
         """Get all reviews for a specific place"""
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        return [review.to_dict() for review in place.reviews], 200
+        headers = collection_validators(facade.get_reviews_version(place_id))
+        if is_not_modified(headers):
+            return not_modified(headers)
+        response_cache.tag(f'place:{place.id}')
+        return json_response(fragment_cache.encode_all(place.reviews), headers)
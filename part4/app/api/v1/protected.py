@@ -12,5 +12,4 @@ class ProtectedResource(Resource):
 	def get(self):
 		"""A protected endpoint that requires a valid JWT token"""
 		current_user = get_jwt_identity()
-		print(current_user)
 		return {'message': f'Hello, user {current_user}'}, 200
@@ -1,6 +1,12 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import fragment_cache, response_cache
 from app.services import facade
+from app.query_budget import query_budget
+from app.api.v1.pagination import by_ids_json, collection_parser, paginated_json, parse_ids
+from app.cache import json_response
+from app.api.v1.bulk import bulk_items, bulk_response
+from app.api.v1.conditional import collection_validators, entity_validators, is_not_modified, not_modified
 
 api = Namespace('reviews', description='Review operations')
 
@@ -29,21 +35,62 @@ class ReviewList(Resource):
         except Exception as e:
             return {"error": str(e).strip("'")}, 400
 
+    @api.expect(collection_parser)
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid input data')
+    @query_budget(2)
+    @response_cache.cached('reviews')
     def get(self):
-        """Retrieve a list of all reviews"""
-        return [review.to_dict() for review in facade.get_all_reviews()], 200
+        """Retrieve a page of reviews, or the reviews listed by ?ids="""
+        args = collection_parser.parse_args()
+        headers = collection_validators(facade.get_reviews_version())
+        if is_not_modified(headers):
+            return not_modified(headers)
+        try:
+            if args['ids'] is not None:
+                reviews, missing = facade.get_reviews_by_ids(parse_ids(args['ids']))
+            else:
+                reviews, next_cursor = facade.get_all_reviews(args['limit'], args['cursor'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        response_cache.tag(*(f'review:{review.id}' for review in reviews))
+        if args['ids'] is not None:
+            return json_response(by_ids_json(fragment_cache.encode_all(reviews), missing), headers)
+        return json_response(paginated_json(fragment_cache.encode_all(reviews), next_cursor), headers)
+
+@api.route('/bulk')
+class ReviewBulk(Resource):
+    @api.expect([review_model])
+    @api.response(201, 'All reviews created')
+    @api.response(207, 'Some reviews created, see the per-item results')
+    @api.response(400, 'Invalid input data')
+    @api.response(401, 'Unauthorized')
+    @api.doc(security='apikey')
+    @jwt_required()
+    def post(self):
+        """Register a batch of reviews written by the current user"""
+        try:
+            results = facade.create_reviews(bulk_items(api.payload), get_jwt_identity())
+        except (KeyError, ValueError) as e:
+            return {'error': str(e).strip("'")}, 400
+        return bulk_response(results)
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
     @api.response(200, 'Review details retrieved successfully')
     @api.response(404, 'Review not found')
+    @query_budget(1)
+    @response_cache.cached()
     def get(self, review_id):
         """Get review details by ID"""
         review = facade.get_review(review_id)
         if not review:
             return {'error': 'Review not found'}, 404
-        return review.to_dict(), 200
+        headers = entity_validators(review)
+        if is_not_modified(headers):
+            return not_modified(headers)
+        response_cache.tag(f'review:{review.id}')
+        return review.to_dict(), 200, headers
 
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
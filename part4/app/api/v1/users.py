@@ -1,6 +1,12 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import fragment_cache, response_cache
+from app.password_hasher import PasswordHasherBusy
 from app.services import facade
+from app.query_budget import query_budget
+from app.api.v1.pagination import by_ids_json, collection_parser, paginated_json, parse_ids
+from app.cache import json_response
+from app.api.v1.conditional import collection_validators, entity_validators, is_not_modified, not_modified
 
 api = Namespace('users', description='User operations')
 
@@ -19,6 +25,7 @@ class UserList(Resource):
     @api.response(201, 'User successfully created')
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
+    @api.response(503, 'Password hashing saturated, retry later')
     @jwt_required(optional=True)
     def post(self):
         """Register a new user"""
@@ -40,25 +47,50 @@ class UserList(Resource):
         try:
             new_user = facade.create_user(user_data)
             return {'message': 'User successfully created', 'id': new_user.id}, 201
+        except PasswordHasherBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': '1'}
         except Exception as e:
             return {'error': str(e).strip("'")}, 400
         
+    @api.expect(collection_parser)
     @api.response(200, 'List of users retrieved successfully')
+    @api.response(400, 'Invalid input data')
+    @query_budget(2)
+    @response_cache.cached('users')
     def get(self):
-        """Retrieve a list of users"""
-        users = facade.get_users()
-        return [user.to_dict() for user in users], 200
+        """Retrieve a page of users, or the users listed by ?ids="""
+        args = collection_parser.parse_args()
+        headers = collection_validators(facade.get_users_version())
+        if is_not_modified(headers):
+            return not_modified(headers)
+        try:
+            if args['ids'] is not None:
+                users, missing = facade.get_users_by_ids(parse_ids(args['ids']))
+            else:
+                users, next_cursor = facade.get_users(args['limit'], args['cursor'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        response_cache.tag(*(f'user:{user.id}' for user in users))
+        if args['ids'] is not None:
+            return json_response(by_ids_json(fragment_cache.encode_all(users), missing), headers)
+        return json_response(paginated_json(fragment_cache.encode_all(users), next_cursor), headers)
     
 @api.route('/<user_id>')
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
     @api.response(404, 'User not found')
+    @query_budget(1)
+    @response_cache.cached()
     def get(self, user_id):
         """Get user details by ID"""
         user = facade.get_user(user_id)
         if not user:
             return {'error': 'User not found'}, 404
-        return user.to_dict(), 200
+        headers = entity_validators(user)
+        if is_not_modified(headers):
+            return not_modified(headers)
+        response_cache.tag(f'user:{user.id}')
+        return user.to_dict(), 200, headers
 
     @api.expect(user_model)
     @api.response(200, 'User updated successfully')
@@ -89,5 +121,7 @@ class UserResource(Resource):
         try:
             facade.update_user(user_id, user_data)
             return user.to_dict(), 200
+        except PasswordHasherBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': '1'}
         except Exception as e:
             return {'error': str(e).strip("'")}, 400
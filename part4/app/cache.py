@@ -0,0 +1,400 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from threading import RLock, local
+import json
+import sqlite3
+import time
+from flask import Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Cache de réponses des ressources GET : un LRU en mémoire (limité en
+# octets, avec TTL) devant un backend partagé optionnel. Les entrées sont
+# étiquetées (tags) et invalidées par la façade après chaque commit.
+# Le LRU est propre à chaque processus : avec plusieurs workers, seul le
+# backend partagé est invalidé pour tous, le TTL borne la péremption du LRU.
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value, tags, ttl):
+        pass
+
+    @abstractmethod
+    def invalidate(self, tags):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+
+class LRUCache(CacheBackend):
+    def __init__(self, max_bytes, stats):
+        self.max_bytes = max_bytes
+        self.stats = stats
+        self._lock = RLock()
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._size = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.stats['expirations'] += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags, ttl):
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tags)
+            self._size += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats['evictions'] += 1
+
+    def invalidate(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        value, _, tags = entry
+        self._size -= len(key) + len(value)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    @property
+    def size(self):
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Shared backend stored in a SQLite file, usable by several processes"""
+
+    def __init__(self, path, max_entries=10000, purge_every=100):
+        self.path = path
+        self.max_entries = max_entries
+        self.purge_every = purge_every
+        self._local = local()
+        self._lock = RLock()
+        self._writes = 0
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS cache_entries "
+                               "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS cache_tags "
+                               "(tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))")
+            # Index de la purge : entrées expirées, puis tags orphelins
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at "
+                               "ON cache_entries (expires_at)")
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_cache_tags_key ON cache_tags (key)")
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value, tags, ttl):
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?)",
+                               (key, value, time.time() + ttl))
+            connection.executemany("INSERT OR IGNORE INTO cache_tags VALUES (?, ?)",
+                                   [(tag, key) for tag in tags])
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % self.purge_every == 0
+        if purge:
+            self.purge()
+
+    def purge(self):
+        """Delete the expired entries, the oldest beyond max_entries and their tags"""
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            # Même TTL pour toutes les entrées : expires_at suit l'ordre d'écriture
+            connection.execute("DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_entries "
+                               "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+            connection.execute("DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache_entries)")
+
+    def invalidate(self, tags):
+        with self._connection() as connection:
+            for tag in tags:
+                connection.execute("DELETE FROM cache_entries WHERE key IN "
+                                   "(SELECT key FROM cache_tags WHERE tag = ?)", (tag,))
+                connection.execute("DELETE FROM cache_tags WHERE tag = ?", (tag,))
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache_entries")
+            connection.execute("DELETE FROM cache_tags")
+
+
+def pack(headers, tags, body):
+    """Encode a cached response: one JSON line of metadata, then the body"""
+    meta = json.dumps({'headers': headers, 'tags': sorted(tags)}).encode('utf-8')
+    return meta + b'\n' + body
+
+
+def unpack(value):
+    meta, body = value.split(b'\n', 1)
+    return json.loads(meta), body
+
+
+class _CacheState:
+    def __init__(self, app, backend):
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+        self.memory = LRUCache(app.config.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024), self.stats)
+        # Le LRU compte évictions et expirations sous son verrou, l'état le reste sous le sien
+        self._lock = RLock()
+        self.shared = backend
+        path = app.config.get('RESPONSE_CACHE_SHARED_PATH')
+        if self.shared is None and path:
+            self.shared = SQLiteCacheBackend(path, app.config.get('RESPONSE_CACHE_SHARED_MAX_ENTRIES', 10000))
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None and self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.memory.set(key, value, unpack(value)[0]['tags'], self.ttl)
+        with self._lock:
+            self.stats['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def set(self, key, value, tags):
+        self.memory.set(key, value, tags, self.ttl)
+        if self.shared is not None:
+            self.shared.set(key, value, tags, self.ttl)
+
+    def invalidate(self, tags):
+        with self._lock:
+            self.stats['invalidations'] += 1
+        self.memory.invalidate(tags)
+        if self.shared is not None:
+            self.shared.invalidate(tags)
+
+
+class ResponseCache:
+    """Flask extension caching the JSON responses of GET resources"""
+
+    def init_app(self, app, backend=None):
+        if app.config.get('RESPONSE_CACHE_ENABLED', True):
+            app.extensions['response_cache'] = _CacheState(app, backend)
+
+    def _state(self):
+        return current_app.extensions.get('response_cache')
+
+    def cached(self, *tags):
+        """Cache the 200 responses of a GET method, tagged with tags"""
+        # Import tardif : unit_of_work dépend de app.db, défini après ce module
+        from app.persistence.unit_of_work import in_transaction
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                state = self._state()
+                # Dans une unité de travail (batch atomique), la réponse peut
+                # refléter des écritures pas encore validées : ni lue ni stockée
+                if state is None or in_transaction():
+                    return view(*args, **kwargs)
+                key = request.full_path
+                value = state.get(key)
+                if value is not None:
+                    return self._response(value, hit=True)
+                g.response_cache_tags = set(tags)
+                result = view(*args, **kwargs)
+                if isinstance(result, Response):
+                    # Corps déjà encodé (fragments) : mis en cache tel quel
+                    if result.status_code != 200 or result.mimetype != 'application/json':
+                        return result
+                    headers = {name: value for name, value in result.headers.items()
+                               if name not in ('Content-Type', 'Content-Length')}
+                    body = result.get_data()
+                else:
+                    if not isinstance(result, tuple):
+                        result = (result,)
+                    body, status, headers = result + (200, {})[len(result) - 1:]
+                    if status != 200:
+                        return result
+                    body = json.dumps(body).encode('utf-8')
+                cache_tags = frozenset(g.response_cache_tags)
+                value = pack(dict(headers), cache_tags, body)
+                state.set(key, value, cache_tags)
+                return self._response(value, hit=False)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _response(value, hit):
+        meta, body = unpack(value)
+        headers = meta['headers']
+        etag = headers.get('ETag')
+        if etag and request.if_none_match and request.if_none_match.contains_weak(etag.strip('"')):
+            return Response(status=304, headers=headers)
+        response = Response(body, 200, headers, mimetype='application/json')
+        response.headers['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
+
+    def tag(self, *tags):
+        """Attach tags to the response being cached by the current request"""
+        if self._state() is not None and 'response_cache_tags' in g:
+            g.response_cache_tags.update(tags)
+
+    def invalidate(self, *tags):
+        state = self._state()
+        if state is not None:
+            state.invalidate(tags)
+
+    def clear(self):
+        state = self._state()
+        if state is not None:
+            state.memory.clear()
+            if state.shared is not None:
+                state.shared.clear()
+
+    def stats(self):
+        state = self._state()
+        if state is None:
+            return {'enabled': False}
+        return {'enabled': True, **state.stats, 'entries': len(state.memory),
+                'bytes': state.memory.size}
+
+
+# Cache de fragments : le JSON déjà encodé de chaque entité, valide tant que
+# son updated_at n'a pas changé. Les listes sont assemblées en joignant les
+# fragments au lieu de reconstruire et ré-encoder chaque dictionnaire.
+class _FragmentState:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._lock = RLock()
+        self._entries = OrderedDict()
+
+    def encode(self, obj, serializer):
+        key, version = (type(obj).__name__, obj.id), obj.updated_at
+        with self._lock:
+            fragment = self._entries.get(key, {}).get(serializer)
+            if fragment is not None and fragment[0] == version:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return fragment[1]
+            self.stats['misses'] += 1
+        value = json.dumps(getattr(obj, serializer)()).encode('utf-8')
+        if version is not None:
+            with self._lock:
+                self._entries.setdefault(key, {})[serializer] = (version, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats['evictions'] += 1
+        return value
+
+    def evict(self, model, obj_id):
+        with self._lock:
+            self._entries.pop((model, obj_id), None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FragmentCache:
+    """Flask extension keeping the encoded JSON of each entity"""
+
+    def init_app(self, app):
+        if app.config.get('FRAGMENT_CACHE_ENABLED', True):
+            app.extensions['fragment_cache'] = _FragmentState(app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', 10000))
+
+    def _state(self):
+        if not has_app_context():
+            return None
+        return current_app.extensions.get('fragment_cache')
+
+    def encode(self, obj, serializer='to_dict'):
+        """JSON bytes of getattr(obj, serializer)(), keyed by (model, id, updated_at)"""
+        state = self._state()
+        if state is None:
+            return json.dumps(getattr(obj, serializer)()).encode('utf-8')
+        return state.encode(obj, serializer)
+
+    def encode_all(self, objects, serializer='to_dict'):
+        return json_array([self.encode(obj, serializer) for obj in objects])
+
+    def evict(self, obj):
+        state = self._state()
+        if state is not None:
+            state.evict(type(obj).__name__, obj.id)
+
+    def stats(self):
+        state = self._state()
+        if state is None:
+            return {'enabled': False}
+        return {'enabled': True, **state.stats, 'entries': len(state)}
+
+
+def json_array(fragments):
+    """Join encoded JSON values into an encoded JSON array"""
+    return b'[' + b','.join(fragments) + b']'
+
+
+def json_object(fields, **members):
+    """Add already encoded members to an encoded JSON object"""
+    parts = [json.dumps(name).encode('utf-8') + b':' + value for name, value in members.items()]
+    if fields != b'{}':
+        parts.insert(0, fields[1:-1])
+    return b'{' + b','.join(parts) + b'}'
+
+
+def json_response(body, headers=None):
+    return Response(body, 200, headers, mimetype='application/json')
+
+
+@event.listens_for(Session, 'after_flush')
+def evict_flushed_fragments(session, flush_context):
+    """Drop the fragments of the objects modified or deleted by the flush"""
+    fragment_cache = FragmentCache()
+    for obj in list(session.dirty) + list(session.deleted):
+        if getattr(obj, 'id', None) is not None and hasattr(obj, 'updated_at'):
+            fragment_cache.evict(obj)
+
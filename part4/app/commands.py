@@ -0,0 +1,59 @@
+import click
+from flask.cli import with_appcontext
+from app.password_hasher import calibrate_log_rounds
+from app.services import facade
+
+# Commandes de maintenance : flask --app run <commande>
+
+
+@click.command('repair-ratings')
+@with_appcontext
+def repair_ratings_command():
+    """Recompute the review aggregates of every place"""
+    count = facade.recompute_review_aggregates()
+    click.echo(f"✅ Agrégats recalculés pour {count} places avec avis")
+
+
+@click.command('backfill-geohash')
+@with_appcontext
+def backfill_geohash_command():
+    """Compute the geohash of places that do not have one yet"""
+    count = facade.place_repo.backfill_geohashes()
+    click.echo(f"✅ Géohash calculé pour {count} places")
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Create and fill the full-text search index of places"""
+    count = facade.place_repo.rebuild_search_index()
+    click.echo(f"✅ Index de recherche reconstruit ({count} places)")
+
+
+@click.command('compact-change-log')
+@click.option('--up-to', type=int, default=None,
+              help='Only compact the entries up to this seq (default: all)')
+@with_appcontext
+def compact_change_log_command(up_to):
+    """Keep only the latest change_log entry of each entity"""
+    count = facade.compact_change_log(up_to)
+    click.echo(f"✅ {count} entrées du journal supprimées")
+
+
+@click.command('calibrate-bcrypt')
+@click.option('--target-ms', type=float, default=250.0, show_default=True,
+              help='Latency budget of one password hash on this machine')
+def calibrate_bcrypt_command(target_ms):
+    """Pick the highest bcrypt cost that hashes within the latency budget"""
+    rounds, timings = calibrate_log_rounds(target_ms)
+    for cost, elapsed in timings:
+        click.echo(f"  coût {cost:2d} : {elapsed:8.1f} ms")
+    click.echo(f"✅ BCRYPT_LOG_ROUNDS={rounds} (≤ {target_ms:g} ms par hachage)")
+
+
+def register_commands(app):
+    app.cli.add_command(repair_ratings_command)
+    app.cli.add_command(backfill_geohash_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(compact_change_log_command)
+    app.cli.add_command(calibrate_bcrypt_command)
@@ -0,0 +1,115 @@
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import time
+from flask import current_app, has_app_context
+from flask_jwt_extended import JWTManager
+
+# Cache des claims déjà vérifiés : un client qui pagine renvoie le même jeton
+# à chaque requête, on évite de le redécoder et de revérifier sa signature.
+# Clé : empreinte du jeton (jamais le jeton lui-même). Une entrée n'est plus
+# servie dès que son exp est atteint (sans tolérance) : le décodage complet
+# reprend la main et lève l'erreur d'expiration habituelle.
+# Les jetons révoqués (déconnexion) sont refusés par le contrôle de blocklist
+# de flask-jwt-extended, qui s'exécute aussi après un succès du cache. Le
+# cache est propre à chaque processus, les révocations sont en base
+# (revoked_tokens) : une déconnexion vaut pour tous les workers.
+# _decode_jwt_from_config est privé : version de flask-jwt-extended figée
+# dans requirements.txt (vérifié avec 4.7.x).
+
+
+class ClaimsCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'expirations': 0, 'evictions': 0}
+        self._lock = Lock()
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(encoded_token):
+        return hashlib.blake2b(encoded_token.encode('utf-8'), digest_size=16).digest()
+
+    def get(self, key):
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                self.stats['misses'] += 1
+                return None
+            if claims['exp'] <= time.time():
+                del self._entries[key]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return claims
+
+    def set(self, key, claims):
+        # Sans exp, rien ne borne la validité : pas de mise en cache
+        if not isinstance(claims.get('exp'), (int, float)):
+            return
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager reusing the claims of tokens it already verified"""
+
+    def init_app(self, app, add_context_processor=False):
+        super().init_app(app, add_context_processor)
+        app.config.setdefault('JWT_CLAIMS_CACHE_ENABLED', True)
+        app.config.setdefault('JWT_CLAIMS_CACHE_MAX_ENTRIES', 10000)
+        app.extensions['jwt_claims_cache'] = ClaimsCache(app.config['JWT_CLAIMS_CACHE_MAX_ENTRIES'])
+        self.token_in_blocklist_loader(self._is_revoked)
+
+    @staticmethod
+    def _claims_cache():
+        if not has_app_context() or not current_app.config.get('JWT_CLAIMS_CACHE_ENABLED', False):
+            return None
+        return current_app.extensions.get('jwt_claims_cache')
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        cache = self._claims_cache()
+        # Le contrôle CSRF et allow_expired passent toujours par le décodage complet
+        if cache is None or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        key = cache.key(encoded_token)
+        claims = cache.get(key)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            cache.set(key, claims)
+        # Copie : une vue qui modifie get_jwt() ne touche pas l'entrée en cache
+        return dict(claims)
+
+    # Import tardif de la façade : elle dépend de app.db, défini après ce module
+    @staticmethod
+    def _is_revoked(jwt_header, jwt_payload):
+        from app.services import facade
+        return facade.is_token_revoked(jwt_payload.get('jti'))
+
+    @staticmethod
+    def revoke(claims):
+        """Revoke the token carrying these claims until it expires"""
+        from app.services import facade
+        facade.revoke_token(claims['jti'], claims.get('exp', float('inf')))
+
+    @staticmethod
+    def collect_metrics():
+        """Prometheus lines describing the claims cache"""
+        cache = current_app.extensions.get('jwt_claims_cache')
+        if cache is None:
+            return []
+        stats = cache.stats
+        lookups = stats['hits'] + stats['misses']
+        lines = ['# HELP hbnb_jwt_claims_cache_total Lookups of verified JWT claims, by result',
+                 '# TYPE hbnb_jwt_claims_cache_total counter']
+        for result in ('hits', 'misses', 'expirations', 'evictions'):
+            lines.append(f'hbnb_jwt_claims_cache_total{{result="{result}"}} {stats[result]}')
+        lines += ['# HELP hbnb_jwt_claims_cache_hit_ratio Share of token verifications served from the cache',
+                  '# TYPE hbnb_jwt_claims_cache_hit_ratio gauge',
+                  f'hbnb_jwt_claims_cache_hit_ratio {stats["hits"] / lookups if lookups else 0.0}']
+        return lines
@@ -0,0 +1,144 @@
+from bisect import bisect_left
+from threading import Lock
+import time
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Métriques au format texte Prometheus, servies sur /metrics : par route,
+# nombre de requêtes, histogramme de latence, taille des réponses, nombre
+# et durée des requêtes SQL (événements du moteur). Désactivé, rien n'est
+# enregistré : ni hook de requête, ni route /metrics.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels.items()) + '}'
+
+
+class _Registry:
+    def __init__(self):
+        self._lock = Lock()
+        self.requests = {}
+        self.latency = {}
+        self.sizes = {}
+        self.sql = {}
+
+    def observe(self, endpoint, method, status, duration, size, sql_count, sql_time):
+        with self._lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            buckets, total, count = self.latency.get((endpoint, method), ([0] * len(LATENCY_BUCKETS), 0.0, 0))
+            index = bisect_left(LATENCY_BUCKETS, duration)
+            if index < len(buckets):
+                buckets[index] += 1
+            self.latency[(endpoint, method)] = (buckets, total + duration, count + 1)
+            size_total, size_count = self.sizes.get((endpoint, method), (0, 0))
+            self.sizes[(endpoint, method)] = (size_total + size, size_count + 1)
+            statements, seconds = self.sql.get(endpoint, (0, 0.0))
+            self.sql[endpoint] = (statements + sql_count, seconds + sql_time)
+
+    def render(self, collectors=()):
+        with self._lock:
+            lines = ['# HELP hbnb_http_requests_total Requests handled, by route, method and status',
+                     '# TYPE hbnb_http_requests_total counter']
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'hbnb_http_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}')
+            lines += ['# HELP hbnb_http_request_duration_seconds Request latency',
+                      '# TYPE hbnb_http_request_duration_seconds histogram']
+            for (endpoint, method), (buckets, total, count) in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, bucket in zip(LATENCY_BUCKETS, buckets):
+                    cumulative += bucket
+                    lines.append('hbnb_http_request_duration_seconds_bucket'
+                                 f'{_labels(endpoint=endpoint, method=method, le=bound)} {cumulative}')
+                lines.append('hbnb_http_request_duration_seconds_bucket'
+                             f'{_labels(endpoint=endpoint, method=method, le="+Inf")} {count}')
+                lines.append(f'hbnb_http_request_duration_seconds_sum{_labels(endpoint=endpoint, method=method)} {total}')
+                lines.append(f'hbnb_http_request_duration_seconds_count{_labels(endpoint=endpoint, method=method)} {count}')
+            lines += ['# HELP hbnb_http_response_size_bytes Size of the response bodies',
+                      '# TYPE hbnb_http_response_size_bytes summary']
+            for (endpoint, method), (total, count) in sorted(self.sizes.items()):
+                lines.append(f'hbnb_http_response_size_bytes_sum{_labels(endpoint=endpoint, method=method)} {total}')
+                lines.append(f'hbnb_http_response_size_bytes_count{_labels(endpoint=endpoint, method=method)} {count}')
+            lines += ['# HELP hbnb_sql_statements_total SQL statements run while handling requests',
+                      '# TYPE hbnb_sql_statements_total counter']
+            for endpoint, (statements, _) in sorted(self.sql.items()):
+                lines.append(f'hbnb_sql_statements_total{_labels(endpoint=endpoint)} {statements}')
+            lines += ['# HELP hbnb_sql_duration_seconds_total Time spent in SQL statements',
+                      '# TYPE hbnb_sql_duration_seconds_total counter']
+            for endpoint, (_, seconds) in sorted(self.sql.items()):
+                lines.append(f'hbnb_sql_duration_seconds_total{_labels(endpoint=endpoint)} {seconds}')
+        for collect in collectors:
+            lines += collect()
+        return '\n'.join(lines) + '\n'
+
+
+class Metrics:
+    """Flask extension collecting per-route request and SQL metrics"""
+
+    def __init__(self):
+        self._collectors = []
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', False):
+            return
+        app.extensions['metrics'] = _Registry()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self._render)
+        _listen_to_engines()
+
+    def add_collector(self, collect):
+        """Add a callable returning extra lines of Prometheus text"""
+        self._collectors.append(collect)
+
+    # Une pile par contexte d'application : les sous-requêtes d'un batch
+    # partagent g avec la requête englobante
+    @staticmethod
+    def _before_request():
+        g.setdefault('metrics_frames', []).append([time.perf_counter(), 0, 0.0])
+
+    @staticmethod
+    def _after_request(response):
+        frames = g.get('metrics_frames')
+        if not frames:
+            return response
+        started, sql_count, sql_time = frames.pop()
+        if request.endpoint != 'metrics':
+            rule = request.url_rule.rule if request.url_rule else 'unmatched'
+            current_app.extensions['metrics'].observe(
+                rule, request.method, response.status_code, time.perf_counter() - started,
+                response.calculate_content_length() or 0, sql_count, sql_time)
+        return response
+
+    def _render(self):
+        registry = current_app.extensions['metrics']
+        return Response(registry.render(self._collectors), mimetype='text/plain; version=0.0.4')
+
+
+_listening = False
+
+
+def _listen_to_engines():
+    """Time every SQL statement run while a request is being measured"""
+    global _listening
+    if _listening:
+        return
+    _listening = True
+
+    # Début porté par le contexte d'exécution : une requête en échec n'a pas
+    # d'after_cursor_execute, son contexte est simplement abandonné
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_started = time.perf_counter()
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, 'metrics_started', None)
+        if started is not None and has_request_context():
+            elapsed = time.perf_counter() - started
+            for frame in g.get('metrics_frames', ()):
+                frame[1] += 1
+                frame[2] += elapsed
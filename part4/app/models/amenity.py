@@ -22,3 +22,7 @@ class Amenity(BaseModel):
 			'id': self.id,
 			'name': self.name
 		}
+
+
+# Index servant la pagination par curseur sur (created_at, id)
+db.Index('ix_amenities_created_at_id', Amenity.created_at, Amenity.id)
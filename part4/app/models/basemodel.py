@@ -1,4 +1,5 @@
 from app import db
+from app.persistence.unit_of_work import commit
 import uuid
 from datetime import datetime
 
@@ -7,13 +8,14 @@ class BaseModel(db.Model):
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     created_at = db.Column(db.DateTime, default=datetime.now)
-    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    # Indexé : max(updated_at) sert de version de collection (ETag)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, index=True)
 
     def save(self):
         """Update the updated_at timestamp whenever the object is modified"""
         self.updated_at = datetime.now()
         db.session.add(self)
-        db.session.commit()
+        commit()
 
     def update(self, data):
         """Update the attributes of the object based on the provided dictionary"""
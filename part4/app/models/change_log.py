@@ -0,0 +1,27 @@
+from app import db
+from datetime import datetime
+
+# Journal des modifications, en ajout seul : une ligne par entité créée,
+# modifiée ou supprimée, écrite dans la transaction de la modification.
+# seq croît strictement : un consommateur reprend après le dernier seq lu.
+class ChangeLog(db.Model):
+    __tablename__ = 'change_log'
+
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.String(36), nullable=False)
+    op = db.Column(db.String(10), nullable=False)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'entity': self.entity,
+            'entity_id': self.entity_id,
+            'op': self.op,
+            'changed_at': self.changed_at.isoformat()
+        }
+
+
+# Compactage : dernière entrée de chaque entité
+db.Index('ix_change_log_entity_seq', ChangeLog.entity, ChangeLog.entity_id, ChangeLog.seq)
@@ -1,5 +1,8 @@
 from .basemodel import BaseModel
 from app import db
+from app.services.geo import encode_geohash
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import validates
 
 class Place(BaseModel):
@@ -10,8 +13,21 @@ class Place(BaseModel):
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    amenities = db.relationship('Amenity', secondary='amenities_places', backref='places', lazy='dynamic')
+    # Géohash de (latitude, longitude), calculé à l'écriture
+    geohash = db.Column(db.String(12), nullable=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+
+    # Agrégats des avis, tenus à jour dans la transaction de chaque avis
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0)
+    # Clé entière stable de la place dans l'index plein texte (SQLite)
+    search_id = db.Column(db.Integer, nullable=True)
+    amenities = db.relationship('Amenity', secondary='amenities_places', backref='places', lazy='select')
 
     owner = db.relationship('User', backref='places', lazy='select')
 
@@ -70,6 +86,62 @@ class Place(BaseModel):
         self.amenities.append(amenity)
         self.save()
 
+    def update_rating_aggregates(self, old_rating=None, new_rating=None):
+        """Move the aggregates from old_rating to new_rating (None = no review)"""
+        deltas = {}
+        count_delta = (new_rating is not None) - (old_rating is not None)
+        sum_delta = (new_rating or 0) - (old_rating or 0)
+        if count_delta:
+            deltas['review_count'] = count_delta
+        if sum_delta:
+            deltas['rating_sum'] = sum_delta
+        if old_rating != new_rating:
+            for rating, delta in ((old_rating, -1), (new_rating, 1)):
+                if rating is not None:
+                    deltas[f'rating_{rating}_count'] = delta
+        state = inspect(self)
+        for column, delta in deltas.items():
+            if state.persistent:
+                # UPDATE ... SET col = col + delta : pas de mise à jour perdue
+                setattr(self, column, getattr(type(self), column) + delta)
+            else:
+                setattr(self, column, (getattr(self, column) or 0) + delta)
+        if state.persistent and deltas:
+            # Envoyé tout de suite : les attributs expirés sont relus en entiers,
+            # sinon ils restent des expressions SQL jusqu'au prochain flush
+            state.session.flush()
+
+    @property
+    def rating_average(self):
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
+
+    @hybrid_property
+    def rating_score(self):
+        """Average rating used to sort places, 0 when there is no review"""
+        if not self.review_count:
+            return 0.0
+        return self.rating_sum / self.review_count
+
+    @rating_score.expression
+    def rating_score(cls):
+        # Constantes littérales : l'expression doit être identique à celle de l'index
+        zero = db.literal_column('0', db.Integer)
+        return db.case((cls.review_count > zero, db.cast(cls.rating_sum, db.Float) / cls.review_count),
+                       else_=db.literal_column('0.0', db.Float))
+
+    @property
+    def rating_histogram(self):
+        return {str(rating): getattr(self, f'rating_{rating}_count') or 0 for rating in range(1, 6)}
+
+    def rating_to_dict(self):
+        return {
+            'review_count': self.review_count or 0,
+            'rating_average': self.rating_average,
+            'rating_histogram': self.rating_histogram
+        }
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -78,10 +150,46 @@ class Place(BaseModel):
             'price': self.price,
             'latitude': self.latitude,
             'longitude': self.longitude,
-            'owner_id': self.owner.id
+            'owner_id': self.user_id,
+            **self.rating_to_dict()
         }
     
-    def to_dict_list(self):
+    # Champs exposés par ?fields= et colonnes à charger pour chacun
+    FIELD_COLUMNS = {
+        'id': ('id',),
+        'title': ('title',),
+        'description': ('description',),
+        'price': ('price',),
+        'latitude': ('latitude',),
+        'longitude': ('longitude',),
+        'owner_id': ('user_id',),
+        'review_count': ('review_count',),
+        'rating_average': ('review_count', 'rating_sum'),
+        'rating_histogram': tuple(f'rating_{rating}_count' for rating in range(1, 6)),
+    }
+    # Relations exposées par ?include=
+    RELATIONS = ('owner', 'amenities', 'reviews')
+
+    def to_dict_partial(self, fields, include=()):
+        """to_dict_list restricted to fields and to the included relations"""
+        data = {}
+        for name in fields:
+            if name == 'owner_id':
+                data[name] = self.user_id
+            elif name == 'review_count':
+                data[name] = self.review_count or 0
+            else:
+                data[name] = getattr(self, name)
+        if 'owner' in include:
+            data['owner'] = self.owner.to_dict()
+        if 'amenities' in include:
+            data['amenities'] = [amenity.to_dict() for amenity in self.amenities]
+        if 'reviews' in include:
+            data['reviews'] = [review.to_dict() for review in self.reviews]
+        return data
+
+    def to_dict_fields(self):
+        """Own fields of to_dict_list, without the related objects"""
         return {
             'id': self.id,
             'title': self.title,
@@ -89,7 +197,70 @@ class Place(BaseModel):
             'price': self.price,
             'latitude': self.latitude,
             'longitude': self.longitude,
+            **self.rating_to_dict()
+        }
+
+    def to_dict_list(self):
+        return {
+            **self.to_dict_fields(),
             'owner': self.owner.to_dict(),
             'amenities': [amenity.to_dict() for amenity in self.amenities],
             'reviews': [review.to_dict() for review in self.reviews]
         }
+
+
+# Index servant la pagination par curseur sur (created_at, id)
+db.Index('ix_places_created_at_id', Place.created_at, Place.id)
+# Filtres et tris par prix, tri par note moyenne
+db.Index('ix_places_price_id', Place.price, Place.id)
+db.Index('ix_places_rating_score_id', Place.rating_score, Place.id)
+# Index couvrant de la recherche géographique : plage de géohash + coordonnées
+db.Index('ix_places_geohash', Place.geohash, Place.latitude, Place.longitude, Place.id)
+# Clé de l'index plein texte, attribuée par le trigger d'insertion
+db.Index('ix_places_search_id', Place.search_id, unique=True)
+
+
+@event.listens_for(Place, 'before_insert')
+def set_geohash_on_insert(mapper, connection, place):
+    place.geohash = encode_geohash(place.latitude, place.longitude)
+
+
+@event.listens_for(Place, 'before_update')
+def set_geohash_on_update(mapper, connection, place):
+    state = inspect(place)
+    if state.attrs.latitude.history.has_changes() or state.attrs.longitude.history.has_changes():
+        place.geohash = encode_geohash(place.latitude, place.longitude)
+
+
+# Recherche plein texte (SQLite FTS5) : table virtuelle à contenu externe
+# sur places.search_id, synchronisée par triggers. search_id est une colonne
+# ordinaire (un VACUUM ne la renumérote pas, contrairement au rowid implicite
+# d'une table à clé texte) ; le trigger d'insertion lui donne max + 1.
+PLACES_FTS_TRIGGERS = ('places_fts_insert', 'places_fts_delete', 'places_fts_update')
+PLACES_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS places_fts USING fts5("
+    "title, description, content='places', content_rowid='search_id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_insert AFTER INSERT ON places BEGIN "
+    "UPDATE places SET search_id = (SELECT coalesce(max(search_id), 0) + 1 FROM places) "
+    "WHERE rowid = new.rowid AND search_id IS NULL; "
+    "INSERT INTO places_fts(rowid, title, description) "
+    "SELECT search_id, title, description FROM places WHERE rowid = new.rowid; "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_delete AFTER DELETE ON places "
+    "WHEN old.search_id IS NOT NULL BEGIN "
+    "INSERT INTO places_fts(places_fts, rowid, title, description) "
+    "VALUES ('delete', old.search_id, old.title, old.description); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS places_fts_update AFTER UPDATE OF title, description ON places "
+    "WHEN old.search_id IS NOT NULL BEGIN "
+    "INSERT INTO places_fts(places_fts, rowid, title, description) "
+    "VALUES ('delete', old.search_id, old.title, old.description); "
+    "INSERT INTO places_fts(rowid, title, description) VALUES (new.search_id, new.title, new.description); "
+    "END",
+]
+
+for statement in PLACES_FTS_DDL:
+    event.listen(Place.__table__, 'after_create', db.DDL(statement).execute_if(dialect='sqlite'))
+event.listen(Place.__table__, 'after_drop',
+             db.DDL("DROP TABLE IF EXISTS places_fts").execute_if(dialect='sqlite'))
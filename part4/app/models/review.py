@@ -4,13 +4,15 @@ from sqlalchemy.orm import validates
 
 class Review(BaseModel):
 	__tablename__ = 'reviews'
+	# Un seul avis par utilisateur et par place, vérifié par la base
+	__table_args__ = (db.UniqueConstraint('place_id', 'user_id', name='unique_review_place'),)
 
 	text = db.Column(db.String(500), nullable=False)
 	rating = db.Column(db.Integer, nullable=False)
 	place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False)
-	user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+	user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
 	
-	place = db.relationship('Place', backref=db.backref('reviews', lazy='dynamic'), lazy='select')
+	place = db.relationship('Place', backref=db.backref('reviews', lazy='select'), lazy='select')
 	user = db.relationship('User', backref=db.backref('reviews', lazy='dynamic'), lazy='select')
 
 	@validates('text')
@@ -34,6 +36,21 @@ class Review(BaseModel):
 			'id': self.id,
 			'text': self.text,
 			'rating': self.rating,
-			'place_id': self.place.id,
-			'user_id': self.user.id
+			'place_id': self.place_id,
+			'user_id': self.user_id
 		}
+
+	def to_dict_with_author(self):
+		return {
+			**self.to_dict(),
+			'author': {
+				'first_name': self.user.first_name,
+				'last_name': self.user.last_name
+			}
+		}
+
+
+# Index servant la pagination par curseur sur (created_at, id)
+db.Index('ix_reviews_created_at_id', Review.created_at, Review.id)
+# Pages d'avis d'une place (/places/<id>/page) dans le même ordre
+db.Index('ix_reviews_place_created_at_id', Review.place_id, Review.created_at, Review.id)
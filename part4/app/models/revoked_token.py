@@ -0,0 +1,10 @@
+from app import db
+
+# Jetons révoqués (déconnexion), partagés par tous les workers : jti du
+# jeton et son exp (secondes epoch). Une ligne ne sert plus après exp,
+# le jeton étant refusé de toute façon : elle est purgée à la révocation suivante.
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.Float, nullable=False)
@@ -1,4 +1,4 @@
-from app import bcrypt, db
+from app import db, password_hasher
 from .basemodel import BaseModel
 import re
 from sqlalchemy.orm import validates
@@ -50,10 +50,14 @@ class User(BaseModel):
 
     def hash_password(self, password):
         """Hashes the password before storing it."""
-        return bcrypt.generate_password_hash(password).decode('utf-8')
+        return password_hasher.hash(password)
     
     def verify_password(self, password):
-        return bcrypt.check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        """True when the stored hash does not use the configured bcrypt cost."""
+        return password_hasher.needs_rehash(self.password)
 
     def add_place(self, place):
         """Add an amenity to the place."""
@@ -74,3 +78,7 @@ class User(BaseModel):
             'last_name': self.last_name,
             'email': self.email
         }
+
+
+# Index servant la pagination par curseur sur (created_at, id)
+db.Index('ix_users_created_at_id', User.created_at, User.id)
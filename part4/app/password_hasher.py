@@ -0,0 +1,111 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import BoundedSemaphore, Lock
+import time
+import bcrypt
+from flask import current_app, has_app_context
+
+# Hachage et vérification bcrypt hors du thread de la requête : un pool de
+# processus borné fait le calcul (plusieurs centaines de ms de CPU), et au-delà
+# de PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT appels en cours on
+# refuse tout de suite (503) plutôt que d'affamer les autres routes.
+# PASSWORD_HASH_WORKERS = 0 calcule dans le thread courant (tests).
+DEFAULT_LOG_ROUNDS = 12
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashes are already running or queued"""
+
+
+class _Pool:
+    def __init__(self, workers, queue_limit):
+        self.workers = workers
+        self.slots = BoundedSemaphore(workers + queue_limit)
+        self._lock = Lock()
+        self._executor = None
+
+    def run(self, function, *args):
+        if not self.slots.acquire(blocking=False):
+            raise PasswordHasherBusy('Too many password hashes in progress, retry later')
+        try:
+            try:
+                future = self._get_executor().submit(function, *args)
+            except BaseException:
+                self.slots.release()
+                raise
+            future.add_done_callback(lambda _: self.slots.release())
+            return future.result()
+        except BrokenProcessPool:
+            # Un worker tué : le prochain appel repart d'un pool neuf
+            self._reset()
+            raise PasswordHasherBusy('Password hashing workers restarting, retry later')
+
+    # Workers démarrés à la demande : rien n'est lancé tant qu'aucun mot de
+    # passe n'est haché
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PasswordHasher:
+    """Flask extension running bcrypt in a bounded process pool"""
+
+    def init_app(self, app):
+        app.config.setdefault('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+        app.config.setdefault('PASSWORD_HASH_WORKERS', 2)
+        app.config.setdefault('PASSWORD_HASH_QUEUE_LIMIT', 16)
+        workers = app.config['PASSWORD_HASH_WORKERS']
+        pool = _Pool(workers, app.config['PASSWORD_HASH_QUEUE_LIMIT']) if workers > 0 else None
+        app.extensions['password_hasher'] = pool
+
+    @staticmethod
+    def log_rounds():
+        """bcrypt cost configured for the current application"""
+        if has_app_context():
+            return current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
+        return DEFAULT_LOG_ROUNDS
+
+    def hash(self, password):
+        """Hash a password with the configured cost"""
+        salt = bcrypt.gensalt(rounds=self.log_rounds())
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        """Check a password against its bcrypt hash"""
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash):
+        """True when the hash was made with another cost than the configured one"""
+        try:
+            return int(password_hash.split('$')[2]) != self.log_rounds()
+        except (IndexError, ValueError):
+            return True
+
+    @staticmethod
+    def _run(function, *args):
+        pool = current_app.extensions.get('password_hasher') if has_app_context() else None
+        if pool is None:
+            return function(*args)
+        return pool.run(function, *args)
+
+
+def calibrate_log_rounds(target_ms, min_rounds=4, max_rounds=16):
+    """Highest bcrypt cost whose hash time stays within target_ms, with timings"""
+    chosen, timings = min_rounds, []
+    for rounds in range(min_rounds, max_rounds + 1):
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration-password', bcrypt.gensalt(rounds=rounds))
+        elapsed = (time.perf_counter() - start) * 1000
+        timings.append((rounds, elapsed))
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
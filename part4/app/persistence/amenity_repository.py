@@ -5,3 +5,10 @@ from app.persistence.repository import SQLAlchemyRepository
 class AmenityRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Amenity)
+
+    def get_existing_names(self, names):
+        """Names among names already used by an amenity, with a single query"""
+        names = [name for name in set(names) if isinstance(name, str)]
+        if not names:
+            return set()
+        return {name for name, in db.session.query(Amenity.name).filter(Amenity.name.in_(names))}
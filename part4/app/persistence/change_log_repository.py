@@ -0,0 +1,41 @@
+from app.models.change_log import ChangeLog
+from app import db
+from app.persistence.repository import SQLAlchemyRepository, clamp_limit
+from app.persistence.unit_of_work import transaction
+from sqlalchemy import func, select
+
+class ChangeLogRepository(SQLAlchemyRepository):
+    OPS = ('create', 'update', 'delete')
+
+    def __init__(self):
+        super().__init__(ChangeLog)
+
+    def record(self, entity, op, items):
+        """Append one entry per object or id of items, in the current transaction"""
+        if op not in self.OPS:
+            raise ValueError(f"op must be one of: {', '.join(self.OPS)}")
+        if any(not isinstance(item, str) and item.id is None for item in items):
+            # Objets pas encore insérés : le flush leur donne leur id
+            db.session.flush()
+        self.insert_rows([{'entity': entity, 'entity_id': item if isinstance(item, str) else item.id, 'op': op}
+                          for item in items])
+
+    def get_since(self, since=0, limit=None):
+        """Return (entries with seq > since, has_more), in seq order"""
+        limit = clamp_limit(limit)
+        entries = ChangeLog.query.filter(ChangeLog.seq > since).order_by(ChangeLog.seq).limit(limit + 1).all()
+        return entries[:limit], len(entries) > limit
+
+    def compact(self, up_to=None):
+        """Delete the entries superseded by a later entry of the same entity
+
+        Only entries with seq <= up_to are considered when up_to is given,
+        so consumers that are not far behind still see every change.
+        Returns the number of deleted entries.
+        """
+        latest = select(func.max(ChangeLog.seq)).group_by(ChangeLog.entity, ChangeLog.entity_id)
+        query = ChangeLog.query.filter(ChangeLog.seq.not_in(latest))
+        if up_to is not None:
+            query = query.filter(ChangeLog.seq <= up_to)
+        with transaction():
+            return query.delete(synchronize_session=False)
@@ -1,7 +1,224 @@
-from app.models.place import Place
+from app.models.place import Place, PLACES_FTS_DDL, PLACES_FTS_TRIGGERS
+from app.models.review import Review
+from app.models.amenities_places import AmenityPlace
 from app import db
 from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.repository import decode_cursor, encode_cursor, clamp_limit
+from app.persistence.unit_of_work import transaction
+from app.services.geo import covering_prefixes, encode_geohash, haversine_km
+from sqlalchemy import bindparam, func, text, update
+import re
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from sqlalchemy.orm.util import identity_key
 
 class PlaceRepository(SQLAlchemyRepository):
+    # "list" : une requête par relation, quel que soit le nombre de places
+    # "detail" : idem, avec en plus les auteurs des avis
+    loading_profiles = {
+        'list': (
+            joinedload(Place.owner),
+            selectinload(Place.amenities),
+            selectinload(Place.reviews),
+        ),
+        'detail': (
+            joinedload(Place.owner),
+            selectinload(Place.amenities),
+            selectinload(Place.reviews).joinedload(Review.user),
+        ),
+    }
+
     def __init__(self):
         super().__init__(Place)
+
+    # Tris acceptés par la liste : "-" = ordre décroissant
+    SORTS = {
+        'created_at': [('created_at', False)],
+        '-created_at': [('created_at', True)],
+        'price': [('price', False)],
+        '-price': [('price', True)],
+        'rating': [('rating_score', False)],
+        '-rating': [('rating_score', True)],
+    }
+
+    # Colonnes toujours chargées par sparse_profile : clé, curseur par défaut,
+    # ETag (updated_at) et propriétaire (tags du cache de réponses)
+    SPARSE_COLUMNS = ('id', 'user_id', 'created_at', 'updated_at')
+
+    def sparse_profile(self, fields, include=(), sort=None):
+        """Loader options fetching only the columns of fields and the included relations
+
+        Relations that are not included are never loaded: they keep their
+        lazy loader and the serializer does not touch them.
+        """
+        columns = set(self.SPARSE_COLUMNS)
+        for name in fields:
+            columns.update(Place.FIELD_COLUMNS[name])
+        for attr, _ in self.SORTS.get(sort, ()):
+            columns.update(('review_count', 'rating_sum') if attr == 'rating_score' else (attr,))
+        options = [load_only(*(getattr(Place, column) for column in sorted(columns)))]
+        if 'owner' in include:
+            options.append(joinedload(Place.owner))
+        if 'amenities' in include:
+            options.append(selectinload(Place.amenities))
+        if 'reviews' in include:
+            options.append(selectinload(Place.reviews))
+        return tuple(options)
+
+    def get_filtered_page(self, limit=None, cursor=None, profile=None,
+                          min_price=None, max_price=None, sort=None,
+                          amenity_ids=None, match_all=True):
+        """Return a page of places filtered by price and amenities, sorted in SQL"""
+        if sort is not None and sort not in self.SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(self.SORTS)}")
+        query = self._filter_price(self._query(profile), min_price, max_price)
+        if amenity_ids:
+            # Un EXISTS par équipement, servi par la clé primaire de amenities_places
+            exists = [db.exists().where(AmenityPlace.place_id == Place.id,
+                                        AmenityPlace.amenity_id == amenity_id)
+                      for amenity_id in amenity_ids]
+            query = query.filter(db.and_(*exists) if match_all else db.or_(*exists))
+        return self.get_page(limit, cursor, query=query, order=self.SORTS.get(sort))
+
+    def get_ids_by_price(self, min_price=None, max_price=None):
+        """Return the ids of the places priced within [min_price, max_price]"""
+        query = self._filter_price(db.session.query(Place.id), min_price, max_price)
+        return [place_id for (place_id,) in query]
+
+    @staticmethod
+    def _filter_price(query, min_price, max_price):
+        if min_price is not None:
+            query = query.filter(Place.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Place.price <= max_price)
+        return query
+
+    def search_text(self, terms, limit=None, cursor=None):
+        """Return ([(place, score)], next_cursor) ranked by BM25
+
+        The cursor holds the offset in the ranking: a text search is scored
+        per query, there is no stable key to seek on.
+        """
+        limit = clamp_limit(limit)
+        offset = 0
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+                raise ValueError("Invalid cursor")
+            offset = values[0]
+        tokens = re.findall(r'\w+', terms)
+        if not tokens:
+            raise ValueError("Search query must contain at least one word")
+        # Chaque mot est cité (pas de syntaxe FTS utilisateur), le dernier en préfixe
+        match = ' '.join(f'"{token}"' for token in tokens) + '*'
+
+        if db.engine.dialect.name == 'sqlite':
+            # bm25 : plus petit = plus pertinent ; le titre pèse 10 fois la description
+            rows = db.session.execute(text(
+                "SELECT places.id, bm25(places_fts, 10.0, 1.0) AS score "
+                "FROM places_fts JOIN places ON places.search_id = places_fts.rowid "
+                "WHERE places_fts MATCH :match ORDER BY score LIMIT :limit OFFSET :offset"
+            ), {'match': match, 'limit': limit + 1, 'offset': offset}).all()
+        else:
+            conditions = [db.or_(Place.title.ilike(f'%{token}%'), Place.description.ilike(f'%{token}%'))
+                          for token in tokens]
+            rows = db.session.query(Place.id, db.literal(0.0)).filter(*conditions) \
+                .order_by(Place.created_at, Place.id).limit(limit + 1).offset(offset).all()
+
+        next_cursor = encode_cursor([offset + limit]) if len(rows) > limit else None
+        rows = rows[:limit]
+        places = {place.id: place for place in
+                  self.model.query.filter(Place.id.in_([place_id for place_id, _ in rows]))}
+        return [(places[place_id], -score) for place_id, score in rows], next_cursor
+
+    def rebuild_search_index(self):
+        """Recreate the FTS5 table and its triggers, then re-index every place"""
+        with transaction():
+            # Table et triggers recréés : une base indexée sur l'ancienne clé est migrée
+            for trigger in PLACES_FTS_TRIGGERS:
+                db.session.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            db.session.execute(text("DROP TABLE IF EXISTS places_fts"))
+            for statement in PLACES_FTS_DDL:
+                db.session.execute(text(statement))
+            # Places insérées sans trigger (générateur, base antérieure) : search_id à la suite
+            offset = db.session.query(func.max(Place.search_id)).scalar() or 0
+            db.session.execute(text(
+                "UPDATE places SET search_id = numbered.n + :offset "
+                "FROM (SELECT id, row_number() OVER (ORDER BY created_at, id) AS n "
+                "FROM places WHERE search_id IS NULL) AS numbered WHERE places.id = numbered.id"),
+                {'offset': offset})
+            db.session.execute(text("INSERT INTO places_fts(places_fts) VALUES ('rebuild')"))
+        return Place.query.count()
+
+    def search_nearby(self, latitude, longitude, radius_km, limit):
+        """Return [(place, distance_km)] within radius_km, nearest first"""
+        prefixes = covering_prefixes(latitude, longitude, radius_km)
+        # '~' est après tous les caractères du géohash : [prefixe, prefixe~) = tout le préfixe
+        ranges = [db.and_(Place.geohash >= prefix, Place.geohash < prefix + '~') for prefix in prefixes]
+        candidates = db.session.query(Place.id, Place.latitude, Place.longitude).filter(db.or_(*ranges))
+        nearest = []
+        for place_id, place_lat, place_lon in candidates:
+            distance = haversine_km(latitude, longitude, place_lat, place_lon)
+            if distance <= radius_km:
+                nearest.append((distance, place_id))
+        nearest.sort()
+        nearest = nearest[:limit]
+        places = {place.id: place for place in
+                  self.model.query.filter(Place.id.in_([place_id for _, place_id in nearest]))}
+        return [(places[place_id], distance) for distance, place_id in nearest]
+
+    def backfill_geohashes(self, chunk_size=1000):
+        """Compute the geohash of places created before the column existed"""
+        count = 0
+        while True:
+            rows = db.session.query(Place.id, Place.latitude, Place.longitude) \
+                .filter(Place.geohash.is_(None)).limit(chunk_size).all()
+            if not rows:
+                return count
+            with transaction():
+                db.session.execute(update(Place), [
+                    {'id': place_id, 'geohash': encode_geohash(lat, lon)} for place_id, lat, lon in rows
+                ])
+            count += len(rows)
+
+    def insert_amenity_links(self, rows):
+        """Insert (place_id, amenity_id) rows of amenities_places with one executemany"""
+        if rows:
+            db.session.execute(AmenityPlace.__table__.insert(), rows)
+
+    def add_rating_deltas(self, deltas):
+        """Add {place_id: {column: delta}} to the review aggregates, one executemany UPDATE
+
+        Each column is updated as col = col + delta so concurrent writers
+        cannot lose an update; the places held by the session are expired.
+        """
+        if not deltas:
+            return
+        columns = ['review_count', 'rating_sum'] + [f'rating_{rating}_count' for rating in range(1, 6)]
+        table = Place.__table__
+        statement = update(table).where(table.c.id == bindparam('place_id')).values(
+            **{column: table.c[column] + bindparam(f'delta_{column}') for column in columns})
+        db.session.execute(statement, [
+            {'place_id': place_id, **{f'delta_{column}': values.get(column, 0) for column in columns}}
+            for place_id, values in deltas.items()])
+        for place_id in deltas:
+            place = db.session.identity_map.get(identity_key(Place, place_id))
+            if place is not None:
+                db.session.expire(place)
+
+    def recompute_review_aggregates(self):
+        """Rebuild every place's review aggregates with a single GROUP BY"""
+        empty = {'review_count': 0, 'rating_sum': 0,
+                 **{f'rating_{rating}_count': 0 for rating in range(1, 6)}}
+        aggregates = {}
+        rows = db.session.query(Review.place_id, Review.rating, func.count(Review.id)) \
+            .group_by(Review.place_id, Review.rating)
+        for place_id, rating, count in rows:
+            values = aggregates.setdefault(place_id, {'id': place_id, **empty})
+            values['review_count'] += count
+            values['rating_sum'] += rating * count
+            values[f'rating_{rating}_count'] += count
+        with transaction():
+            db.session.execute(update(Place).values(**empty))
+            if aggregates:
+                db.session.execute(update(Place), list(aggregates.values()))
+        return len(aggregates)
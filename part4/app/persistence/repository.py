@@ -1,5 +1,42 @@
 from abc import ABC, abstractmethod
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+import json
 from app import db
+from app.persistence.unit_of_work import commit
+
+# Pagination par curseur (keyset) sur (created_at, id) :
+# aucune requête ne peut ramener plus de MAX_PAGE_SIZE lignes.
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Créations en lot : un INSERT executemany et une transaction par paquet
+BULK_CHUNK_SIZE = 500
+# Exports : lignes lues par paquets, sans charger la table en mémoire
+EXPORT_BATCH_SIZE = 1000
+
+
+def clamp_limit(limit):
+    """Return a page size between 1 and MAX_PAGE_SIZE"""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if not isinstance(limit, int) or limit < 1:
+        raise ValueError("Limit must be a positive integer")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page into an opaque string"""
+    raw = json.dumps([{'dt': v.isoformat()} if isinstance(v, datetime) else v for v in values])
+    return urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+        return [datetime.fromisoformat(v['dt']) if isinstance(v, dict) else v for v in values]
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise ValueError("Invalid cursor")
 
 class Repository(ABC):
     @abstractmethod
@@ -10,10 +47,18 @@ class Repository(ABC):
     def get(self, obj_id):
         pass
 
+    @abstractmethod
+    def get_many(self, obj_ids):
+        pass
+
     @abstractmethod
     def get_all(self):
         pass
 
+    @abstractmethod
+    def get_page(self, limit=None, cursor=None):
+        pass
+
     @abstractmethod
     def update(self, obj_id, data):
         pass
@@ -37,9 +82,26 @@ class InMemoryRepository(Repository):
     def get(self, obj_id):
         return self._storage.get(obj_id)
 
+    def get_many(self, obj_ids):
+        obj_ids = list(dict.fromkeys(obj_ids))
+        return ([self._storage[obj_id] for obj_id in obj_ids if obj_id in self._storage],
+                [obj_id for obj_id in obj_ids if obj_id not in self._storage])
+
     def get_all(self):
         return list(self._storage.values())
 
+    def get_page(self, limit=None, cursor=None):
+        limit = clamp_limit(limit)
+        objs = sorted(self._storage.values(), key=lambda obj: (obj.created_at, obj.id))
+        if cursor:
+            last = tuple(decode_cursor(cursor))
+            objs = [obj for obj in objs if (obj.created_at, obj.id) > last]
+        page = objs[:limit]
+        next_cursor = None
+        if len(objs) > limit:
+            next_cursor = encode_cursor([page[-1].created_at, page[-1].id])
+        return page, next_cursor
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
@@ -54,32 +116,129 @@ class InMemoryRepository(Repository):
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
     
 class SQLAlchemyRepository(Repository):
+    # Profils de chargement nommés : options de chargement des relations
+    loading_profiles = {}
+
     def __init__(self, model):
         self.model = model
 
+    def _query(self, profile=None):
+        """Return the base query with the loader options of a profile
+
+        profile is either the name of one of loading_profiles or a sequence
+        of loader options built by the caller.
+        """
+        if profile is None:
+            return self.model.query
+        options = self.loading_profiles[profile] if isinstance(profile, str) else profile
+        return self.model.query.options(*options)
+
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
-
-    def get(self, obj_id):
-        return self.model.query.get(obj_id)
+        commit()
+
+    def get(self, obj_id, profile=None):
+        if profile is None:
+            return self.model.query.get(obj_id)
+        return self._query(profile).filter(self.model.id == obj_id).first()
+
+    def get_many(self, obj_ids, profile=None):
+        """Return (objects in the order of obj_ids, missing ids) with a single IN query"""
+        obj_ids = list(dict.fromkeys(obj_ids))
+        found = {}
+        if obj_ids:
+            found = {obj.id: obj for obj in self._query(profile).filter(self.model.id.in_(obj_ids))}
+        return ([found[obj_id] for obj_id in obj_ids if obj_id in found],
+                [obj_id for obj_id in obj_ids if obj_id not in found])
 
     def get_all(self):
         return self.model.query.all()
 
+    def iter_since(self, since=None, batch_size=EXPORT_BATCH_SIZE):
+        """Yield every object updated at or after since, in (updated_at, id) order
+
+        Rows are fetched batch_size at a time (yield_per) and nothing keeps
+        a reference to the objects already yielded, so memory stays flat
+        whatever the size of the table.
+        """
+        query = self.model.query
+        if since is not None:
+            query = query.filter(self.model.updated_at >= since)
+        query = query.order_by(self.model.updated_at, self.model.id).yield_per(batch_size)
+        for obj in query:
+            yield obj
+            db.session.expunge(obj)
+
+    def insert_rows(self, rows):
+        """Insert already validated column dicts with one executemany INSERT
+
+        No ORM object is built and no mapper event fires: the caller fills
+        every computed column. Column defaults still apply.
+        """
+        if rows:
+            db.session.execute(self.model.__table__.insert(), rows)
+
+    def get_version(self, query=None):
+        """Return (max updated_at, row count), a cheap version of the collection"""
+        if query is None:
+            query = db.session.query(self.model)
+        return query.with_entities(db.func.max(self.model.updated_at), db.func.count(self.model.id)).one()
+
+    def get_page(self, limit=None, cursor=None, query=None, profile=None, order=None):
+        """Return (objects, next_cursor) in keyset order
+
+        order is a list of (attribute name, descending) pairs, (created_at,
+        ascending) by default; id is appended as the tie-breaker, in the
+        direction of the first key so a single index scan serves the order.
+        """
+        limit = clamp_limit(limit)
+        if query is None:
+            query = self._query(profile)
+        order = list(order or [('created_at', False)])
+        keys = order + [('id', order[0][1])]
+        columns = [(getattr(self.model, name), descending) for name, descending in keys]
+        if cursor:
+            query = query.filter(self._after(columns, decode_cursor(cursor)))
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        order_by = [column.desc() if descending else column for column, descending in columns]
+        objs = query.order_by(*order_by).limit(limit + 1).all()
+        next_cursor = None
+        if len(objs) > limit:
+            objs = objs[:limit]
+            next_cursor = encode_cursor([getattr(objs[-1], name) for name, _ in keys])
+        return objs, next_cursor
+
+    @staticmethod
+    def _after(columns, values):
+        """Keyset predicate: rows strictly after values in the given order"""
+        if len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+        for (column, _), value in zip(columns, values):
+            expected = column.type.python_type
+            if expected is float:
+                expected = (int, float)
+            if not isinstance(value, expected) or isinstance(value, bool):
+                raise ValueError("Invalid cursor")
+        clauses = []
+        for i, (column, descending) in enumerate(columns):
+            equal = [columns[j][0] == values[j] for j in range(i)]
+            beyond = column < values[i] if descending else column > values[i]
+            clauses.append(db.and_(*equal, beyond))
+        return db.or_(*clauses)
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-            db.session.commit()
+            commit()
         return obj
 
     def delete(self, obj_id):
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
-            db.session.commit()
+            commit()
 
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter_by(**{attr_name: attr_value}).first()
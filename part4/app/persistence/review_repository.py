@@ -1,7 +1,64 @@
 from app.models.review import Review
+from app.models.user import User
 from app import db
 from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import commit
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+
+UNIQUE_REVIEW_PLACE = next(constraint for constraint in Review.__table__.constraints
+                           if constraint.name == 'unique_review_place')
+
+
+def violates(error, constraint):
+    """True when the IntegrityError was raised by this unique constraint"""
+    diag = getattr(error.orig, 'diag', None)
+    if getattr(diag, 'constraint_name', None):
+        # PostgreSQL nomme la contrainte
+        return diag.constraint_name == constraint.name
+    # SQLite ne donne que les colonnes : "UNIQUE constraint failed: reviews.place_id, reviews.user_id"
+    message = str(error.orig)
+    columns = ', '.join(f'{constraint.table.name}.{column.name}' for column in constraint.columns)
+    return constraint.name in message or message.endswith(columns)
 
 class ReviewRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Review)
+
+    def create(self, review_data):
+        """Create and insert a review; the unique_review_place index rejects duplicates
+
+        The review is built and inserted in a savepoint: a duplicate only
+        undoes this insert, not the rest of the enclosing unit of work.
+        """
+        try:
+            with db.session.begin_nested():
+                # Construit dans le savepoint : son annulation défait aussi les
+                # ajouts à user.reviews / place.reviews faits par les backrefs
+                review = Review(**review_data)
+                db.session.add(review)
+        except IntegrityError as e:
+            if violates(e, UNIQUE_REVIEW_PLACE):
+                raise KeyError('You have already reviewed this place.')
+            raise
+        commit()
+        return review
+
+    def get_place_version(self, place_id):
+        """Version of the reviews of one place (unique_review_place index)"""
+        return self.get_version(db.session.query(Review).filter(Review.place_id == place_id))
+
+    def get_place_page(self, place_id, limit=None, cursor=None):
+        """Page of the reviews of one place, authors' names loaded by the same query"""
+        query = Review.query.filter(Review.place_id == place_id).options(
+            joinedload(Review.user).load_only(User.first_name, User.last_name))
+        return self.get_page(limit, cursor, query=query)
+
+    def get_reviewed_place_ids(self, user_id, place_ids):
+        """Ids among place_ids that user_id has already reviewed (unique_review_place index)"""
+        place_ids = [place_id for place_id in set(place_ids) if place_id is not None]
+        if not place_ids:
+            return set()
+        query = db.session.query(Review.place_id).filter(Review.user_id == user_id,
+                                                          Review.place_id.in_(place_ids))
+        return {place_id for place_id, in query}
@@ -0,0 +1,18 @@
+from app.models.revoked_token import RevokedToken
+from app import db
+from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.unit_of_work import transaction
+import time
+
+class RevokedTokenRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(RevokedToken)
+
+    def revoke(self, jti, expires_at):
+        """Record a revoked token and drop the entries of expired tokens"""
+        with transaction():
+            RevokedToken.query.filter(RevokedToken.expires_at <= time.time()).delete(synchronize_session=False)
+            db.session.merge(RevokedToken(jti=jti, expires_at=expires_at))
+
+    def is_revoked(self, jti):
+        return db.session.get(RevokedToken, jti) is not None
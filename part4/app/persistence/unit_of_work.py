@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+from functools import wraps
+from app import db
+
+# Unité de travail : toutes les écritures d'une opération de la façade
+# partagent une seule transaction (un flush et un commit par requête).
+
+
+def in_transaction():
+    """Return True when a unit of work is open on the current session"""
+    return db.session.info.get('unit_of_work_depth', 0) > 0
+
+
+def commit():
+    """Commit the session, unless a unit of work will commit it later"""
+    if not in_transaction():
+        db.session.commit()
+
+
+def after_commit(callback):
+    """Run callback once the current unit of work has committed
+
+    Outside a unit of work the writes are already committed: it runs now.
+    Callbacks of a unit of work that rolls back are dropped.
+    """
+    if in_transaction():
+        db.session.info.setdefault('after_commit', []).append(callback)
+    else:
+        callback()
+
+
+def after_rollback(callback):
+    """Run callback if the current unit of work rolls back
+
+    Outside a unit of work there is nothing left to roll back: it is ignored.
+    """
+    if in_transaction():
+        db.session.info.setdefault('after_rollback', []).append(callback)
+
+
+@contextmanager
+def transaction():
+    """Commit once at the end of the outermost block, roll back on error"""
+    session = db.session
+    depth = session.info.get('unit_of_work_depth', 0)
+    session.info['unit_of_work_depth'] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+            session.info.pop('after_commit', None)
+            for callback in session.info.pop('after_rollback', []):
+                callback()
+        raise
+    finally:
+        session.info['unit_of_work_depth'] = depth
+    if depth == 0:
+        session.info.pop('after_rollback', None)
+        for callback in session.info.pop('after_commit', []):
+            callback()
+
+
+def transactional(method):
+    """Run a facade method inside a unit of work"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with transaction():
+            return method(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,123 @@
+from collections import Counter
+import os
+import sys
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Mode test : compte les requêtes SQL de chaque requête HTTP, repère une même
+# requête rejouée avec des paramètres différents (N+1) et vérifie le budget
+# déclaré sur la ressource avec @query_budget(n). Un dépassement lève
+# QueryBudgetExceeded, qui fait échouer le test (TESTING propage l'erreur).
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+TEST_DIR = os.path.join(APP_DIR, 'test_')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a request runs too many, or repeated, SQL statements"""
+
+
+def query_budget(max_queries):
+    """Declare the maximum number of SQL statements of a resource method"""
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def _call_site():
+    """Innermost application frames running the statement"""
+    sites = []
+    frame = sys._getframe(1)
+    while frame is not None and len(sites) < 3:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__ and not filename.startswith(TEST_DIR):
+            sites.append(f'{os.path.relpath(filename, os.path.dirname(APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return ' <- '.join(sites) or 'outside the application'
+
+
+class _Frame:
+    def __init__(self):
+        self.count = 0
+        self.parameters = {}
+        self.sites = {}
+
+    def record(self, statement, parameters):
+        self.count += 1
+        self.parameters.setdefault(statement, set()).add(repr(parameters))
+        self.sites.setdefault(statement, Counter())[_call_site()] += 1
+
+    def repeated(self, limit):
+        """Statements run with more than `limit` different parameter sets"""
+        return [(statement, len(params)) for statement, params in self.parameters.items() if len(params) > limit]
+
+    def report(self, title, statements):
+        lines = [title]
+        for statement, count in statements:
+            lines.append(f'  {count}x {" ".join(statement.split())[:200]}')
+            for site, calls in self.sites[statement].most_common(3):
+                lines.append(f'      {calls}x {site}')
+        return '\n'.join(lines)
+
+
+class QueryBudget:
+    """Flask extension enforcing SQL statement budgets in tests"""
+
+    def init_app(self, app):
+        if not app.config.get('QUERY_BUDGET_ENABLED', False):
+            return
+        app.extensions['query_budget'] = self
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        _listen_to_engines()
+
+    # Pile par contexte d'application : les sous-requêtes d'un batch
+    # partagent g et ne comptent que pour elles-mêmes
+    @staticmethod
+    def _before_request():
+        g.setdefault('query_budget_frames', []).append(_Frame())
+
+    @staticmethod
+    def _after_request(response):
+        frames = g.get('query_budget_frames')
+        if not frames:
+            return response
+        frame = frames.pop()
+        endpoint = f'{request.method} {request.url_rule.rule if request.url_rule else request.path}'
+        budget = _declared_budget()
+        if budget is not None and frame.count > budget:
+            statements = sorted(((statement, sum(sites.values())) for statement, sites in frame.sites.items()),
+                                key=lambda item: -item[1])
+            raise QueryBudgetExceeded(frame.report(
+                f'{endpoint} ran {frame.count} SQL statements, budget is {budget}', statements))
+        repeated = frame.repeated(current_app.config.get('QUERY_REPEAT_LIMIT', 3))
+        if repeated:
+            raise QueryBudgetExceeded(frame.report(
+                f'{endpoint} repeats the same statement with different parameters (N+1)', repeated))
+        return response
+
+
+def _declared_budget():
+    """Budget of the resource method handling the current request, if any"""
+    view = current_app.view_functions.get(request.endpoint)
+    resource = getattr(view, 'view_class', None)
+    method = getattr(resource, request.method.lower(), None)
+    return getattr(method, 'query_budget', None)
+
+
+_listening = False
+
+
+def _listen_to_engines():
+    global _listening
+    if _listening:
+        return
+    _listening = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            frames = g.get('query_budget_frames')
+            if frames:
+                frames[-1].record(statement, parameters)
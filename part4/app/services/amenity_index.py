@@ -0,0 +1,172 @@
+from threading import RLock
+from flask import current_app
+from sqlalchemy import func, inspect
+from app import db
+from app.models.amenities_places import AmenityPlace
+from app.models.change_log import ChangeLog
+from app.models.place import Place
+from app.persistence.unit_of_work import in_transaction
+
+# Index inversé des équipements : amenity_id -> bitmap des places.
+# Chaque place reçoit un numéro de ligne dans l'ordre (created_at, id) ;
+# une bitmap est un entier Python dont le bit n vaut 1 si la place n
+# possède l'équipement. ET / OU entre filtres = & / | entre entiers.
+# L'index vit dans le processus mais suit change_log : avant chaque
+# recherche, les places créées, modifiées ou supprimées depuis le dernier
+# seq lu (par n'importe quel worker) sont rechargées depuis la base.
+# SQLite sérialise les écritures, seq suit donc l'ordre des commits.
+REFRESH_CHUNK_SIZE = 500
+
+
+class AmenityFacetIndex:
+    def __init__(self):
+        self._lock = RLock()
+        self._built = False
+        self._seq = 0
+        self._rows = {}
+        self._place_ids = []
+        self._places = 0
+        self._bitmaps = {}
+
+    def build(self):
+        """Load every place and amenity link, then follow the change log from there"""
+        with self._lock:
+            if self._built:
+                return
+            # seq lu avant l'instantané : les changements qu'il contient déjà
+            # seront rejoués au prochain refresh, sans effet
+            self._seq = db.session.query(func.max(ChangeLog.seq)).scalar() or 0
+            for (place_id,) in db.session.query(Place.id).order_by(Place.created_at, Place.id):
+                self._append(place_id)
+            for place_id, amenity_id in db.session.query(AmenityPlace.place_id, AmenityPlace.amenity_id):
+                self._set(place_id, amenity_id)
+            self._built = True
+
+    def refresh(self):
+        """Apply the place changes committed since the last change log entry read"""
+        if in_transaction():
+            # La session voit ses propres écritures non validées : rattrapage au prochain appel
+            self.build()
+            return
+        with self._lock:
+            if not self._built:
+                self.build()
+                return
+            entries = db.session.query(ChangeLog.seq, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op) \
+                .filter(ChangeLog.seq > self._seq).order_by(ChangeLog.seq).all()
+            if not entries:
+                return
+            self._seq = entries[-1].seq
+            # Dernière opération de chaque place : seul l'état courant compte
+            changed = {entry.entity_id: entry.op for entry in entries if entry.entity == 'places'}
+            for place_id, op in changed.items():
+                if op == 'delete':
+                    self._remove(place_id)
+            live = [place_id for place_id, op in changed.items() if op != 'delete']
+            for start in range(0, len(live), REFRESH_CHUNK_SIZE):
+                self._reload(live[start:start + REFRESH_CHUNK_SIZE])
+
+    def _reload(self, place_ids):
+        rows = db.session.query(Place.id, AmenityPlace.amenity_id) \
+            .outerjoin(AmenityPlace, AmenityPlace.place_id == Place.id) \
+            .filter(Place.id.in_(place_ids)).order_by(Place.created_at, Place.id).all()
+        for place_id in dict.fromkeys(place_id for place_id, _ in rows):
+            if place_id in self._rows:
+                self._clear(self._rows[place_id])
+                self._places |= 1 << self._rows[place_id]
+            else:
+                self._append(place_id)
+        for place_id, amenity_id in rows:
+            if amenity_id is not None:
+                self._set(place_id, amenity_id)
+
+    def _append(self, place_id):
+        row = len(self._place_ids)
+        self._rows[place_id] = row
+        self._place_ids.append(place_id)
+        self._places |= 1 << row
+        return row
+
+    def _set(self, place_id, amenity_id):
+        row = self._rows.get(place_id)
+        if row is not None:
+            self._bitmaps[amenity_id] = self._bitmaps.get(amenity_id, 0) | (1 << row)
+
+    def _clear(self, row):
+        mask = ~(1 << row)
+        self._places &= mask
+        for amenity_id in self._bitmaps:
+            self._bitmaps[amenity_id] &= mask
+
+    def _remove(self, place_id):
+        """Clear a deleted place; its row number is kept for open cursors"""
+        row = self._rows.get(place_id)
+        if row is not None:
+            self._clear(row)
+
+    def match(self, amenity_ids, match_all=True):
+        """Bitmap of the places having all (or any) of the amenities"""
+        self.refresh()
+        with self._lock:
+            bitmaps = [self._bitmaps.get(amenity_id, 0) for amenity_id in amenity_ids]
+            if not bitmaps:
+                return self._places
+            result = bitmaps[0]
+            for bitmap in bitmaps[1:]:
+                result = result & bitmap if match_all else result | bitmap
+            return result & self._places
+
+    def bitmap_of(self, place_ids):
+        """Bitmap of the given places, for combining with a SQL filter"""
+        self.build()
+        with self._lock:
+            bitmap = 0
+            for place_id in place_ids:
+                row = self._rows.get(place_id)
+                if row is not None:
+                    bitmap |= 1 << row
+            return bitmap & self._places
+
+    def facet_counts(self, bitmap):
+        """Number of matching places that also have each amenity"""
+        self.build()
+        with self._lock:
+            return {amenity_id: (amenity_bitmap & bitmap).bit_count()
+                    for amenity_id, amenity_bitmap in self._bitmaps.items()}
+
+    def page(self, bitmap, after_place_id=None, limit=20):
+        """Return (place ids, has_more) of the next matching rows in creation order"""
+        with self._lock:
+            start = 0
+            if after_place_id is not None:
+                if after_place_id not in self._rows:
+                    raise ValueError("Invalid cursor")
+                start = self._rows[after_place_id] + 1
+            remaining = bitmap >> start
+            place_ids = []
+            while remaining and len(place_ids) < limit:
+                low_bit = remaining & -remaining
+                offset = low_bit.bit_length() - 1
+                place_ids.append(self._place_ids[start + offset])
+                remaining >>= offset + 1
+                start += offset + 1
+            return place_ids, remaining != 0
+
+
+def get_amenity_index():
+    """Return the facet index of the current application"""
+    index = current_app.extensions.get('amenity_facet_index')
+    if index is None:
+        index = current_app.extensions.setdefault('amenity_facet_index', AmenityFacetIndex())
+    return index
+
+
+def init_amenity_index(app):
+    """Build the facet index at startup when AMENITY_INDEX_EAGER is set and the tables exist"""
+    if not app.config.get('AMENITY_INDEX_EAGER', False):
+        return
+    with app.app_context():
+        tables = inspect(db.engine)
+        # Base pas encore créée (premier lancement) : construction au premier usage
+        if all(tables.has_table(name) for name in ('places', 'amenities_places', 'change_log')):
+            get_amenity_index().build()
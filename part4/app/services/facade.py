@@ -1,3 +1,6 @@
+import uuid
+from sqlalchemy.exc import SQLAlchemyError
+from app import response_cache
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
@@ -7,6 +10,24 @@ from app.persistence.user_repository import UserRepository
 from app.persistence.amenity_repository import AmenityRepository
 from app.persistence.place_repository import PlaceRepository
 from app.persistence.review_repository import ReviewRepository
+from app.persistence.change_log_repository import ChangeLogRepository
+from app.persistence.revoked_token_repository import RevokedTokenRepository
+from app.persistence.repository import BULK_CHUNK_SIZE, clamp_limit, decode_cursor, encode_cursor
+from app.persistence.unit_of_work import after_commit, after_rollback, in_transaction, transaction, transactional
+from app.services.amenity_index import get_amenity_index
+from app.services.geo import encode_geohash
+
+# Créations en lot : champs acceptés pour chaque élément et champs obligatoires
+BULK_FIELDS = {
+    Place: ('title', 'description', 'price', 'latitude', 'longitude'),
+    Amenity: ('name',),
+    Review: ('text', 'rating', 'place_id'),
+}
+BULK_REQUIRED = {
+    Place: ('title', 'price', 'latitude', 'longitude'),
+    Amenity: ('name',),
+    Review: ('text', 'rating', 'place_id'),
+}
 
 class HBnBFacade:
     def __init__(self):
@@ -14,41 +35,88 @@ class HBnBFacade:
         self.amenity_repo = AmenityRepository()
         self.place_repo = PlaceRepository()
         self.review_repo = ReviewRepository()
+        self.change_log_repo = ChangeLogRepository()
+        self.revoked_token_repo = RevokedTokenRepository()
+
+    def _invalidate(self, *tags):
+        """Drop the cached responses carrying these tags once the writes commit or roll back"""
+        invalidate = lambda: response_cache.invalidate(*tags)
+        after_commit(invalidate)
+        # Une réponse lue pendant la transaction a pu voir les écritures annulées
+        after_rollback(invalidate)
+
+    def _log(self, entity, op, *items):
+        """Append the change of these objects or ids to change_log, in the same transaction"""
+        self.change_log_repo.record(entity, op, items)
 
     # USER
+    @transactional
     def create_user(self, user_data):
         user = User(**user_data)
         self.user_repo.add(user)
+        self._log('users', 'create', user)
+        self._invalidate('users')
         return user
     
-    def get_users(self):
-        return self.user_repo.get_all()
+    def get_users(self, limit=None, cursor=None):
+        return self.user_repo.get_page(limit, cursor)
 
     def get_user(self, user_id):
         return self.user_repo.get(user_id)
 
+    def get_users_by_ids(self, user_ids):
+        return self.user_repo.get_many(user_ids)
+
+    def get_users_version(self):
+        return [self.user_repo.get_version()]
+
     def get_user_by_email(self, email):
         return self.user_repo.get_by_attribute('email', email)
     
+    @transactional
     def update_user(self, user_id, user_data):
-        self.user_repo.update(user_id, user_data)
+        if self.user_repo.update(user_id, user_data):
+            self._log('users', 'update', user_id)
+        self._invalidate(f'user:{user_id}')
+
+    # TOKENS
+    def revoke_token(self, jti, expires_at):
+        self.revoked_token_repo.revoke(jti, expires_at)
+
+    def is_token_revoked(self, jti):
+        return self.revoked_token_repo.is_revoked(jti)
     
     # AMENITY
+    @transactional
     def create_amenity(self, amenity_data):
         amenity = Amenity(**amenity_data)
         self.amenity_repo.add(amenity)
+        self._log('amenities', 'create', amenity)
+        self._invalidate('amenities')
         return amenity
 
     def get_amenity(self, amenity_id):
         return self.amenity_repo.get(amenity_id)
 
-    def get_all_amenities(self):
-        return self.amenity_repo.get_all()
+    def get_amenities_by_ids(self, amenity_ids):
+        return self.amenity_repo.get_many(amenity_ids)
 
+    def get_all_amenities(self, limit=None, cursor=None):
+        return self.amenity_repo.get_page(limit, cursor)
+
+    def get_amenities_version(self):
+        return [self.amenity_repo.get_version()]
+
+    @transactional
     def update_amenity(self, amenity_id, amenity_data):
-        return self.amenity_repo.update(amenity_id, amenity_data)
+        self._invalidate(f'amenity:{amenity_id}')
+        amenity = self.amenity_repo.update(amenity_id, amenity_data)
+        if amenity:
+            self._log('amenities', 'update', amenity_id)
+        return amenity
 
     # PLACE
+    @transactional
     def create_place(self, place_data, owner_id):
         user = self.user_repo.get_by_attribute('id', owner_id)
         if not user:
@@ -64,25 +132,104 @@ class HBnBFacade:
                     raise KeyError('Invalid input data')
         place = Place(**place_data)
         self.place_repo.add(place)
-        user.add_place(place)
-        if amenities_objects:
-            for amenity in amenities_objects:
-                place.add_amenity(amenity)
+        for amenity in amenities_objects:
+            place.add_amenity(amenity)
+        self._log('places', 'create', place)
+        self._invalidate('places')
         return place
 
-    def get_place(self, place_id):
-        return self.place_repo.get(place_id)
+    def get_place(self, place_id, profile=None):
+        return self.place_repo.get(place_id, profile)
+
+    def get_places_by_ids(self, place_ids, profile=None):
+        return self.place_repo.get_many(place_ids, profile)
+
+    def sparse_place_profile(self, fields=None, include=(), sort=None):
+        """Return (fields, loader options) for ?fields=&include=, all fields when fields is None"""
+        fields = list(Place.FIELD_COLUMNS) if fields is None else fields
+        unknown = [name for name in fields if name not in Place.FIELD_COLUMNS]
+        if unknown:
+            raise ValueError(f"fields must be among: {', '.join(Place.FIELD_COLUMNS)}")
+        if any(name not in Place.RELATIONS for name in include):
+            raise ValueError(f"include must be among: {', '.join(Place.RELATIONS)}")
+        return fields, self.place_repo.sparse_profile(fields, include, sort)
+
+    def get_all_places(self, limit=None, cursor=None, profile=None, **filters):
+        return self.place_repo.get_filtered_page(limit, cursor, profile, **filters)
 
-    def get_all_places(self):
-        return self.place_repo.get_all()
+    def get_places_version(self):
+        # Les places embarquent leur propriétaire, leurs équipements et leurs
+        # avis : modifier le texte d'un avis ne touche pas updated_at de la place
+        return [self.place_repo.get_version(), self.user_repo.get_version(),
+                self.amenity_repo.get_version(), self.review_repo.get_version()]
 
+    def get_places_by_amenities(self, amenity_ids, match_all=True, limit=None, cursor=None,
+                                profile=None, **filters):
+        """Return (places, next_cursor, facet counts) for an amenity filter"""
+        index = get_amenity_index()
+        bitmap = index.match(amenity_ids, match_all)
+        if filters.get('min_price') is not None or filters.get('max_price') is not None:
+            # Les compteurs portent sur les mêmes places que la liste, prix compris
+            bitmap &= index.bitmap_of(self.place_repo.get_ids_by_price(filters.get('min_price'),
+                                                                       filters.get('max_price')))
+        facets = index.facet_counts(bitmap)
+        if any(value is not None for value in filters.values()):
+            # Filtres de prix ou tri : la requête SQL garde la main (EXISTS indexés)
+            places, next_cursor = self.place_repo.get_filtered_page(
+                limit, cursor, profile, amenity_ids=amenity_ids, match_all=match_all, **filters)
+            return places, next_cursor, facets
+        after_place_id = None
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 2:
+                raise ValueError("Invalid cursor")
+            after_place_id = values[1]
+        place_ids, has_more = index.page(bitmap, after_place_id, clamp_limit(limit))
+        places, _ = self.place_repo.get_many(place_ids, profile)
+        next_cursor = None
+        if has_more and places:
+            next_cursor = encode_cursor([places[-1].created_at, places[-1].id])
+        return places, next_cursor, facets
+
+    def search_places(self, terms, limit=None, cursor=None):
+        return self.place_repo.search_text(terms, limit, cursor)
+
+    def search_places_nearby(self, latitude, longitude, radius_km, limit=None):
+        return self.place_repo.search_nearby(latitude, longitude, radius_km, clamp_limit(limit))
+
+    @transactional
     def update_place(self, place_id, place_data):
-        return self.place_repo.update(place_id, place_data)
+        self._invalidate('places', f'place:{place_id}')
+        place = self.place_repo.update(place_id, place_data)
+        if place:
+            self._log('places', 'update', place_id)
+        return place
+
+    @transactional
+    def add_place_amenities(self, place_id, amenity_ids):
+        place = self.place_repo.get(place_id)
+        if not place:
+            raise KeyError('Place not found')
+        # Tous les équipements en une requête, inconnus signalés par id
+        amenities, missing = self.amenity_repo.get_many(amenity_ids)
+        if missing:
+            raise ValueError(f"Unknown amenities: {', '.join(missing)}")
+        for amenity in amenities:
+            if amenity not in place.amenities:
+                place.add_amenity(amenity)
+        self._log('places', 'update', place_id)
+        self._invalidate('places', f'place:{place_id}')
+        return place
     
+    @transactional
     def delete_place(self, place_id):
+        if self.place_repo.get(place_id):
+            self._log('places', 'delete', place_id)
         self.place_repo.delete(place_id)
+        self._invalidate('places', f'place:{place_id}')
 
     # REVIEWS
+    @transactional
     def create_review(self, review_data, user_id):
         user = self.user_repo.get(user_id)
         if not user:
@@ -95,24 +242,38 @@ class HBnBFacade:
         del review_data['place_id']
         review_data['place'] = place
 
-        if place.owner.id == user.id:
+        if place.user_id == user.id:
             raise KeyError("You cannot review your own place.")
 
-        for r in place.reviews:
-            if r.user.id == user.id:
-                raise KeyError('You have already reviewed this place.')
-
-        review = Review(**review_data)
-        self.review_repo.add(review)
-        user.add_review(review)
-        place.add_review(review)
+        # Review(user=..., place=...) alimente déjà user.reviews et place.reviews
+        review = self.review_repo.create(review_data)
+        place.update_rating_aggregates(new_rating=review.rating)
+        self._log('reviews', 'create', review)
+        self._log('places', 'update', place.id)
+        self._invalidate('reviews', 'places', f'place:{place.id}')
         return review
         
     def get_review(self, review_id):
         return self.review_repo.get(review_id)
 
-    def get_all_reviews(self):
-        return self.review_repo.get_all()
+    def get_reviews_by_ids(self, review_ids):
+        return self.review_repo.get_many(review_ids)
+
+    def get_all_reviews(self, limit=None, cursor=None):
+        return self.review_repo.get_page(limit, cursor)
+
+    def get_reviews_version(self, place_id=None):
+        if place_id is not None:
+            return [self.review_repo.get_place_version(place_id)]
+        return [self.review_repo.get_version()]
+
+    def get_place_reviews_page(self, place_id, limit=None, cursor=None):
+        return self.review_repo.get_place_page(place_id, limit, cursor)
+
+    def get_place_page_version(self, place_id):
+        # La page embarque le propriétaire, les équipements et le nom des auteurs
+        return [self.review_repo.get_place_version(place_id), self.user_repo.get_version(),
+                self.amenity_repo.get_version()]
 
     def get_reviews_by_place(self, place_id):
         place = self.place_repo.get(place_id)
@@ -120,15 +281,192 @@ class HBnBFacade:
             raise KeyError('Place not found')
         return place.reviews
 
+    @transactional
     def update_review(self, review_id, review_data):
-        return self.review_repo.update(review_id, review_data)
+        review = self.review_repo.get(review_id)
+        if not review:
+            return None
+        old_place_id, old_rating = review.place_id, review.rating
+        self.review_repo.update(review_id, review_data)
+        if review.place_id == old_place_id:
+            review.place.update_rating_aggregates(old_rating, review.rating)
+        else:
+            self.place_repo.get(old_place_id).update_rating_aggregates(old_rating=old_rating)
+            self.place_repo.get(review.place_id).update_rating_aggregates(new_rating=review.rating)
+        self._log('reviews', 'update', review_id)
+        self._log('places', 'update', *dict.fromkeys((old_place_id, review.place_id)))
+        self._invalidate(f'review:{review_id}', 'places', f'place:{old_place_id}', f'place:{review.place_id}')
+        return review
 
+    @transactional
     def delete_review(self, review_id):
         review = self.review_repo.get(review_id)
-        
-        user = self.user_repo.get(review.user.id)
-        place = self.place_repo.get(review.place.id)
-
-        user.delete_review(review)
-        place.delete_review(review)
+        if review:
+            review.place.update_rating_aggregates(old_rating=review.rating)
+            self._log('reviews', 'delete', review_id)
+            self._log('places', 'update', review.place_id)
+            self._invalidate('reviews', f'review:{review_id}', 'places', f'place:{review.place_id}')
         self.review_repo.delete(review_id)
+
+    def recompute_review_aggregates(self):
+        return self.place_repo.recompute_review_aggregates()
+
+    # CHANGES
+    def get_changes(self, since=0, limit=None):
+        return self.change_log_repo.get_since(since, limit)
+
+    def compact_change_log(self, up_to=None):
+        return self.change_log_repo.compact(up_to)
+
+    # EXPORT
+    def export(self, entity, since=None):
+        """Yield the dict of every users/places/amenities/reviews row updated since since"""
+        repos = {'users': self.user_repo, 'places': self.place_repo,
+                 'amenities': self.amenity_repo, 'reviews': self.review_repo}
+        if entity not in repos:
+            raise KeyError(f"entity must be one of: {', '.join(repos)}")
+        return ({**obj.to_dict(), 'updated_at': obj.updated_at.isoformat() if obj.updated_at else None}
+                for obj in repos[entity].iter_since(since))
+
+    # BULK
+    @staticmethod
+    def _bulk_row(model, data):
+        """Run the model validators on one item and return its column dict"""
+        fields = BULK_FIELDS[model]
+        unknown = sorted(set(data) - set(fields))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        for field in BULK_REQUIRED[model]:
+            if data.get(field) is None:
+                raise ValueError(f"{field} is required")
+        obj = model(**data)
+        return {'id': str(uuid.uuid4()), **{field: getattr(obj, field) for field in fields}}
+
+    @staticmethod
+    def _insert_chunks(pending, insert, results):
+        """Insert the validated [(index, row)] by chunks, one transaction per chunk
+
+        When the database rejects a chunk, its items are reported as failed
+        and the next chunks still run. Inside an enclosing unit of work the
+        error propagates instead, so that the caller rolls everything back.
+        """
+        for start in range(0, len(pending), BULK_CHUNK_SIZE):
+            chunk = pending[start:start + BULK_CHUNK_SIZE]
+            try:
+                with transaction():
+                    insert([row for _, row in chunk])
+            except SQLAlchemyError:
+                if in_transaction():
+                    raise
+                for index, _ in chunk:
+                    results[index] = {'index': index, 'error': 'Conflicts with existing data'}
+                continue
+            for index, row in chunk:
+                results[index] = {'index': index, 'id': row['id']}
+        return results
+
+    def create_places(self, places_data, owner_id):
+        """Create a batch of places owned by owner_id, return one result per item"""
+        owner = self.user_repo.get(owner_id)
+        if not owner:
+            raise KeyError('Invalid input data')
+        # Tous les équipements du lot en une requête
+        requested = {amenity_id for data in places_data if isinstance(data, dict)
+                     for amenity_id in data.get('amenities') or [] if isinstance(amenity_id, str)}
+        known = {amenity.id for amenity in self.amenity_repo.get_many(requested)[0]}
+        results, pending, links = [None] * len(places_data), [], {}
+        for index, data in enumerate(places_data):
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError("Each item must be an object")
+                data = dict(data)
+                amenity_ids = list(dict.fromkeys(data.pop('amenities', None) or []))
+                if any(amenity_id not in known for amenity_id in amenity_ids):
+                    raise KeyError('Invalid input data')
+                row = self._bulk_row(Place, data)
+            except (KeyError, TypeError, ValueError) as e:
+                results[index] = {'index': index, 'error': str(e).strip("'")}
+                continue
+            row.update(user_id=owner.id, geohash=encode_geohash(row['latitude'], row['longitude']))
+            pending.append((index, row))
+            links[row['id']] = amenity_ids
+
+        def insert(rows):
+            self.place_repo.insert_rows(rows)
+            self.place_repo.insert_amenity_links([{'place_id': row['id'], 'amenity_id': amenity_id}
+                                                  for row in rows for amenity_id in links[row['id']]])
+            self._log('places', 'create', *(row['id'] for row in rows))
+            self._invalidate('places')
+
+        return self._insert_chunks(pending, insert, results)
+
+    def create_amenities(self, amenities_data):
+        """Create a batch of amenities, return one result per item"""
+        taken = self.amenity_repo.get_existing_names(
+            data.get('name') for data in amenities_data if isinstance(data, dict))
+        results, pending = [None] * len(amenities_data), []
+        for index, data in enumerate(amenities_data):
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError("Each item must be an object")
+                row = self._bulk_row(Amenity, data)
+                if row['name'] in taken:
+                    raise ValueError("Amenity already exists")
+            except (TypeError, ValueError) as e:
+                results[index] = {'index': index, 'error': str(e)}
+                continue
+            taken.add(row['name'])
+            pending.append((index, row))
+
+        def insert(rows):
+            self.amenity_repo.insert_rows(rows)
+            self._log('amenities', 'create', *(row['id'] for row in rows))
+            self._invalidate('amenities')
+
+        return self._insert_chunks(pending, insert, results)
+
+    def create_reviews(self, reviews_data, user_id):
+        """Create a batch of reviews written by user_id, return one result per item"""
+        user = self.user_repo.get(user_id)
+        if not user:
+            raise KeyError('Invalid input data')
+        # Places du lot et avis déjà écrits par l'utilisateur : une requête chacun
+        place_ids = {data.get('place_id') for data in reviews_data
+                     if isinstance(data, dict) and isinstance(data.get('place_id'), str)}
+        places = {place.id: place for place in self.place_repo.get_many(place_ids)[0]}
+        reviewed = self.review_repo.get_reviewed_place_ids(user.id, place_ids)
+        results, pending = [None] * len(reviews_data), []
+        for index, data in enumerate(reviews_data):
+            try:
+                if not isinstance(data, dict):
+                    raise ValueError("Each item must be an object")
+                place = places.get(data.get('place_id'))
+                if not place:
+                    raise KeyError('Invalid input data')
+                if place.user_id == user.id:
+                    raise KeyError('You cannot review your own place.')
+                if place.id in reviewed:
+                    raise KeyError('You have already reviewed this place.')
+                row = self._bulk_row(Review, data)
+            except (KeyError, TypeError, ValueError) as e:
+                results[index] = {'index': index, 'error': str(e).strip("'")}
+                continue
+            row['user_id'] = user.id
+            reviewed.add(place.id)
+            pending.append((index, row))
+
+        def insert(rows):
+            self.review_repo.insert_rows(rows)
+            deltas = {}
+            for row in rows:
+                values = deltas.setdefault(row['place_id'], {})
+                for column, delta in (('review_count', 1), ('rating_sum', row['rating']),
+                                      (f"rating_{row['rating']}_count", 1)):
+                    values[column] = values.get(column, 0) + delta
+            self.place_repo.add_rating_deltas(deltas)
+            self._log('reviews', 'create', *(row['id'] for row in rows))
+            self._log('places', 'update', *deltas)
+            self._invalidate('reviews', 'places', *(f'place:{place_id}' for place_id in deltas))
+
+        return self._insert_chunks(pending, insert, results)
+
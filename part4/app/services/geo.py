@@ -0,0 +1,102 @@
+from math import asin, cos, floor, radians, sin, sqrt
+
+# Géohash : cellules rectangulaires dont le préfixe commun permet
+# une recherche par plage sur un index B-tree classique.
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Deux caractères (10 bits) par consultation
+BASE32_PAIRS = [first + second for first in BASE32 for second in BASE32]
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+# Nombre maximum de cellules interrogées pour une recherche
+MAX_CELLS = 16
+
+
+def _cell_index(value, low, span, bits):
+    """Index of the cell holding value among 2**bits equal cells of [low, low + span)"""
+    cells = 1 << bits
+    step = span / cells
+    index = min(max(int((value - low) / step), 0), cells - 1)
+    # Les bornes low + k * step sont exactes : on corrige l'arrondi de la division
+    if index and value < low + index * step:
+        index -= 1
+    elif index < cells - 1 and value >= low + (index + 1) * step:
+        index += 1
+    return index
+
+
+def _spread_bits(value):
+    """Insert a zero bit before each of the 32 low bits of value"""
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    return (value | (value << 1)) & 0x5555555555555555
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Return the geohash of a point
+
+    Same cells as the bit-by-bit bisection, computed with whole-number
+    operations: the longitude and latitude cell indexes are interleaved,
+    longitude first, then cut into base32 characters.
+    """
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    lon_index = _spread_bits(_cell_index(longitude, -180.0, 360.0, lon_bits))
+    lat_index = _spread_bits(_cell_index(latitude, -90.0, 180.0, lat_bits))
+    code = (lon_index << 1 | lat_index) if lon_bits == lat_bits else (lat_index << 1 | lon_index)
+    chars = [BASE32_PAIRS[(code >> shift) & 1023] for shift in range(total_bits - 10, -1, -10)]
+    if precision % 2:
+        chars.append(BASE32[code & 31])
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return the (latitude, longitude) size in degrees of a geohash cell"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def covering_prefixes(latitude, longitude, radius_km):
+    """Return the geohash prefixes of the cells covering a circle
+
+    The finest precision whose cover of the bounding box needs at most
+    MAX_CELLS cells is used, so the candidates stay close to the circle.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    max_lat = min(90.0, latitude + delta_lat)
+    min_lat = max(-90.0, latitude - delta_lat)
+    widest = max(abs(min_lat), abs(max_lat))
+    # Près des pôles, le cercle peut couvrir toutes les longitudes
+    km_per_lon_degree = KM_PER_DEGREE * cos(radians(widest))
+    delta_lon = 180.0 if km_per_lon_degree * 180.0 <= radius_km else radius_km / km_per_lon_degree
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lon_size = cell_size(precision)
+        first_row = floor((min_lat + 90.0) / lat_size)
+        last_row = min(floor((max_lat + 90.0) / lat_size), round(180.0 / lat_size) - 1)
+        first_col = floor((longitude - delta_lon + 180.0) / lon_size)
+        last_col = floor((longitude + delta_lon + 180.0) / lon_size)
+        columns = round(360.0 / lon_size)
+        last_col = min(last_col, first_col + columns - 1)
+        if (last_row - first_row + 1) * (last_col - first_col + 1) <= MAX_CELLS or precision == 1:
+            break
+
+    prefixes = set()
+    for row in range(first_row, last_row + 1):
+        center_lat = -90.0 + (row + 0.5) * lat_size
+        for col in range(first_col, last_col + 1):
+            center_lon = -180.0 + ((col % columns) + 0.5) * lon_size
+            prefixes.add(encode_geohash(center_lat, center_lon, precision))
+    return sorted(prefixes)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points, in kilometers"""
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
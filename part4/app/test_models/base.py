@@ -0,0 +1,38 @@
+import itertools
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.services import facade
+import config
+
+# Base commune des tests : application neuve sur une base SQLite en mémoire
+# pour chaque test, et aides pour créer des utilisateurs et des jetons.
+_emails = itertools.count()
+
+
+class AppTestCase(unittest.TestCase):
+    """Test case running each test against a fresh in-memory database"""
+    config_class = config.TestingConfig
+
+    def setUp(self):
+        self.app = create_app(self.config_class)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+
+    def create_user(self, first_name="User", last_name="Test", **fields):
+        """Create a user with a unique email and the default test password"""
+        fields.setdefault('email', f"{first_name.lower()}.{next(_emails)}@test.com")
+        fields.setdefault('password', "password123")
+        return facade.create_user({'first_name': first_name, 'last_name': last_name, **fields})
+
+    @staticmethod
+    def auth_headers(user_id, is_admin=False):
+        token = create_access_token(identity=user_id, additional_claims={'is_admin': is_admin})
+        return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,107 @@
+import unittest
+from app.persistence.unit_of_work import transaction
+from app.services import facade
+from app.services.amenity_index import AmenityFacetIndex, get_amenity_index, init_amenity_index
+from app.test_models.base import AppTestCase
+
+
+class TestAmenityIndex(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Facets").id
+        self.wifi, self.pool, self.parking = (facade.create_amenity({'name': name}).id
+                                              for name in ("Wifi", "Pool", "Parking"))
+        self.places = {}
+        for title, price, amenities in (("Studio", 40.0, [self.wifi]),
+                                        ("Villa", 300.0, [self.wifi, self.pool, self.parking]),
+                                        ("Cottage", 90.0, [self.wifi, self.parking]),
+                                        ("Tent", 15.0, [])):
+            self.places[title] = self.add_place(title, price, amenities)
+        # Construction au démarrage, comme hors tests : hors budget des requêtes
+        self.app.config['AMENITY_INDEX_EAGER'] = True
+        init_amenity_index(self.app)
+
+    def add_place(self, title, price, amenities):
+        return facade.create_place({'title': title, 'description': "A place", 'price': price,
+                                    'latitude': 44.0, 'longitude': 1.0, 'amenities': amenities},
+                                   self.owner_id).id
+
+    def titles(self, amenities, match='all', **filters):
+        query = '&'.join([f"amenities={','.join(amenities)}", f'amenities_match={match}'] +
+                         [f'{name}={value}' for name, value in filters.items()])
+        response = self.client.get(f'/api/v1/places/?{query}')
+        self.assertEqual(response.status_code, 200, response.json)
+        return sorted(item['title'] for item in response.json['items']), response.json['facets']
+
+    def counts(self, facets):
+        return [facets.get(amenity_id, 0) for amenity_id in (self.wifi, self.pool, self.parking)]
+
+    def test_match_all_and_any(self):
+        titles, _ = self.titles([self.wifi, self.parking])
+        self.assertEqual(titles, ["Cottage", "Villa"])
+        titles, _ = self.titles([self.pool, self.parking], match='any')
+        self.assertEqual(titles, ["Cottage", "Villa"])
+        titles, _ = self.titles([self.pool], match='any')
+        self.assertEqual(titles, ["Villa"])
+        titles, _ = self.titles([self.wifi, self.pool, self.parking])
+        self.assertEqual(titles, ["Villa"])
+
+    def test_facet_counts(self):
+        _, facets = self.titles([self.wifi])
+        self.assertEqual(self.counts(facets), [3, 1, 2])
+        _, facets = self.titles([self.parking])
+        self.assertEqual(self.counts(facets), [2, 1, 2])
+
+    def test_facet_counts_follow_price_filters(self):
+        titles, facets = self.titles([self.wifi], max_price=100)
+        self.assertEqual(titles, ["Cottage", "Studio"])
+        self.assertEqual(self.counts(facets), [2, 0, 1])
+        titles, facets = self.titles([self.wifi], min_price=50, sort='-price')
+        self.assertEqual(titles, ["Cottage", "Villa"])
+        self.assertEqual(self.counts(facets), [2, 1, 2])
+        # Le tri seul ne change pas les compteurs
+        _, facets = self.titles([self.wifi], sort='price')
+        self.assertEqual(self.counts(facets), [3, 1, 2])
+
+    def test_index_follows_commits(self):
+        index = get_amenity_index()
+        self.assertEqual(index.match([self.pool]).bit_count(), 1)
+        place_id = self.add_place("Loft", 120.0, [self.pool])
+        self.assertEqual(index.match([self.pool]).bit_count(), 2)
+        facade.add_place_amenities(self.places["Studio"], [self.pool])
+        self.assertEqual(index.match([self.pool]).bit_count(), 3)
+        facade.delete_place(place_id)
+        self.assertEqual(index.match([self.pool]).bit_count(), 2)
+        self.assertEqual(index.match([self.pool, self.wifi]), index.match([self.pool]))
+
+    def test_index_follows_writes_of_other_processes(self):
+        # Index d'un autre worker : il ne reçoit rien de la façade de celui-ci
+        other = AmenityFacetIndex()
+        other.build()
+        place_id = self.add_place("Loft", 120.0, [self.pool])
+        facade.add_place_amenities(self.places["Tent"], [self.pool])
+        self.assertEqual(other.match([self.pool]), get_amenity_index().match([self.pool]))
+        self.assertEqual(other.match([self.pool]).bit_count(), 3)
+        facade.delete_place(place_id)
+        self.assertEqual(other.match([self.pool]).bit_count(), 2)
+        self.assertEqual(other.facet_counts(other.match([self.pool])), get_amenity_index().facet_counts(
+            get_amenity_index().match([self.pool])))
+
+    def test_index_ignores_rolled_back_writes(self):
+        index = get_amenity_index()
+        before = index.match([self.pool])
+        with self.assertRaises(RuntimeError):
+            with transaction():
+                self.add_place("Loft", 120.0, [self.pool])
+                facade.add_place_amenities(self.places["Tent"], [self.pool])
+                # L'index ne voit rien tant que la transaction n'est pas validée
+                self.assertEqual(index.match([self.pool]), before)
+                raise RuntimeError("abort")
+        self.assertEqual(index.match([self.pool]), before)
+        titles, facets = self.titles([self.pool])
+        self.assertEqual(titles, ["Villa"])
+        self.assertEqual(self.counts(facets), [1, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestBatch(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Batch").id
+        self.headers = self.auth_headers(self.owner_id)
+
+    def place(self, title, price=50.0):
+        return {'method': 'POST', 'path': '/api/v1/places/',
+                'body': {'title': title, 'price': price, 'latitude': 44.0, 'longitude': 1.0, 'amenities': []}}
+
+    def test_requests_run_with_caller_token(self):
+        batch = {'requests': [self.place("Batch place"), {'method': 'GET', 'path': '/api/v1/places/?fields=title'},
+                              {'method': 'GET', 'path': '/api/v1/places/unknown'}]}
+        response = self.client.post('/api/v1/batch/', json=batch, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        statuses = [sub_response['status'] for sub_response in response.json['responses']]
+        self.assertEqual(statuses, [201, 200, 404])
+        self.assertEqual(response.json['responses'][1]['body']['items'], [{'title': "Batch place"}])
+
+    def test_atomic_batch_rolls_back(self):
+        batch = {'atomic': True, 'requests': [self.place("Rolled back"), self.place("Negative price", -1.0)]}
+        response = self.client.post('/api/v1/batch/', json=batch, headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json['committed'])
+        self.assertEqual(response.json['responses'][0]['status'], 201)
+        self.assertEqual(facade.get_all_places()[0], [])
+
+        batch = {'atomic': True, 'requests': [self.place("Kept one"), self.place("Kept two")]}
+        response = self.client.post('/api/v1/batch/', json=batch, headers=self.headers)
+        self.assertTrue(response.json['committed'])
+        self.assertEqual(len(facade.get_all_places()[0]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import json
+import os
+import tempfile
+import unittest
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_and_compare(self):
+        handle, output = tempfile.mkstemp(suffix='.json')
+        os.close(handle)
+        self.addCleanup(os.remove, output)
+        status = benchmark.main(['--users', '20', '--places', '30', '--amenities', '5', '--reviews-per-place', '2',
+                                 '--requests', '3', '--concurrency', '2', '--output', output,
+                                 '--endpoints', 'places.list,places.page,reviews.create,reviews.delete'])
+        self.assertEqual(status, 0)
+        with open(output) as f:
+            results = json.load(f)
+        self.assertEqual(set(results['endpoints']),
+                         {'places.list', 'places.page', 'reviews.create', 'reviews.delete'})
+        for stats in results['endpoints'].values():
+            self.assertEqual((stats['requests'], stats['errors']), (3, 0))
+            self.assertGreater(stats['queries_per_request'], 0)
+        self.assertEqual(benchmark.compare(results, results, 0.2), [])
+
+        slower = json.loads(json.dumps(results))
+        slower['endpoints']['places.list']['p95_ms'] += 1000
+        slower['endpoints']['places.page']['queries_per_request'] += 1
+        regressions = benchmark.compare(slower, results, 0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('places.list: p95'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from app import db
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestBulkCreate(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Bulk").id
+        self.guest_id = self.create_user("Guest", "Bulk").id
+        self.amenity_id = facade.create_amenity({'name': "Wifi"}).id
+
+    def post(self, url, payload, user_id, is_admin=False):
+        return self.client.post(url, json=payload, headers=self.auth_headers(user_id, is_admin))
+
+    def test_places_and_reviews(self):
+        places = [{'title': f"Bulk place {i}", 'price': 40.0 + i, 'latitude': 44.0, 'longitude': 1.0,
+                   'amenities': [self.amenity_id]} for i in range(3)]
+        places.append({'title': "No price", 'latitude': 44.0, 'longitude': 1.0})
+        places.append({'title': "Bad amenity", 'price': 10.0, 'latitude': 44.0, 'longitude': 1.0,
+                       'amenities': ['unknown']})
+        response = self.post('/api/v1/places/bulk', places, self.owner_id)
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.json['created'], response.json['failed']), (3, 2))
+        results = response.json['results']
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3, 4])
+        self.assertIn('price is required', results[3]['error'])
+        place_ids = [result['id'] for result in results[:3]]
+
+        place = facade.get_place(place_ids[0])
+        self.assertIsNotNone(place.geohash)
+        self.assertEqual([amenity.id for amenity in place.amenities], [self.amenity_id])
+        self.assertEqual(len(facade.search_places("Bulk")[0]), 3)
+
+        reviews = [{'text': "Great bulk stay", 'rating': 4, 'place_id': place_ids[0]},
+                   {'text': "Great bulk stay", 'rating': 2, 'place_id': place_ids[0]},
+                   {'text': "Lovely bulk stay", 'rating': 5, 'place_id': place_ids[1]}]
+        response = self.post('/api/v1/reviews/bulk', reviews, self.guest_id)
+        self.assertEqual(response.status_code, 207)
+        self.assertIn('already reviewed', response.json['results'][1]['error'])
+        db.session.expire_all()
+        self.assertEqual(facade.get_place(place_ids[0]).rating_to_dict()['review_count'], 1)
+        self.assertEqual(facade.get_place(place_ids[1]).rating_average, 5)
+
+        response = self.post('/api/v1/reviews/bulk', [reviews[2]], self.owner_id)
+        self.assertEqual(response.status_code, 400)
+
+    def test_amenities_admin_only(self):
+        payload = [{'name': "Pool"}, {'name': "Wifi"}, {'name': "Pool"}]
+        self.assertEqual(self.post('/api/v1/amenities/bulk', payload, self.owner_id).status_code, 403)
+        response = self.post('/api/v1/amenities/bulk', payload, self.owner_id, is_admin=True)
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.json['created'], 1)
+        self.assertEqual(facade.amenity_repo.get_by_attribute('name', "Pool").id, response.json['results'][0]['id'])
+
+
+if __name__ == '__main__':
+    unittest.main()
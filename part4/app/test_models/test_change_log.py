@@ -0,0 +1,41 @@
+import unittest
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestChangeLog(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.headers = self.auth_headers('admin', is_admin=True)
+
+    def changes(self, since=0, limit=None):
+        url = f'/api/v1/changes/?since={since}' + (f'&limit={limit}' if limit else '')
+        return self.client.get(url, headers=self.headers).json
+
+    def test_mutations_are_logged_in_order(self):
+        amenity_id = facade.create_amenity({'name': "Wifi"}).id
+        facade.update_amenity(amenity_id, {'name': "Fast wifi"})
+        owner_id = self.create_user("Owner", "Log").id
+        body = self.changes(limit=2)
+        self.assertEqual([(c['entity'], c['op']) for c in body['items']],
+                         [('amenities', 'create'), ('amenities', 'update')])
+        self.assertTrue(body['has_more'])
+        body = self.changes(body['next_since'])
+        self.assertEqual([(c['entity'], c['entity_id']) for c in body['items']], [('users', owner_id)])
+        self.assertFalse(body['has_more'])
+
+    def test_failed_mutation_is_not_logged(self):
+        with self.assertRaises(ValueError):
+            facade.create_amenity({'name': ""})
+        self.assertEqual(self.changes()['items'], [])
+
+    def test_compaction_keeps_latest_entry(self):
+        amenity_id = facade.create_amenity({'name': "Wifi"}).id
+        for name in ("Pool", "Sauna"):
+            facade.update_amenity(amenity_id, {'name': name})
+        self.assertEqual(facade.compact_change_log(), 2)
+        self.assertEqual([c['op'] for c in self.changes()['items']], ['update'])
+
+
+if __name__ == '__main__':
+    unittest.main()
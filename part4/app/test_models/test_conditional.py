@@ -0,0 +1,64 @@
+import unittest
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestConditional(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Conditional").id
+        guest_id = self.create_user("Guest", "Conditional").id
+        self.place_id = facade.create_place({'title': "Conditional place", 'description': "A place", 'price': 50.0,
+                                             'latitude': 44.0, 'longitude': 1.0, 'amenities': []},
+                                            self.owner_id).id
+        self.review_id = facade.create_review({'text': "Very nice stay", 'rating': 4,
+                                               'place_id': self.place_id}, guest_id).id
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, headers={'If-None-Match': etag})
+
+    def test_place_detail_follows_embedded_entities(self):
+        url = f'/api/v1/places/{self.place_id}'
+        etag = self.client.get(url).headers['ETag']
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+
+        # Texte seul : les agrégats, donc updated_at de la place, ne bougent pas
+        facade.update_review(self.review_id, {'text': "Changed my mind"})
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['reviews'][0]['text'], "Changed my mind")
+
+        etag = response.headers['ETag']
+        facade.update_user(self.owner_id, {'first_name': "Renamed"})
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['owner']['first_name'], "Renamed")
+        self.assertEqual(self.revalidate(url, response.headers['ETag']).status_code, 304)
+
+    def test_place_list_follows_review_text(self):
+        url = '/api/v1/places/'
+        etag = self.client.get(url).headers['ETag']
+        self.assertEqual(self.revalidate(url, etag).status_code, 304)
+        facade.update_review(self.review_id, {'text': "Changed my mind"})
+        self.assertEqual(self.revalidate(url, etag).status_code, 200)
+
+    def test_collection_has_no_last_modified(self):
+        url = '/api/v1/places/'
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response.headers)
+        other_id = facade.create_place({'title': "Other place", 'description': "A place", 'price': 60.0,
+                                        'latitude': 44.0, 'longitude': 1.0, 'amenities': []}, self.owner_id).id
+        since = 'Fri, 01 Jan 2100 00:00:00 GMT'
+        facade.delete_place(other_id)
+        # Une suppression ne change pas max(updated_at) : If-Modified-Since seul ne suffit pas
+        response = self.client.get(url, headers={'If-Modified-Since': since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json['items']), 1)
+
+    def test_entity_keeps_last_modified(self):
+        response = self.client.get(f'/api/v1/reviews/{self.review_id}')
+        self.assertIn('Last-Modified', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
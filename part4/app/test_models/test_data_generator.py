@@ -0,0 +1,72 @@
+import unittest
+from app import db
+from app.models.place import Place
+from app.models.review import Review
+from app.services import facade
+from app.services.geo import encode_geohash
+from app.test_models.base import AppTestCase
+from set_up_data import (GENERATED_PASSWORD, PLACES_DATA, create_amenities, create_places_with_data,
+                         create_test_users, generate)
+
+
+class TestDataGenerator(AppTestCase):
+    def snapshot(self):
+        return [(place.id, place.title, place.price, place.geohash, place.review_count, place.rating_sum)
+                for place in Place.query.order_by(Place.id)]
+
+    def test_deterministic_and_consistent(self):
+        reviews = generate(30, 200, 'zipf', seed=3, chunk_size=64)
+        self.assertEqual(Review.query.count(), reviews)
+        first = self.snapshot()
+        self.assertEqual(len(first), 200)
+        self.assertTrue(all(place.geohash == encode_geohash(place.latitude, place.longitude)
+                            for place in Place.query))
+
+        # Agrégats, index de recherche et mot de passe partagé utilisables tels quels
+        facade.recompute_review_aggregates()
+        db.session.expire_all()
+        self.assertEqual([row[4:] for row in self.snapshot()], [row[4:] for row in first])
+        self.assertGreater(len(facade.search_places("Paris")[0]), 0)
+        self.assertTrue(facade.get_user_by_email('user0@generated.hbnb.io').verify_password(GENERATED_PASSWORD))
+
+        db.drop_all()
+        db.create_all()
+        generate(30, 200, 'zipf', seed=3)
+        self.assertEqual(self.snapshot(), first)
+
+    def test_invalid_arguments_keep_indexes(self):
+        schema = lambda: db.session.execute(db.text(
+            "SELECT type, name FROM sqlite_master WHERE type IN ('index', 'trigger') ORDER BY name")).all()
+        before = schema()
+        for args in ((1, 5), (5, 10, 'many'), (5, 10, '9'), (-1, 0)):
+            with self.assertRaises(ValueError):
+                generate(*args)
+            self.assertEqual(schema(), before)
+        self.assertEqual(Place.query.count(), 0)
+
+    def test_geohash_reference_values(self):
+        self.assertEqual(encode_geohash(42.6, -5.6, 5), 'ezs42')
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(encode_geohash(-90.0, -180.0, 4), '0000')
+        self.assertEqual(encode_geohash(90.0, 180.0, 4), 'zzzz')
+
+
+class TestDemoData(AppTestCase):
+    def test_demo_seed(self):
+        create_test_users(self.app)
+        create_amenities(self.app)
+        create_places_with_data(self.app)
+        db.session.expire_all()
+        places = Place.query.all()
+        self.assertEqual(len(places), len(PLACES_DATA))
+        self.assertEqual(Review.query.count(), sum(len(data['reviews']) for data in PLACES_DATA))
+        for place in places:
+            self.assertEqual(len({review.user_id for review in place.reviews}), len(place.reviews))
+            self.assertNotIn(place.user_id, {review.user_id for review in place.reviews})
+            ratings = [review.rating for review in place.reviews]
+            self.assertEqual((place.review_count, place.rating_sum), (len(ratings), sum(ratings)))
+            self.assertEqual(place.rating_to_dict()['rating_average'], round(sum(ratings) / len(ratings), 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import json
+import unittest
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestExport(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            facade.create_amenity({'name': f"Amenity {i}"})
+
+    def export(self, url, is_admin=True):
+        return self.client.get(url, headers=self.auth_headers('admin', is_admin))
+
+    def test_streams_ndjson_since(self):
+        response = self.export('/api/v1/export/amenities.ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([row['name'] for row in rows], [f"Amenity {i}" for i in range(5)])
+
+        response = self.export(f"/api/v1/export/amenities.ndjson?since={rows[3]['updated_at']}")
+        names = [json.loads(line)['name'] for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(names, ["Amenity 3", "Amenity 4"])
+
+    def test_admin_only_and_known_entities(self):
+        self.assertEqual(self.export('/api/v1/export/amenities.ndjson', is_admin=False).status_code, 403)
+        self.assertEqual(self.export('/api/v1/export/passwords.ndjson').status_code, 404)
+        self.assertEqual(self.export('/api/v1/export/users.ndjson?since=yesterday').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from app import fragment_cache
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestFragmentCache(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Fragment").id
+        self.guest_id = self.create_user("Guest", "Fragment").id
+        amenity_id = facade.create_amenity({'name': "Wifi"}).id
+        self.place_id = facade.create_place({'title': "Fragment place", 'description': "A place", 'price': 50.0,
+                                             'latitude': 44.0, 'longitude': 1.0, 'amenities': [amenity_id]},
+                                            self.owner_id).id
+        self.review_id = facade.create_review({'text': "Very nice stay", 'rating': 4,
+                                               'place_id': self.place_id}, self.guest_id).id
+
+    def test_list_matches_to_dict_list(self):
+        body = self.client.get('/api/v1/places/').json
+        self.assertEqual(body['items'], [facade.get_place(self.place_id).to_dict_list()])
+        self.assertIsNone(body['next_cursor'])
+
+    def test_fragments_reused_then_refreshed(self):
+        self.client.get('/api/v1/places/')
+        misses = fragment_cache.stats()['misses']
+        self.client.get('/api/v1/places/')
+        self.assertEqual(fragment_cache.stats()['misses'], misses)
+
+        facade.update_user(self.owner_id, {'first_name': "Renamed"})
+        facade.update_review(self.review_id, {'text': "Changed my mind"})
+        item = self.client.get('/api/v1/places/').json['items'][0]
+        self.assertEqual(item['owner']['first_name'], "Renamed")
+        self.assertEqual(item['reviews'][0]['text'], "Changed my mind")
+        self.assertEqual(item['review_count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+from math import cos, radians
+import random
+import unittest
+from app import db
+from app.commands import backfill_geohash_command
+from app.models.place import Place
+from app.services import facade
+from app.services.geo import covering_prefixes, encode_geohash, haversine_km
+from app.test_models.base import AppTestCase
+
+
+def offset(latitude, longitude, north_km, east_km):
+    """Point about north_km north and east_km east of (latitude, longitude)"""
+    return latitude + north_km / 111.32, longitude + east_km / (111.32 * cos(radians(latitude)))
+
+
+class TestGeo(unittest.TestCase):
+    def test_haversine(self):
+        self.assertAlmostEqual(haversine_km(48.8566, 2.3522, 51.5074, -0.1278), 343.5, delta=0.5)
+        self.assertEqual(haversine_km(10.0, 20.0, 10.0, 20.0), 0.0)
+
+    def test_cover_contains_every_point_of_the_circle(self):
+        rng = random.Random(7)
+        # Centres quelconques, sur des frontières de cellules, près de l'antiméridien et des pôles
+        centers = [(rng.uniform(-80, 80), rng.uniform(-180, 180)) for _ in range(100)]
+        centers += [(0.0, 0.0), (45.0, 90.0), (-33.75, 151.875), (10.0, 179.99), (-10.0, -179.99), (89.9, 0.0)]
+        for latitude, longitude in centers:
+            radius = rng.choice((0.5, 3.0, 25.0, 200.0))
+            prefixes = covering_prefixes(latitude, longitude, radius)
+            for _ in range(50):
+                lat, lon = offset(latitude, longitude, rng.uniform(-radius, radius), rng.uniform(-radius, radius))
+                lon = (lon + 180.0) % 360.0 - 180.0
+                if not -90 <= lat <= 90 or haversine_km(latitude, longitude, lat, lon) > radius:
+                    continue
+                geohash = encode_geohash(lat, lon)
+                self.assertTrue(any(geohash.startswith(prefix) for prefix in prefixes),
+                                (latitude, longitude, radius, lat, lon))
+
+
+class TestNearbySearch(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Nearby").id
+
+    def add_place(self, title, latitude, longitude):
+        return facade.create_place({'title': title, 'description': "A place", 'price': 50.0,
+                                    'latitude': latitude, 'longitude': longitude, 'amenities': []},
+                                   self.owner_id).id
+
+    def search(self, latitude, longitude, radius_km, limit=None):
+        url = f'/api/v1/places/search?lat={latitude}&lon={longitude}&radius_km={radius_km}'
+        response = self.client.get(url + (f'&limit={limit}' if limit else ''))
+        self.assertEqual(response.status_code, 200)
+        return [(item['title'], item['distance_km']) for item in response.json['items']]
+
+    def test_radius_and_order(self):
+        center = (48.8566, 2.3522)
+        for title, north, east in (("Far", 20.0, 0.0), ("Near", 0.0, 1.0), ("Middle", -5.0, 0.0),
+                                   ("Outside", 0.0, -12.0)):
+            self.add_place(title, *offset(*center, north, east))
+        results = self.search(*center, 10)
+        self.assertEqual([title for title, _ in results], ["Near", "Middle"])
+        self.assertAlmostEqual(results[0][1], 1.0, delta=0.05)
+        self.assertAlmostEqual(results[1][1], 5.0, delta=0.05)
+        self.assertEqual([title for title, _ in self.search(*center, 30)], ["Near", "Middle", "Outside", "Far"])
+        self.assertEqual([title for title, _ in self.search(*center, 30, limit=2)], ["Near", "Middle"])
+
+    def test_across_cell_boundaries(self):
+        # (0, 0) est un coin commun à des cellules de toutes les précisions
+        for title, north, east in (("NE", 0.3, 0.3), ("NW", 0.3, -0.3), ("SE", -0.3, 0.3), ("SW", -0.3, -0.3)):
+            self.add_place(title, *offset(0.0, 0.0, north, east))
+        self.assertEqual(sorted(title for title, _ in self.search(0.0, 0.0, 1)), ["NE", "NW", "SE", "SW"])
+        # Même chose de part et d'autre de l'antiméridien
+        self.add_place("East", 0.0, 179.999)
+        self.add_place("West", 0.0, -179.999)
+        self.assertEqual(sorted(title for title, _ in self.search(0.0, 179.9995, 1)), ["East", "West"])
+
+    def test_invalid_parameters(self):
+        for query in ('lat=91&lon=0&radius_km=1', 'lat=0&lon=0&radius_km=0', 'lat=0&radius_km=1',
+                      'q=paris&lat=0&lon=0'):
+            self.assertEqual(self.client.get(f'/api/v1/places/search?{query}').status_code, 400)
+
+    def test_backfill_geohash_command(self):
+        place_ids = [self.add_place(f"Place {i}", 40.0 + i, -3.0 - i) for i in range(3)]
+        db.session.execute(db.update(Place).values(geohash=None))
+        db.session.commit()
+        result = self.app.test_cli_runner().invoke(backfill_geohash_command)
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("3 places", result.output)
+        db.session.expire_all()
+        for place_id in place_ids:
+            place = facade.get_place(place_id)
+            self.assertEqual(place.geohash, encode_geohash(place.latitude, place.longitude))
+        self.assertEqual(len(self.search(40.0, -3.0, 5)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+from datetime import timedelta
+import os
+import tempfile
+import time
+import unittest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.test_models.base import AppTestCase
+import config
+
+
+class ClaimsConfig(config.TestingConfig):
+    METRICS_ENABLED = True
+    JWT_CLAIMS_CACHE_MAX_ENTRIES = 2
+
+
+class TestJWTClaimsCache(AppTestCase):
+    config_class = ClaimsConfig
+
+    def setUp(self):
+        super().setUp()
+        self.user_id = self.create_user("Claims", "Cache").id
+        self.cache = self.app.extensions['jwt_claims_cache']
+
+    def get(self, token):
+        return self.client.get('/api/v1/protected/', headers={'Authorization': f'Bearer {token}'})
+
+    def token(self, **kwargs):
+        return create_access_token(identity=self.user_id, additional_claims={'is_admin': False}, **kwargs)
+
+    def test_hits_and_metrics(self):
+        token = self.token()
+        for _ in range(3):
+            self.assertEqual(self.get(token).status_code, 200)
+        self.assertEqual((self.cache.stats['hits'], self.cache.stats['misses']), (2, 1))
+        tampered = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+        self.assertEqual(self.get(tampered).status_code, 422)
+        text = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn('hbnb_jwt_claims_cache_total{result="hits"} 2', text)
+        self.assertIn('hbnb_jwt_claims_cache_hit_ratio 0.5', text)
+
+    def test_bounded(self):
+        for _ in range(3):
+            self.assertEqual(self.get(self.token()).status_code, 200)
+        self.assertEqual(len(self.cache._entries), 2)
+        self.assertEqual(self.cache.stats['evictions'], 1)
+
+    def test_never_past_expiry(self):
+        token = self.token(expires_delta=timedelta(seconds=1))
+        self.assertEqual(self.get(token).status_code, 200)
+        self.assertEqual(self.get(token).status_code, 200)
+        time.sleep(1.1)
+        response = self.get(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.cache.stats['expirations'], 1)
+
+    def test_logout_revokes_cached_token(self):
+        token = self.token()
+        self.assertEqual(self.get(token).status_code, 200)
+        headers = {'Authorization': f'Bearer {token}'}
+        self.assertEqual(self.client.post('/api/v1/auth/logout', headers=headers).status_code, 200)
+        self.assertEqual(self.get(token).status_code, 401)
+        self.assertEqual(self.get(self.token()).status_code, 200)
+
+    def test_logout_applies_to_every_worker(self):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        shared = type('SharedConfig', (ClaimsConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+        # Deux workers : chacun son cache de claims, une seule base
+        workers = [create_app(shared) for _ in range(2)]
+        try:
+            with workers[0].app_context():
+                db.create_all()
+                headers = self.auth_headers(self.create_user("Shared", "Logout").id)
+            clients = [worker.test_client() for worker in workers]
+            for client in clients:
+                self.assertEqual(client.get('/api/v1/protected/', headers=headers).status_code, 200)
+            self.assertEqual(clients[0].post('/api/v1/auth/logout', headers=headers).status_code, 200)
+            for client in clients:
+                self.assertEqual(client.get('/api/v1/protected/', headers=headers).status_code, 401)
+        finally:
+            for worker in workers:
+                with worker.app_context():
+                    db.engine.dispose()
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.services import facade
+from app.test_models.base import AppTestCase
+import config
+
+
+class MetricsConfig(config.TestingConfig):
+    METRICS_ENABLED = True
+
+
+class TestMetrics(AppTestCase):
+    config_class = MetricsConfig
+
+    def setUp(self):
+        super().setUp()
+        facade.create_amenity({'name': "Wifi"})
+
+    def test_request_and_sql_metrics(self):
+        self.client.get('/api/v1/amenities/')
+        self.client.get('/api/v1/amenities/')
+        self.client.get('/api/v1/amenities/unknown')
+        text = self.client.get('/metrics').get_data(as_text=True)
+        labels = 'endpoint="/api/v1/amenities/",method="GET"'
+        self.assertIn(f'hbnb_http_requests_total{{{labels},status="200"}} 2', text)
+        self.assertIn(f'hbnb_http_request_duration_seconds_count{{{labels}}} 2', text)
+        self.assertIn(f'hbnb_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2', text)
+        self.assertIn('status="404"', text)
+        self.assertNotIn('endpoint="/metrics"', text)
+        sql_line = next(line for line in text.splitlines()
+                        if line.startswith('hbnb_sql_statements_total{endpoint="/api/v1/amenities/"}'))
+        self.assertGreaterEqual(int(sql_line.split()[-1]), 2)
+
+    def test_failed_statement_is_not_timed(self):
+        with self.app.test_request_context('/api/v1/amenities/'):
+            self.app.preprocess_request()
+            with self.assertRaises(OperationalError):
+                db.session.execute(text("SELECT * FROM missing_table"))
+            db.session.rollback()
+            db.session.execute(text("SELECT 1"))
+            (_, sql_count, sql_time), = g.metrics_frames
+            self.assertEqual(sql_count, 1)
+            self.assertGreater(sql_time, 0.0)
+            self.assertNotIn('metrics_started', db.session.connection().info)
+
+    def test_disabled_by_default(self):
+        self.assertFalse(config.Config.METRICS_ENABLED)
+        self.assertFalse(config.ProductionConfig.METRICS_ENABLED)
+
+    def test_disabled(self):
+        app = create_app(config.TestingConfig)
+        self.assertNotIn('metrics', app.extensions)
+        self.assertEqual(app.test_client().get('/metrics').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from app.api.v1.pagination import MAX_IDS
+from app.persistence.repository import MAX_PAGE_SIZE
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestPagination(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            facade.create_amenity({'name': f"Amenity {i}"})
+
+    def test_pages_follow_cursor(self):
+        names = []
+        cursor = None
+        while True:
+            url = '/api/v1/amenities/?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.json['items']), 2)
+            names += [amenity['name'] for amenity in response.json['items']]
+            cursor = response.json['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(names, [f"Amenity {i}" for i in range(5)])
+
+    def test_limit_is_capped(self):
+        items, next_cursor = facade.amenity_repo.get_page(MAX_PAGE_SIZE * 10)
+        self.assertEqual(len(items), 5)
+        self.assertIsNone(next_cursor)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/v1/amenities/?cursor=invalid')
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_many_keeps_order_and_reports_missing(self):
+        ids = [amenity.id for amenity in facade.amenity_repo.get_all()]
+        response = self.client.get(f'/api/v1/amenities/?ids={ids[3]},unknown,{ids[0]},{ids[3]}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([amenity['id'] for amenity in response.json['items']], [ids[3], ids[0]])
+        self.assertEqual(response.json['missing'], ['unknown'])
+
+    def test_ids_are_capped(self):
+        ids = ','.join(str(i) for i in range(MAX_IDS + 1))
+        response = self.client.get(f'/api/v1/amenities/?ids={ids}')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
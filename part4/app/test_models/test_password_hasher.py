@@ -0,0 +1,70 @@
+import unittest
+from app import create_app, password_hasher
+from app.password_hasher import PasswordHasherBusy, calibrate_log_rounds
+from app.services import facade
+from app.test_models.base import AppTestCase
+import config
+
+
+class PoolConfig(config.TestingConfig):
+    PASSWORD_HASH_WORKERS = 1
+    PASSWORD_HASH_QUEUE_LIMIT = 0
+
+
+class TestPasswordHasher(AppTestCase):
+    config_class = PoolConfig
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user("Hash", "Pool")
+        self.email = self.user.email
+
+    def login(self, password="password123"):
+        return self.client.post('/api/v1/auth/login', json={'email': self.email, 'password': password})
+
+    def test_hash_in_pool(self):
+        self.assertTrue(self.user.password.startswith('$2b$04$'))
+        self.assertTrue(self.user.verify_password("password123"))
+        self.assertFalse(self.user.verify_password("wrong-password"))
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login("wrong-password").status_code, 401)
+
+    def test_saturated_pool(self):
+        pool = self.app.extensions['password_hasher']
+        self.assertTrue(pool.slots.acquire(blocking=False))
+        try:
+            with self.assertRaises(PasswordHasherBusy):
+                password_hasher.hash("password123")
+            response = self.login()
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '1')
+            response = self.client.post('/api/v1/users/', json={
+                'first_name': "Busy", 'last_name': "User", 'email': "busy.user@hasher.com", 'password': "password123"})
+            self.assertEqual(response.status_code, 503)
+        finally:
+            pool.slots.release()
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_rehash_on_login(self):
+        self.assertFalse(self.user.password_needs_rehash())
+        self.app.config['BCRYPT_LOG_ROUNDS'] = 5
+        self.assertTrue(self.user.password_needs_rehash())
+        self.assertEqual(self.login().status_code, 200)
+        user = facade.get_user(self.user.id)
+        self.assertTrue(user.password.startswith('$2b$05$'))
+        self.assertTrue(user.verify_password("password123"))
+
+    def test_inline_in_testing(self):
+        app = create_app(config.TestingConfig)
+        self.assertIsNone(app.extensions['password_hasher'])
+        self.assertEqual(app.config['BCRYPT_LOG_ROUNDS'], 4)
+
+    def test_calibrate(self):
+        rounds, timings = calibrate_log_rounds(target_ms=1000, max_rounds=6)
+        self.assertEqual(timings[0][0], 4)
+        self.assertTrue(4 <= rounds <= 6)
+        self.assertTrue(all(elapsed <= 1000 for cost, elapsed in timings if cost <= rounds))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestPlaceFilters(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Filters").id
+        self.guests = [self.create_user("Guest", f"Filters{i}").id for i in range(2)]
+        # Prix et notes volontairement répétés : les clés de tri ne sont pas uniques
+        self.prices = {}
+        for i, price in enumerate((80.0, 50.0, 50.0, 120.0, 50.0, 80.0, 50.0)):
+            title = f"Place {i}"
+            self.prices[title] = price
+            facade.create_place({'title': title, 'description': "A place", 'price': price,
+                                 'latitude': 44.0, 'longitude': 1.0, 'amenities': []}, self.owner_id)
+
+    def places(self):
+        return {place.title: place.id for place in facade.get_all_places(limit=100)[0]}
+
+    def walk(self, query, limit=2):
+        """Titles of every page of /places/?query, following next_cursor"""
+        titles, cursor = [], None
+        while True:
+            url = f'/api/v1/places/?{query}&limit={limit}' + (f'&cursor={cursor}' if cursor else '')
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.json)
+            titles += [item['title'] for item in response.json['items']]
+            cursor = response.json['next_cursor']
+            if cursor is None:
+                return titles
+
+    def test_price_filters(self):
+        self.assertEqual(sorted(self.walk('min_price=60')), ["Place 0", "Place 3", "Place 5"])
+        self.assertEqual(sorted(self.walk('max_price=50')), ["Place 1", "Place 2", "Place 4", "Place 6"])
+        self.assertEqual(sorted(self.walk('min_price=60&max_price=100')), ["Place 0", "Place 5"])
+        self.assertEqual(self.walk('min_price=200'), [])
+
+    def test_price_sorts_page_through_equal_keys(self):
+        for sort, descending in (('price', False), ('-price', True)):
+            titles = self.walk(f'sort={sort}')
+            # Chaque place une seule fois, malgré quatre prix égaux à 50
+            self.assertEqual(sorted(titles), sorted(self.prices))
+            prices = [self.prices[title] for title in titles]
+            self.assertEqual(prices, sorted(prices, reverse=descending))
+            # Même ordre quelle que soit la taille des pages
+            self.assertEqual(self.walk(f'sort={sort}', limit=3), titles)
+            self.assertEqual(self.walk(f'sort={sort}', limit=100), titles)
+
+    def test_created_at_sorts(self):
+        places = sorted(facade.get_all_places(limit=100)[0], key=lambda place: (place.created_at, place.id))
+        ascending = self.walk('sort=created_at')
+        self.assertEqual(ascending, [place.title for place in places])
+        self.assertEqual(self.walk('sort=-created_at'), ascending[::-1])
+
+    def test_rating_sorts_page_through_equal_keys(self):
+        ids = self.places()
+        ratings = {"Place 0": (4, 4), "Place 1": (5, 3), "Place 2": (2,), "Place 3": (4,)}
+        for title, values in ratings.items():
+            for guest, rating in zip(self.guests, values):
+                facade.create_review({'text': "Very nice stay", 'rating': rating, 'place_id': ids[title]}, guest)
+        # Moyennes 4, 4, 2, 4 puis 0 pour les trois places sans avis
+        scores = {title: sum(values) / len(values) for title, values in ratings.items()}
+        for sort, descending in (('rating', False), ('-rating', True)):
+            titles = self.walk(f'sort={sort}')
+            self.assertEqual(sorted(titles), sorted(self.prices))
+            values = [scores.get(title, 0.0) for title in titles]
+            self.assertEqual(values, sorted(values, reverse=descending))
+            self.assertEqual(self.walk(f'sort={sort}', limit=1), titles)
+
+    def test_filter_and_sort_together(self):
+        titles = self.walk('min_price=50&max_price=80&sort=-price')
+        self.assertEqual([self.prices[title] for title in titles], [80.0, 80.0, 50.0, 50.0, 50.0, 50.0])
+
+    def test_invalid_sort(self):
+        response = self.client.get('/api/v1/places/?sort=title')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('sort must be one of', response.json['error'])
+
+    def test_ids_reject_filters_and_sort(self):
+        ids = ','.join(self.places().values())
+        self.assertEqual(self.client.get(f'/api/v1/places/?ids={ids}').status_code, 200)
+        for query in ('min_price=60', 'max_price=50', 'sort=price', 'amenities=wifi'):
+            response = self.client.get(f'/api/v1/places/?ids={ids}&{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('ids cannot be combined', response.json['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
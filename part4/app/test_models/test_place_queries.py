@@ -0,0 +1,92 @@
+import unittest
+from sqlalchemy import event
+from app import db
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestPlaceQueries(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Queries").id
+        self.guest_id = self.create_user("Guest", "Queries").id
+        self.amenities = [facade.create_amenity({'name': f"Amenity {i}"}).id for i in range(3)]
+
+    def add_places(self, count):
+        for i in range(count):
+            place = facade.create_place({'title': f"Place number {i}", 'description': "A place",
+                                         'price': 50.0, 'latitude': 44.0, 'longitude': 1.0,
+                                         'amenities': list(self.amenities)}, self.owner_id)
+            facade.create_review({'text': "Very nice stay", 'rating': 5, 'place_id': place.id}, self.guest_id)
+
+    def count_queries(self, url):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        db.session.expunge_all()
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        self.assertEqual(response.status_code, 200)
+        return len(statements), response.json
+
+    def test_list_query_count_is_constant(self):
+        self.add_places(2)
+        few, body = self.count_queries('/api/v1/places/')
+        self.assertEqual(len(body['items']), 2)
+        self.add_places(8)
+        many, body = self.count_queries('/api/v1/places/')
+        self.assertEqual(len(body['items']), 10)
+        self.assertEqual(few, many)
+        # 4 requêtes de version (ETag) + places/propriétaires, équipements, avis
+        self.assertLessEqual(many, 7)
+        self.assertEqual(len(body['items'][0]['amenities']), 3)
+        self.assertEqual(len(body['items'][0]['reviews']), 1)
+
+    def test_sparse_list_skips_unrequested_relations(self):
+        self.add_places(3)
+        count, body = self.count_queries('/api/v1/places/?fields=id,title,price')
+        # 4 requêtes de version (ETag) + places, sans propriétaires, équipements ni avis
+        self.assertEqual(count, 5)
+        self.assertEqual(set(body['items'][0]), {'id', 'title', 'price'})
+        count, body = self.count_queries('/api/v1/places/?fields=title&include=amenities')
+        self.assertEqual(count, 6)
+        self.assertEqual(set(body['items'][0]), {'title', 'amenities'})
+
+    def test_place_page_resolves_authors_in_one_query(self):
+        self.add_places(1)
+        place_id = facade.get_all_places()[0][0].id
+        for i in range(4):
+            author_id = self.create_user(f"Author{i}", "Queries").id
+            facade.create_review({'text': "Lovely place indeed", 'rating': 3, 'place_id': place_id}, author_id)
+        count, body = self.count_queries(f'/api/v1/places/{place_id}/page?limit=3')
+        # place + équipements, 3 requêtes de version, avis + auteurs
+        self.assertEqual(count, 6)
+        self.assertEqual(len(body['reviews']['items']), 3)
+        self.assertIsNotNone(body['reviews']['next_cursor'])
+        self.assertTrue(all(review['author']['first_name'] for review in body['reviews']['items']))
+        self.assertEqual(body['ratings']['review_count'], 5)
+
+    def test_add_amenities_loads_them_in_one_query(self):
+        place_id = facade.create_place({'title': "Bare place", 'description': "A place", 'price': 50.0,
+                                        'latitude': 44.0, 'longitude': 1.0, 'amenities': []}, self.owner_id).id
+        self.amenities += [facade.create_amenity({'name': f"Extra {i}"}).id for i in range(5)]
+        url = f'/api/v1/places/{place_id}/amenities'
+        # Budget et détection N+1 de @query_budget : un SELECT par équipement échouerait
+        response = self.client.post(url, json=[{'id': amenity_id} for amenity_id in self.amenities])
+        self.assertEqual(response.status_code, 200)
+        db.session.expire_all()
+        self.assertEqual(sorted(amenity.id for amenity in facade.get_place(place_id).amenities),
+                         sorted(self.amenities))
+
+        response = self.client.post(url, json=[{'id': self.amenities[0]}, {'id': 'unknown'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json['error'], 'Unknown amenities: unknown')
+
+
+if __name__ == "__main__":
+    unittest.main()
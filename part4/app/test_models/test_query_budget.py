@@ -0,0 +1,41 @@
+import unittest
+from unittest import mock
+from app import db
+from app.api.v1.places import PlaceResource
+from app.query_budget import QueryBudgetExceeded
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestQueryBudget(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user_ids = [self.create_user("User", f"Budget{i}").id for i in range(5)]
+        self.place_id = facade.create_place({'title': "Budget place", 'description': "A place", 'price': 50.0,
+                                             'latitude': 44.0, 'longitude': 1.0}, self.user_ids[0]).id
+
+    def test_within_budget(self):
+        db.session.expire_all()
+        self.assertEqual(self.client.get(f'/api/v1/places/{self.place_id}').status_code, 200)
+
+    def test_budget_exceeded_lists_call_sites(self):
+        db.session.expire_all()
+        with mock.patch.object(PlaceResource.get, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded) as raised:
+                self.client.get(f'/api/v1/places/{self.place_id}')
+        self.assertIn('budget is 1', str(raised.exception))
+        self.assertIn('app/', str(raised.exception))
+
+    def test_repeated_statement_detected(self):
+        def user_names():
+            db.session.expire_all()
+            return {'names': [facade.get_user(user_id).last_name for user_id in self.user_ids]}
+        self.app.add_url_rule('/n-plus-one', 'n_plus_one', user_names)
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            self.client.get('/n-plus-one')
+        self.assertIn('N+1', str(raised.exception))
+        self.assertIn('facade.py', str(raised.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from app import db
+from app.commands import repair_ratings_command
+from app.models.place import Place
+from app.persistence.unit_of_work import transaction
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestRatingAggregates(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Ratings").id
+        self.guests = [self.create_user("Guest", f"Ratings{i}").id for i in range(3)]
+        self.place_id = self.create_place("Rated place")
+
+    def create_place(self, title):
+        return facade.create_place({'title': title, 'description': "A place", 'price': 50.0,
+                                    'latitude': 44.0, 'longitude': 1.0, 'amenities': []}, self.owner_id).id
+
+    def review(self, guest, rating, place_id=None):
+        return facade.create_review({'text': "Very nice stay", 'rating': rating,
+                                     'place_id': place_id or self.place_id}, self.guests[guest]).id
+
+    def aggregates(self, place_id=None):
+        db.session.expire_all()
+        place = facade.get_place(place_id or self.place_id)
+        return place.review_count, place.rating_sum, [place.rating_histogram[str(r)] for r in range(1, 6)]
+
+    def test_create_update_delete(self):
+        first = self.review(0, 5)
+        second = self.review(1, 3)
+        self.assertEqual(self.aggregates(), (2, 8, [0, 0, 1, 0, 1]))
+
+        facade.update_review(second, {'rating': 1})
+        self.assertEqual(self.aggregates(), (2, 6, [1, 0, 0, 0, 1]))
+        # Texte seul : agrégats inchangés
+        facade.update_review(first, {'text': "Still very nice"})
+        self.assertEqual(self.aggregates(), (2, 6, [1, 0, 0, 0, 1]))
+
+        other_id = self.create_place("Other place")
+        facade.update_review(second, {'place_id': other_id})
+        self.assertEqual(self.aggregates(), (1, 5, [0, 0, 0, 0, 1]))
+        self.assertEqual(self.aggregates(other_id), (1, 1, [1, 0, 0, 0, 0]))
+
+        facade.delete_review(first)
+        self.assertEqual(self.aggregates(), (0, 0, [0, 0, 0, 0, 0]))
+        self.assertEqual(facade.get_place(self.place_id).rating_to_dict()['rating_average'], None)
+
+    def test_readable_inside_the_transaction(self):
+        place = facade.get_place(self.place_id)
+        with transaction():
+            self.review(0, 4)
+            self.review(1, 2)
+            # Valeurs entières, pas des expressions SQL en attente de flush
+            self.assertEqual(place.rating_to_dict(), {
+                'review_count': 2, 'rating_average': 3.0,
+                'rating_histogram': {'1': 0, '2': 1, '3': 0, '4': 1, '5': 0}})
+            place.update_rating_aggregates(old_rating=2, new_rating=5)
+            self.assertEqual((place.review_count, place.rating_sum, place.rating_5_count), (2, 9, 1))
+
+    def test_repair_ratings_command(self):
+        self.review(0, 4)
+        self.review(1, 2)
+        self.review(2, 2)
+        db.session.execute(db.update(Place).values(review_count=0, rating_sum=0, rating_2_count=7))
+        db.session.commit()
+        result = self.app.test_cli_runner().invoke(repair_ratings_command)
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("1 places", result.output)
+        self.assertEqual(self.aggregates(), (3, 8, [0, 2, 0, 1, 0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+from app import response_cache
+from app.cache import LRUCache, SQLiteCacheBackend
+from app.services import facade
+from app.test_models.base import AppTestCase
+import config
+
+
+class CachedConfig(config.TestingConfig):
+    RESPONSE_CACHE_ENABLED = True
+
+
+class TestResponseCache(AppTestCase):
+    config_class = CachedConfig
+
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Cache").id
+
+    def create_place(self, title):
+        return facade.create_place({'title': title, 'description': "A place", 'price': 50.0,
+                                    'latitude': 44.0, 'longitude': 1.0, 'amenities': []}, self.owner_id).id
+
+    def test_hit_then_invalidated_by_write(self):
+        place_id = self.create_place("First place")
+        self.assertEqual(self.client.get('/api/v1/places/').headers['X-Cache'], 'MISS')
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+        self.assertEqual(len(response.json['items']), 1)
+        self.client.get(f'/api/v1/places/{place_id}')
+
+        facade.update_place(place_id, {'title': "Renamed place"})
+        response = self.client.get(f'/api/v1/places/{place_id}')
+        self.assertEqual(response.headers['X-Cache'], 'MISS')
+        self.assertEqual(response.json['title'], "Renamed place")
+        self.create_place("Second place")
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.headers['X-Cache'], 'MISS')
+        self.assertEqual(len(response.json['items']), 2)
+        stats = response_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 4))
+
+    def test_atomic_batch_does_not_cache_uncommitted_data(self):
+        self.create_place("Committed place")
+        self.client.get('/api/v1/places/')
+        place = lambda title, price: {'method': 'POST', 'path': '/api/v1/places/', 'body': {
+            'title': title, 'price': price, 'latitude': 44.0, 'longitude': 1.0, 'amenities': []}}
+        response = self.client.post('/api/v1/batch/', headers=self.auth_headers(self.owner_id), json={
+            'atomic': True, 'requests': [place("Phantom place", 50.0),
+                                         {'method': 'GET', 'path': '/api/v1/places/'},
+                                         place("Negative price", -1.0)]})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json['committed'])
+        # La sous-requête GET a vu la place fantôme, sans la mettre en cache
+        self.assertIn("Phantom place", [item['title'] for item in response.json['responses'][1]['body']['items']])
+        response = self.client.get('/api/v1/places/')
+        self.assertEqual(response.headers['X-Cache'], 'MISS')
+        self.assertEqual([item['title'] for item in response.json['items']], ["Committed place"])
+
+    def test_owner_update_invalidates_places(self):
+        place_id = self.create_place("Owned place")
+        self.client.get(f'/api/v1/places/{place_id}')
+        facade.update_user(self.owner_id, {'first_name': "Renamed"})
+        response = self.client.get(f'/api/v1/places/{place_id}')
+        self.assertEqual(response.headers['X-Cache'], 'MISS')
+        self.assertEqual(response.json['owner']['first_name'], "Renamed")
+
+    def test_lru_evicts_by_size(self):
+        stats = {'evictions': 0, 'expirations': 0}
+        cache = LRUCache(12, stats)
+        cache.set('a', b'12345', {'x'}, 60)
+        cache.set('b', b'12345', {'x'}, 60)
+        cache.get('a')
+        cache.set('c', b'12345', {'y'}, 60)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'12345')
+        self.assertEqual(stats['evictions'], 1)
+        cache.invalidate({'x'})
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('c'), b'12345')
+
+    def test_shared_backend_invalidation(self):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            backend = SQLiteCacheBackend(path)
+            backend.set('key', b'value', {'places', 'place:1'}, 60)
+            self.assertEqual(SQLiteCacheBackend(path).get('key'), b'value')
+            SQLiteCacheBackend(path).invalidate({'place:1'})
+            self.assertIsNone(backend.get('key'))
+        finally:
+            os.remove(path)
+
+    def test_shared_backend_purges_expired_and_oldest_entries(self):
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        try:
+            backend = SQLiteCacheBackend(path, max_entries=3, purge_every=2)
+            backend.set('expired', b'value', {'places', 'place:0'}, -1)
+            for i in range(1, 6):
+                backend.set(f'key{i}', b'value', {'places', f'place:{i}'}, 60 + i)
+            # Dernière purge après la 6e écriture : expirées puis les plus anciennes au-delà de 3
+            connection = backend._connection()
+            keys = sorted(key for (key,) in connection.execute("SELECT key FROM cache_entries"))
+            self.assertEqual(keys, ['key3', 'key4', 'key5'])
+            tagged = sorted(set(key for (key,) in connection.execute("SELECT key FROM cache_tags")))
+            self.assertEqual(tagged, ['key3', 'key4', 'key5'])
+            self.assertEqual(backend.get('key5'), b'value')
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+from app import db
+from app.models.amenity import Amenity
+from app.models.review import Review
+from app.persistence.unit_of_work import transaction
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestReviewRepository(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        owner_id = self.create_user("Owner", "Reviews").id
+        self.guest = self.create_user("Guest", "Reviews")
+        self.place_id = facade.create_place({'title': "Reviewed place", 'description': "A place", 'price': 50.0,
+                                             'latitude': 44.0, 'longitude': 1.0, 'amenities': []}, owner_id).id
+
+    def review(self, rating=4):
+        return facade.create_review({'text': "Very nice stay", 'rating': rating, 'place_id': self.place_id},
+                                    self.guest.id)
+
+    def test_duplicate_review(self):
+        self.review()
+        with self.assertRaises(KeyError) as context:
+            self.review(rating=2)
+        self.assertEqual(context.exception.args[0], 'You have already reviewed this place.')
+        db.session.expire_all()
+        self.assertEqual(Review.query.count(), 1)
+        self.assertEqual(self.guest.reviews.count(), 1)
+        place = facade.get_place(self.place_id)
+        self.assertEqual((place.review_count, place.rating_sum), (1, 4))
+
+    def test_duplicate_inside_unit_of_work_keeps_earlier_writes(self):
+        self.review()
+        place = facade.get_place(self.place_id)
+        self.assertEqual(len(place.reviews), 1)
+        with transaction():
+            facade.create_amenity({'name': "Before"})
+            with self.assertRaises(KeyError):
+                self.review(rating=2)
+            facade.create_amenity({'name': "After"})
+        db.session.expire_all()
+        self.assertEqual(sorted(amenity.name for amenity in Amenity.query), ["After", "Before"])
+        self.assertEqual(Review.query.count(), 1)
+        self.assertEqual((place.review_count, len(place.reviews)), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
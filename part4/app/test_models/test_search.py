@@ -0,0 +1,100 @@
+import unittest
+from sqlalchemy import text
+from app import db
+from app.commands import rebuild_search_index_command
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestSearch(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Search").id
+
+    def add_place(self, title, description="A place"):
+        return facade.create_place({'title': title, 'description': description, 'price': 50.0,
+                                    'latitude': 44.0, 'longitude': 1.0, 'amenities': []}, self.owner_id).id
+
+    def titles(self, terms, limit=None):
+        return [place.title for place, _ in facade.search_places(terms, limit)[0]]
+
+    def test_ranking_prefix_and_diacritics(self):
+        self.add_place("Quiet flat", "Close to the sea, with a view on the lighthouse")
+        self.add_place("Seaside villa", "Large house")
+        self.add_place("Mountain chalet", "Château nearby")
+        # Le titre pèse plus que la description
+        self.assertEqual(self.titles("seaside"), ["Seaside villa"])
+        self.assertEqual(self.titles("sea"), ["Seaside villa", "Quiet flat"])
+        self.assertEqual(self.titles("chateau"), ["Mountain chalet"])
+        self.assertEqual(self.titles("house light"), [])
+        self.assertEqual(self.titles("view light"), ["Quiet flat"])
+
+    def test_api_pagination(self):
+        for i in range(5):
+            self.add_place(f"Loft {i}")
+        self.add_place("Barn")
+        titles, cursor = [], None
+        while True:
+            url = '/api/v1/places/search?q=loft&limit=2' + (f'&cursor={cursor}' if cursor else '')
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            titles += [item['title'] for item in response.json['items']]
+            self.assertTrue(all('score' in item for item in response.json['items']))
+            cursor = response.json['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(sorted(titles), [f"Loft {i}" for i in range(5)])
+        for query in ('q=%21%21', 'q=loft&cursor=abc', 'q=loft&lat=0&lon=0'):
+            self.assertEqual(self.client.get(f'/api/v1/places/search?{query}').status_code, 400)
+
+    def test_triggers_follow_insert_update_delete(self):
+        place_id = self.add_place("Cabin", "Wooden cabin in the forest")
+        self.assertEqual(self.titles("forest"), ["Cabin"])
+        facade.update_place(place_id, {'title': "Treehouse", 'description': "High in the trees"})
+        self.assertEqual(self.titles("forest"), [])
+        self.assertEqual(self.titles("cabin"), [])
+        self.assertEqual(self.titles("trees"), ["Treehouse"])
+        # Une mise à jour sans titre ni description ne réindexe pas
+        facade.update_place(place_id, {'price': 75.0})
+        self.assertEqual(self.titles("treehouse"), ["Treehouse"])
+        facade.delete_place(place_id)
+        self.assertEqual(self.titles("trees"), [])
+        count = db.session.execute(text("SELECT count(*) FROM places_fts WHERE places_fts MATCH 'trees'")).scalar()
+        self.assertEqual(count, 0)
+
+    def test_rebuild_search_index_command(self):
+        self.add_place("Houseboat", "Moored on the river")
+        self.add_place("Farmhouse", "Near the river")
+        db.session.execute(text("INSERT INTO places_fts(places_fts) VALUES ('delete-all')"))
+        db.session.commit()
+        self.assertEqual(self.titles("river"), [])
+        result = self.app.test_cli_runner().invoke(rebuild_search_index_command)
+        self.assertEqual(result.exit_code, 0)
+        self.assertIn("2 places", result.output)
+        self.assertEqual(sorted(self.titles("river")), ["Farmhouse", "Houseboat"])
+
+    def test_index_survives_rowid_renumbering(self):
+        self.add_place("Houseboat", "Moored on the river")
+        self.add_place("Farmhouse", "Among the fields")
+        # Ce que peut faire un VACUUM sur une table à clé texte
+        db.session.execute(text("UPDATE places SET rowid = 1000 - rowid"))
+        db.session.commit()
+        self.assertEqual(self.titles("river"), ["Houseboat"])
+        self.assertEqual(self.titles("fields"), ["Farmhouse"])
+
+    def test_rebuild_numbers_places_without_search_id(self):
+        self.add_place("Houseboat", "Moored on the river")
+        self.add_place("Farmhouse", "Near the river")
+        db.session.execute(text("UPDATE places SET search_id = NULL"))
+        db.session.commit()
+        facade.place_repo.rebuild_search_index()
+        ids = [search_id for (search_id,) in db.session.execute(text("SELECT search_id FROM places"))]
+        self.assertEqual(sorted(ids), [1, 2])
+        self.assertEqual(sorted(self.titles("river")), ["Farmhouse", "Houseboat"])
+        # Les triggers recréés prennent la suite
+        self.add_place("Riverside cabin")
+        self.assertEqual(len(self.titles("river")), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
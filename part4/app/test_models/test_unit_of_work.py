@@ -0,0 +1,44 @@
+import unittest
+from sqlalchemy import event
+from app import db
+from app.models.place import Place
+from app.persistence.unit_of_work import transaction
+from app.services import facade
+from app.test_models.base import AppTestCase
+
+
+class TestUnitOfWork(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner_id = self.create_user("Owner", "Work").id
+        self.amenities = [facade.create_amenity({'name': f"Amenity {i}"}).id for i in range(3)]
+        self.commits = 0
+        event.listen(db.session, 'after_commit', self.count_commit)
+
+    def tearDown(self):
+        event.remove(db.session, 'after_commit', self.count_commit)
+        super().tearDown()
+
+    def count_commit(self, session):
+        self.commits += 1
+
+    def place_data(self, amenities):
+        return {'title': "Place with amenities", 'description': "A place", 'price': 50.0,
+                'latitude': 44.0, 'longitude': 1.0, 'amenities': amenities}
+
+    def test_create_place_commits_once(self):
+        place = facade.create_place(self.place_data(list(self.amenities)), self.owner_id)
+        self.assertEqual(self.commits, 1)
+        self.assertEqual(len(place.amenities), 3)
+
+    def test_failed_write_rolls_back(self):
+        with self.assertRaises(ValueError):
+            with transaction():
+                facade.create_place(self.place_data(list(self.amenities)), self.owner_id)
+                facade.create_amenity({'name': ""})
+        self.assertEqual(self.commits, 0)
+        self.assertEqual(Place.query.count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,10 +18,6 @@ document.addEventListener('DOMContentLoaded', async () => {
         if (priceFilter) {
             priceFilter.addEventListener('change', filterPlacesByPrice);
         }
-
-        window.viewPlaceDetails = (placeId) => {
-            window.location.href = `place.html?place_id=${encodeURIComponent(placeId)}`;
-        };
     }
 
     /*--------===> GESTION PLACE.HTML <===------- */
@@ -91,16 +87,20 @@ document.addEventListener('DOMContentLoaded', async () => {
 
 /**
  * Redirige vers place.html et affiche les détails + reviews
+ * Un seul appel (/places/<id>/page) : place, avis avec le nom des auteurs et notes
  */
-async function loadPlaceDetails(placeId) {
+async function loadPlaceDetails(placeId, cursor = null) {
     const placeDetailsContainer = document.getElementById('place-details');
     const reviewsContainer = document.getElementById('reviews');
     const token = getCookie('token');
 
     if (!placeDetailsContainer || !reviewsContainer) return;
 
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+
     try {
-        const response = await fetch(`${API_BASE_URL}/places/${placeId}`, {
+        const response = await fetch(`${API_BASE_URL}/places/${placeId}/page?${params}`, {
             method: 'GET',
             headers: {
                 'Content-Type': 'application/json',
@@ -113,63 +113,56 @@ async function loadPlaceDetails(placeId) {
             return;
         }
 
-        const place = await response.json();
-
-        placeDetailsContainer.innerHTML = `
-            <h2>${place.title || place.name}</h2>
-            <p>${place.description}</p>
-            <p><strong>Prix:</strong> ${place.price}€</p>
-            <p><strong>Localisation:</strong> ${place.latitude}, ${place.longitude}</p>
-        `;
-
-         const reviewsResponse = await fetch(`${API_BASE_URL}/places/${placeId}/reviews/`, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-                ...(token && { 'Authorization': `Bearer ${token}` })
-            }
-        });
-
-        if (!reviewsResponse.ok) {
-            reviewsContainer.innerHTML = `<p style="color:red;">Impossible de récupérer les avis</p>`;
-            return;
+        const page = await response.json();
+
+        if (!cursor) {
+            const place = page.place;
+            const average = page.ratings.rating_average;
+            placeDetailsContainer.innerHTML = `
+                <h2>${place.title || place.name}</h2>
+                <p>${place.description}</p>
+                <p><strong>Prix:</strong> ${place.price}€</p>
+                <p><strong>Localisation:</strong> ${place.latitude}, ${place.longitude}</p>
+                <p><strong>Note:</strong> ${average !== null ? `${average}/5 (${page.ratings.review_count} avis)` : 'Pas encore noté'}</p>
+            `;
+            reviewsContainer.innerHTML = `<h3>Avis des utilisateurs</h3><ul id="reviews-list" style="padding-left:20px;"></ul>`;
         }
 
-        const reviews = await reviewsResponse.json();
-
-        reviewsContainer.innerHTML = `<h3>Avis des utilisateurs</h3><ul id="reviews-list" style="padding-left:20px;"></ul>`;
         const reviewsList = document.getElementById('reviews-list');
+        const reviews = page.reviews.items;
 
-        if (reviews.length === 0) {
+        if (!cursor && reviews.length === 0) {
             reviewsList.innerHTML = '<li>Aucun avis pour le moment.</li>';
-        } else {
-            reviews.forEach(async (r) => {
-                const li = document.createElement('li');
-                user_name = await getUserName(r.user_id);
-                li.textContent = `${user_name} : ${r.comment || r.text}`;
-                reviewsList.appendChild(li);
-            });
         }
+        reviews.forEach((r) => {
+            const li = document.createElement('li');
+            li.textContent = `${r.author.first_name} ${r.author.last_name} : ${r.comment || r.text}`;
+            reviewsList.appendChild(li);
+        });
+        displayMoreReviewsButton(placeId, page.reviews.next_cursor);
     } catch (error) {
         console.error('Erreur réseau: ', error);
         placeDetailsContainer.innerHTML = `<p style="color:red;">Impossible de récupérer les détails.</p>`;
     }
 }
 
-/*-===> Fonction pour récupérer le nom d'utilisateur <==-*/
-async function getUserName(user_id) {
-    try {
-        const response = await fetch(`${API_BASE_URL}/users/${user_id}`, {
-            method: 'GET',
-            headers: { 'Content-Type': 'application/json' }
-        });
-        if (!response.ok) return 'Utilisateur inconnu';
-        const user = await response.json();
-        return user.name || 'Utilisateur inconnu';
-    } catch (err) {
-        console.error('Erreur récupération nom utilisateur: ', err);
-        return 'Utilisateur inconnu';
-    }
+/**
+ * Affiche le bouton "Voir plus d'avis" tant qu'il reste des avis à charger
+ */
+function displayMoreReviewsButton(placeId, nextCursor) {
+    const reviewsContainer = document.getElementById('reviews');
+    if (!reviewsContainer) return;
+
+    const existingButton = document.getElementById('more-reviews-button');
+    if (existingButton) existingButton.remove();
+    if (!nextCursor) return;
+
+    const button = document.createElement('button');
+    button.id = 'more-reviews-button';
+    button.className = 'details-button';
+    button.textContent = "Voir plus d'avis";
+    button.addEventListener('click', () => loadPlaceDetails(placeId, nextCursor));
+    reviewsContainer.appendChild(button);
 }
 
 /*-===> Fonction de la connexion à l'Api <==-*/
@@ -271,13 +264,23 @@ function loadPriceFilterOptions() {
 }
 
 /**
- * Récupère la liste des places depuis l'API
+ * Récupère une page de places depuis l'API (pagination par curseur)
+ * Le filtre de prix est appliqué côté serveur (?max_price=)
  */
-async function fetchPlaces() {
+async function fetchPlaces(cursor = null) {
     const token = getCookie('token');
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+    // Seuls les champs affichés par createPlaceCard sont demandés
+    params.set('fields', 'id,title,description,price,latitude,longitude');
+
+    const priceFilter = document.getElementById('price-filter');
+    if (priceFilter && priceFilter.value !== 'all') {
+        params.set('max_price', priceFilter.value);
+    }
     
     try {
-        const response = await fetch(`${API_BASE_URL}/places/`, {
+        const response = await fetch(`${API_BASE_URL}/places/?${params}`, {
             method: 'GET',
             headers: {
                 'Content-Type': 'application/json',
@@ -286,8 +289,9 @@ async function fetchPlaces() {
         });
         
         if (response.ok) {
-            const places = await response.json();
-            displayPlaces(places);
+            const page = await response.json();
+            displayPlaces(page.items);
+            displayLoadMoreButton(page.next_cursor);
         } else {
             console.error('Erreur lors de la récupération des places: ', response.status);
             alert('Impossible de charger les logements');
@@ -311,6 +315,25 @@ function displayPlaces(places) {
     });
 }
 
+/**
+ * Affiche le bouton "Voir plus" tant qu'il reste des pages à charger
+ */
+function displayLoadMoreButton(nextCursor) {
+    const placesList = document.getElementById('places-list');
+    if (!placesList) return;
+
+    const existingButton = document.getElementById('load-more-button');
+    if (existingButton) existingButton.remove();
+    if (!nextCursor) return;
+
+    const button = document.createElement('button');
+    button.id = 'load-more-button';
+    button.className = 'details-button';
+    button.textContent = 'Voir plus';
+    button.addEventListener('click', () => fetchPlaces(nextCursor));
+    placesList.after(button);
+}
+
 /**
  * Crée une carte HTML pour une place avec gestion intelligente des images
  */
@@ -331,52 +354,20 @@ function createPlaceCard(place) {
 }
 
 /**
- * Filtre les places affichées selon le prix sélectionné
+ * Recharge la liste avec le prix maximum sélectionné (filtré par l'API)
  */
 function filterPlacesByPrice() {
-    const priceFilter = document.getElementById('price-filter');
-    const selectedPrice = priceFilter.value;
-
-    const placeCards = document.querySelectorAll('.place-card');
-    
-    placeCards.forEach(card => {
-        const placePrice = parseFloat(card.dataset.price);
-        
-        if (selectedPrice === 'all') {
-            card.style.display = 'block';
-        } else {
-            const maxPrice = parseFloat(selectedPrice);
-            if (placePrice <= maxPrice) {
-                card.style.display = 'block';
-            } else {
-                card.style.display = 'none';
-            }
-        }
-    });
+    const placesList = document.getElementById('places-list');
+    if (placesList) placesList.innerHTML = '';
+    fetchPlaces();
 }
 
 /**
  * Redirige vers la page de détails d'une place
  */
 function viewPlaceDetails(placeId) {
-    const token = getCookie('token');
-    const container = document.getElementById('place-details');
-    container.style.display = 'block';
-
-    fetch(`${API_BASE_URL}/places/${placeId}`, {
-        method: 'GET',
-        headers: {
-            'Content-Type': 'application/json',
-            ...(token && { 'Authorization': `Bearer ${token}` })
-        }
-    })
-    .then(res => {
-        if (!res.ok) throw new Error('Place non trouvée');
-        return res.json();
-    })
-    .catch(err => {
-        container.innerHTML = `<p style="color:red;">Erreur : ${err.message}</p>`;
-    });
+    // place.html charge elle-même les détails : aucune requête ici
+    window.location.href = `place.html?place_id=${encodeURIComponent(placeId)}`;
 }
 
 /*===== GESTION DES COOKIES ==================*/
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'API HBnB :
+- remplit une base SQLite temporaire avec le générateur de set_up_data.py
+- appelle chaque route de app/api/v1 avec N requêtes et C threads
+- mesure p50/p95/p99, débit et requêtes SQL par appel
+- écrit le résultat en JSON et le compare à une référence
+
+    python benchmark.py --users 1000 --places 1000 --reviews-per-place zipf --requests 200 --concurrency 4 \\
+        --output bench.json --baseline bench-main.json --threshold 0.2
+
+Avec --server http://localhost:5000, les requêtes partent vers un serveur
+lancé à part sur une base déjà remplie (--db ... --seed-only) ; les
+requêtes SQL par appel sont alors lues sur /metrics (METRICS_ENABLED=1).
+"""
+
+import argparse
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import quote
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
+from app import create_app, db
+from app.models.user import User
+from set_up_data import CITIES, GENERATED_ADMIN_EMAIL, GENERATED_PASSWORD, generate
+import config
+
+def benchmark_config(db_path, response_cache=False):
+    """TestingConfig on a SQLite file, without the test-only query budgets"""
+    return type('BenchmarkConfig', (config.TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'QUERY_BUDGET_ENABLED': False,
+        'RESPONSE_CACHE_ENABLED': response_cache,
+        'PROPAGATE_EXCEPTIONS': False,
+    })
+
+
+# ========================================
+# CLIENTS
+# ========================================
+
+_queries = threading.local()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    _queries.count = getattr(_queries, 'count', 0) + 1
+
+
+class InProcessClient:
+    """Calls the app through one Flask test client per thread"""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        _queries.count = 0
+        response = client.open(path, method=method, json=body, headers=headers)
+        data = response.get_data()
+        return response.status_code, data, _queries.count
+
+    def sql_totals(self):
+        return None
+
+
+class HTTPClient:
+    """Calls a running server; SQL counts come from its /metrics"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body=None, token=None):
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read(), None
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), None
+
+    def sql_totals(self):
+        """(statements, requests) counted by the server so far, or None without /metrics"""
+        status, data, _ = self.request('GET', '/metrics')
+        if status != 200:
+            return None
+        statements = requests = 0
+        for line in data.decode().splitlines():
+            if line.startswith('hbnb_sql_statements_total{'):
+                statements += float(line.split()[-1])
+            elif line.startswith('hbnb_http_requests_total{'):
+                requests += float(line.split()[-1])
+        return statements, requests
+
+
+# ========================================
+# SCÉNARIOS
+# ========================================
+
+class Scenario:
+    """One endpoint called `count` times; request(i, state) returns (method, path, body, token)"""
+
+    def __init__(self, name, count, request, collect=None, read=False):
+        self.name = name
+        self.count = count
+        self.request = request
+        self.collect = collect
+        self.read = read
+
+
+def read(name, count, path, token=None):
+    """GET scenario; path is a string or a function of the call number"""
+    return Scenario(name, count, lambda i, state: ('GET', path(i) if callable(path) else path, None, token),
+                    read=True)
+
+
+def login(client, email, password):
+    status, data, _ = client.request('POST', '/api/v1/auth/login', {'email': email, 'password': password})
+    if status != 200:
+        raise RuntimeError(f"Login failed for {email} ({status})")
+    return json.loads(data)['access_token']
+
+
+def token_identity(token):
+    """Subject of a JWT, read without checking the signature"""
+    payload = token.split('.')[1]
+    return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))['sub']
+
+
+def discover(client, token, needed):
+    """Ids of the seeded entities, read through the API"""
+    ids = {}
+    for entity in ('users', 'amenities', 'places', 'reviews'):
+        ids[entity], cursor = [], None
+        while len(ids[entity]) < needed:
+            path = f'/api/v1/{entity}/?limit=100' + (f'&cursor={cursor}' if cursor else '')
+            status, data, _ = client.request('GET', path, token=token)
+            page = json.loads(data)
+            ids[entity] += [item['id'] for item in page['items']]
+            cursor = page.get('next_cursor')
+            if not cursor:
+                break
+        if not ids[entity]:
+            raise RuntimeError(f"No {entity} found, seed the database first")
+    return ids
+
+
+def build_scenarios(ids, admin, user, user_id, n, stamp):
+    """Every route of app/api/v1, reads first, then create -> update -> delete chains"""
+    users, amenities, places, reviews = ids['users'], ids['amenities'], ids['places'], ids['reviews']
+    pick = lambda items, i: items[i % len(items)]
+    # Chaque avis créé vise une place différente, non encore notée par l'admin
+    review_places = places[:max(1, min(n, len(places) // 2))]
+    bulk_places = places[len(review_places):]
+    suffix = stamp.replace(':', '')
+    created = lambda key: (lambda i, status, data, state:
+                           state.setdefault(key, []).append(json.loads(data)['id']) if status == 201 else None)
+    return [
+        read('places.list', n, '/api/v1/places/'),
+        read('places.list_sparse', n, '/api/v1/places/?fields=id,title,price'),
+        read('places.list_by_amenity', n, lambda i: f'/api/v1/places/?amenities={pick(amenities, i)}'),
+        read('places.list_by_ids', n, '/api/v1/places/?ids=' + ','.join(places[:20])),
+        read('places.get', n, lambda i: f'/api/v1/places/{pick(places, i)}'),
+        read('places.page', n, lambda i: f'/api/v1/places/{pick(places, i)}/page'),
+        read('places.reviews', n, lambda i: f'/api/v1/places/{pick(places, i)}/reviews/'),
+        read('places.search_text', n, lambda i: f'/api/v1/places/search?q={quote(pick(CITIES, i)[0])}'),
+        read('places.search_nearby', n,
+            lambda i: f'/api/v1/places/search?lat={pick(CITIES, i)[1]}&lon={pick(CITIES, i)[2]}&radius_km=5'),
+        read('users.list', n, '/api/v1/users/'),
+        read('users.get', n, lambda i: f'/api/v1/users/{pick(users, i)}'),
+        read('amenities.list', n, '/api/v1/amenities/'),
+        read('amenities.get', n, lambda i: f'/api/v1/amenities/{pick(amenities, i)}'),
+        read('reviews.list', n, '/api/v1/reviews/'),
+        read('reviews.get', n, lambda i: f'/api/v1/reviews/{pick(reviews, i)}'),
+        read('protected', n, '/api/v1/protected/', user),
+        read('cache.stats', n, '/api/v1/cache/stats', admin),
+        read('changes.list', n, '/api/v1/changes/?limit=100', admin),
+        read('export.places', n, f'/api/v1/export/places.ndjson?since={stamp}', admin),
+        Scenario('batch', n, lambda i, state: ('POST', '/api/v1/batch/', {'requests': [
+            {'method': 'GET', 'path': f'/api/v1/places/{pick(places, i + k)}'} for k in range(5)]}, user)),
+        # bcrypt : quelques appels suffisent
+        Scenario('auth.login', min(n, 20), lambda i, state: (
+            'POST', '/api/v1/auth/login', {'email': GENERATED_ADMIN_EMAIL, 'password': GENERATED_PASSWORD}, None)),
+        Scenario('users.create', min(n, 20), lambda i, state: ('POST', '/api/v1/users/', {
+            'first_name': 'Bench', 'last_name': f'User{i}', 'email': f'bench.{suffix}.{i}@hbnb.io',
+            'password': GENERATED_PASSWORD}, None)),
+        Scenario('users.update', n, lambda i, state: (
+            'PUT', f'/api/v1/users/{user_id}', {'first_name': f'Bench{i}'}, user)),
+        Scenario('amenities.create', n, lambda i, state: (
+            'POST', '/api/v1/amenities/', {'name': f'Bench {stamp} {i}'}, admin), created('amenities')),
+        Scenario('amenities.update', n, lambda i, state: (
+            'PUT', f'/api/v1/amenities/{pick(state["amenities"], i)}', {'name': f'Bench {stamp} {i} bis'}, admin)),
+        Scenario('amenities.bulk', n, lambda i, state: ('POST', '/api/v1/amenities/bulk', [
+            {'name': f'Bulk {stamp} {i}.{k}'} for k in range(10)], admin)),
+        Scenario('places.create', n, lambda i, state: ('POST', '/api/v1/places/', {
+            'title': f'Bench place {i}', 'description': 'Created by the benchmark', 'price': 80.0,
+            'latitude': 44.84, 'longitude': -0.58, 'amenities': [pick(amenities, i)]}, admin), created('places')),
+        Scenario('places.update', n, lambda i, state: (
+            'PUT', f'/api/v1/places/{pick(state["places"], i)}', {'price': 90.0 + i}, admin)),
+        Scenario('places.add_amenities', n, lambda i, state: (
+            'POST', f'/api/v1/places/{pick(state["places"], i)}/amenities', [{'id': pick(amenities, i + 1)}], admin)),
+        Scenario('places.bulk', n, lambda i, state: ('POST', '/api/v1/places/bulk', [
+            {'title': f'Bulk place {i}.{k}', 'price': 50.0, 'latitude': 44.2, 'longitude': 0.6}
+            for k in range(10)], admin)),
+        Scenario('reviews.create', len(review_places), lambda i, state: ('POST', '/api/v1/reviews/', {
+            'text': 'Benchmark review text', 'rating': 1 + i % 5, 'place_id': review_places[i]}, admin),
+            created('reviews')),
+        Scenario('reviews.update', len(review_places), lambda i, state: (
+            'PUT', f'/api/v1/reviews/{pick(state["reviews"], i)}', {'text': 'Benchmark review, updated'}, admin)),
+        Scenario('reviews.bulk', min(n, len(bulk_places) // 5), lambda i, state: ('POST', '/api/v1/reviews/bulk', [
+            {'text': 'Benchmark bulk review', 'rating': 4, 'place_id': place_id}
+            for place_id in bulk_places[5 * i:5 * i + 5]], admin)),
+        Scenario('reviews.delete', len(review_places), lambda i, state: (
+            'DELETE', f'/api/v1/reviews/{state["reviews"][i]}', None, admin)),
+        Scenario('places.delete', n, lambda i, state: (
+            'DELETE', f'/api/v1/places/{state["places"][i]}', None, admin)),
+    ]
+
+
+# ========================================
+# MESURES
+# ========================================
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def run_scenario(client, scenario, state, concurrency, warmup=0):
+    """Run one scenario and return its statistics"""
+    if scenario.read:
+        for i in range(warmup):
+            client.request(*scenario.request(i, state))
+    samples = []
+
+    def call(i):
+        request = scenario.request(i, state)
+        started = time.perf_counter()
+        status, data, queries = client.request(*request)
+        samples.append((time.perf_counter() - started, status, queries))
+        if scenario.collect:
+            scenario.collect(i, status, data, state)
+
+    count = scenario.count
+    totals = client.sql_totals()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(count)))
+    elapsed = time.perf_counter() - started
+    after = client.sql_totals() if totals else None
+
+    latencies = sorted(duration for duration, _, _ in samples)
+    counted = [queries for _, _, queries in samples if queries is not None]
+    queries_per_request = sum(counted) / len(counted) if counted else None
+    if after:
+        requests = after[1] - totals[1]
+        queries_per_request = (after[0] - totals[0]) / requests if requests > 0 else None
+    to_ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        'requests': count,
+        'errors': sum(status >= 400 for _, status, _ in samples),
+        'p50_ms': to_ms(percentile(latencies, 50)),
+        'p95_ms': to_ms(percentile(latencies, 95)),
+        'p99_ms': to_ms(percentile(latencies, 99)),
+        'mean_ms': to_ms(sum(latencies) / len(latencies)) if latencies else None,
+        'throughput_rps': round(count / elapsed, 2) if elapsed and count else None,
+        'queries_per_request': round(queries_per_request, 2) if queries_per_request is not None else None,
+    }
+
+
+def run(client, n, concurrency, only=None, warmup=1):
+    """Log in, discover the data and run every scenario in order"""
+    admin = login(client, GENERATED_ADMIN_EMAIL, GENERATED_PASSWORD)
+    # Avis créés puis avis en lot (5 par appel) : chacun sur une place distincte
+    ids = discover(client, admin, max(6 * n, 100))
+    user = login(client, 'user0@generated.hbnb.io', GENERATED_PASSWORD)
+    stamp = datetime.now().isoformat(timespec='seconds')
+    state, results = {}, {}
+    for scenario in build_scenarios(ids, admin, user, token_identity(user), n, stamp):
+        if only and scenario.name not in only:
+            continue
+        # Les chaînes create -> update/delete ne tournent qu'après leur création
+        needed = scenario.count
+        if scenario.name.endswith(('.update', '.delete', '.add_amenities')):
+            key = scenario.name.split('.')[0]
+            if scenario.name != 'users.update':
+                needed = min(needed, len(state.get(key, [])))
+        scenario.count = needed
+        if scenario.count <= 0:
+            continue
+        results[scenario.name] = run_scenario(client, scenario, state, concurrency, warmup)
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms=1.0):
+    """Regressions of results against baseline, as human readable lines
+
+    p95 may grow by `threshold` (0.2 = 20 %) and at least min_delta_ms;
+    queries per request and error counts must not grow at all.
+    """
+    regressions = []
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] is not None and previous.get('p95_ms') is not None:
+            limit = max(previous['p95_ms'] * (1 + threshold), previous['p95_ms'] + min_delta_ms)
+            if current['p95_ms'] > limit:
+                regressions.append(f"{name}: p95 {current['p95_ms']} ms > {round(limit, 3)} ms "
+                                   f"(baseline {previous['p95_ms']} ms)")
+        if current['queries_per_request'] is not None and previous.get('queries_per_request') is not None:
+            if current['queries_per_request'] > previous['queries_per_request']:
+                regressions.append(f"{name}: {current['queries_per_request']} queries per request "
+                                   f"(baseline {previous['queries_per_request']})")
+        if current['errors'] > previous.get('errors', 0):
+            regressions.append(f"{name}: {current['errors']} errors (baseline {previous.get('errors', 0)})")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_results(results):
+    dash = lambda value: '-' if value is None else value
+    print(f"{'endpoint':<26}{'req':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'sql':>7}")
+    for name, stats in results['endpoints'].items():
+        print(f"{name:<26}{stats['requests']:>6}{stats['errors']:>5}{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+              f"{stats['p99_ms']:>10}{dash(stats['throughput_rps']):>10}{dash(stats['queries_per_request']):>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the HBnB API")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--amenities', type=int, default=50)
+    parser.add_argument('--reviews-per-place', default='zipf', help="Reviews of each place, or 'zipf'")
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the dataset')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=1, help='Unmeasured calls before each read endpoint')
+    parser.add_argument('--endpoints', help='Comma-separated scenario names (default: all)')
+    parser.add_argument('--response-cache', action='store_true', help='Enable the response cache (in-process)')
+    parser.add_argument('--db', help='SQLite file to seed or reuse (default: temporary file)')
+    parser.add_argument('--seed-only', action='store_true', help='Only fill --db, for a separate server')
+    parser.add_argument('--server', help='Base URL of a running server instead of an in-process app')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p95 growth (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+    only = set(args.endpoints.split(',')) if args.endpoints else None
+
+    dataset = {'users': args.users, 'places': args.places, 'amenities': args.amenities,
+               'reviews_per_place': args.reviews_per_place, 'seed': args.seed}
+    temporary = None
+    if args.server:
+        client = HTTPClient(args.server)
+        dataset = None
+    else:
+        if not args.db:
+            handle, temporary = tempfile.mkstemp(suffix='.db')
+            os.close(handle)
+        db_path = os.path.abspath(args.db or temporary)
+        app = create_app(benchmark_config(db_path, args.response_cache))
+        with app.app_context():
+            if not inspect(db.engine).has_table(User.__tablename__):
+                db.create_all()
+                started = time.perf_counter()
+                reviews = generate(args.users, args.places, args.reviews_per_place, args.amenities, args.seed)
+                print(f"Seeded {args.users} users, {args.places} places, {args.amenities} amenities and "
+                      f"{reviews} reviews in {time.perf_counter() - started:.1f}s")
+            db.session.remove()
+        if args.seed_only:
+            return 0
+        client = InProcessClient(app)
+
+    try:
+        results = {
+            'meta': {'commit': git_commit(), 'date': datetime.now().isoformat(timespec='seconds'),
+                     'mode': 'server' if args.server else 'in-process', 'dataset': dataset,
+                     'requests': args.requests, 'concurrency': args.concurrency,
+                     'response_cache': args.response_cache},
+            'endpoints': run(client, args.requests, args.concurrency, only, args.warmup),
+        }
+    finally:
+        if temporary:
+            os.remove(temporary)
+
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"❌ {line}")
+        if regressions:
+            return 1
+        print("✅ No regression")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,12 +9,34 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
     DEBUG = False
+    # Cache des réponses GET (LRU en mémoire + backend SQLite partagé optionnel)
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 60))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    RESPONSE_CACHE_SHARED_PATH = os.getenv('RESPONSE_CACHE_SHARED_PATH')
+    RESPONSE_CACHE_SHARED_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_SHARED_MAX_ENTRIES', 10000))
+    # Cache du JSON encodé de chaque entité, clé (modèle, id, updated_at)
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_MAX_ENTRIES = int(os.getenv('FRAGMENT_CACHE_MAX_ENTRIES', 10000))
+    # Index des équipements (facettes) construit au démarrage, puis tenu à jour par change_log
+    AMENITY_INDEX_EAGER = True
+    # Métriques Prometheus sur /metrics (aucun hook enregistré si désactivé).
+    # /metrics n'est pas authentifié : à n'activer que derrière un réseau privé
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '0') == '1'
+    # bcrypt dans un pool de processus borné (calibrer avec flask calibrate-bcrypt)
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', 16))
+    # Claims des JWT déjà vérifiés, clé = empreinte du jeton, jamais servis après exp
+    JWT_CLAIMS_CACHE_ENABLED = True
+    JWT_CLAIMS_CACHE_MAX_ENTRIES = int(os.getenv('JWT_CLAIMS_CACHE_MAX_ENTRIES', 10000))
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 10))
 
 
 class ProductionConfig(Config):
@@ -30,6 +52,15 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    RESPONSE_CACHE_ENABLED = False
+    METRICS_ENABLED = False
+    AMENITY_INDEX_EAGER = False
+    # bcrypt au coût minimal, calculé dans le thread du test
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    # Échec d'une requête au-delà du budget SQL déclaré ou en cas de N+1
+    QUERY_BUDGET_ENABLED = True
+    QUERY_REPEAT_LIMIT = 3
 
 
 config = {
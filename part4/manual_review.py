@@ -1,16 +1,15 @@
 import unittest
 import requests
 import sqlite3
-from flask_bcrypt import Bcrypt
+import bcrypt
 import uuid
 from datetime import datetime
 
 conn = sqlite3.connect('./instance/development.db')
 cursor = conn.cursor()
-bcrypt = Bcrypt()
 
 user_id = str(uuid.uuid4())
-password = bcrypt.generate_password_hash('adminpassword').decode('utf-8')
+password = bcrypt.hashpw(b'adminpassword', bcrypt.gensalt()).decode('utf-8')
 now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
 user = (user_id, 'Julien', 'Monte', 'julien.monte@gmail.com', password, 1, now, now)
@@ -5,13 +5,33 @@ Script COMPLET pour créer toutes les données de test :
 - Places avec images
 - Équipements (amenities)
 - Avis (reviews)
+
+Sans argument : les 5 places de démonstration ci-dessous.
+Avec des arguments : générateur de gros volumes, déterministe pour une graine :
+
+    python set_up_data.py --users 100000 --places 1000000 --reviews-per-place zipf --seed 42 --reset
 """
 
-from app import create_app, db
+import argparse
+import bisect
+import itertools
+import operator
+from datetime import datetime, timedelta
+import random
+import sys
+import time
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+from app import create_app, db, password_hasher
 from app.models.user import User
-from app.models.place import Place
+from app.models.place import Place, PLACES_FTS_TRIGGERS
 from app.models.amenity import Amenity
+from app.models.amenities_places import AmenityPlace
 from app.models.review import Review
+from app.persistence.unit_of_work import transaction
+from app.services import facade
+from app.services.geo import encode_geohash
+import config
 
 # Configuration
 PLACES_DATA = [
@@ -195,15 +215,15 @@ def create_places_with_data(app):
     with app.app_context():
         # ✅ Récupère les users DEPUIS LA DB (pas depuis un paramètre)
         owner = User.query.filter_by(email='test@hbnb.com').first()
-        reviewer = User.query.filter_by(email='marie@hbnb.com').first()
+        # Un auteur différent par avis d'une place (un seul avis par utilisateur et par place)
+        reviewers = [user for user in (User.query.filter_by(email=email).first()
+                                       for email in ('marie@hbnb.com', 'admin@hbnb.com'))
+                     if user is not None]
         
         if not owner:
             print("❌ Utilisateur propriétaire non trouvé")
             return
         
-        if not reviewer:
-            reviewer = owner  # Fallback si Marie n'existe pas
-        
         created_places = []
         
         for i, place_data in enumerate(PLACES_DATA, 1):
@@ -240,15 +260,10 @@ def create_places_with_data(app):
                 db.session.commit()
                 
                 # Ajoute les avis
-                for review_data in place_data.get('reviews', []):
-                    review = Review(
-                        text=review_data['comment'],
-                        rating=review_data['rating'],
-                        place=place,      # ✅ Passe l'objet place complet
-                        user=reviewer     # ✅ Passe l'objet user complet
-                    )
-                    
-                    db.session.add(review)
+                for reviewer, review_data in zip(reviewers, place_data.get('reviews', [])):
+                    # Via la façade : agrégats de notes de la place mis à jour
+                    facade.create_review({'text': review_data['comment'], 'rating': review_data['rating'],
+                                          'place_id': place.id}, reviewer.id)
                     print(f"      ⭐ Avis ajouté: {review_data['rating']}/5")
                 
                 db.session.commit()
@@ -304,6 +319,276 @@ def display_summary(app):
         print()
 
 
+# ========================================
+# GÉNÉRATEUR DE GROS VOLUMES
+# ========================================
+# Insertions Core par lots (une transaction par lot), un seul hachage
+# bcrypt partagé par tous les comptes générés, agrégats d'avis et géohash
+# calculés à la génération. Les triggers FTS sont retirés pendant le
+# chargement puis l'index est reconstruit en une passe.
+
+GENERATED_ADMIN_EMAIL = 'admin@generated.hbnb.io'
+GENERATED_PASSWORD = 'Generated1234!'
+GENERATED_CHUNK_SIZE = 10000
+# Chargement SQLite : pas de fsync à chaque lot, index gardés en mémoire
+LOAD_PRAGMAS = ("PRAGMA synchronous = OFF", "PRAGMA cache_size = -262144")
+
+# (ville, latitude, longitude, poids, dispersion en km)
+CITIES = [
+    ("Paris", 48.8566, 2.3522, 10.0, 8.0),
+    ("Bordeaux", 44.8378, -0.5792, 5.0, 6.0),
+    ("Toulouse", 43.6047, 1.4442, 5.0, 6.0),
+    ("La Rochelle", 46.1603, -1.1511, 2.5, 3.0),
+    ("Arcachon", 44.6534, -1.1659, 2.0, 3.0),
+    ("Biarritz", 43.4832, -1.5586, 2.0, 3.0),
+    ("Limoges", 45.8336, 1.2611, 1.5, 4.0),
+    ("Pau", 43.2951, -0.3708, 1.0, 3.0),
+    ("Agen", 44.2034, 0.6164, 1.0, 3.0),
+]
+# Types de logement : (poids, prix de base par nuit, probabilité de chaque équipement)
+PLACE_KINDS = {
+    "Appartement": (5.0, 70.0, {"WiFi": .95, "TV": .8, "Cuisine équipée": .85, "Balcon": .5,
+                                "Lave-linge": .6, "Lave-vaisselle": .4, "Climatisation": .3, "Parking": .3}),
+    "Studio": (3.0, 50.0, {"WiFi": .95, "TV": .6, "Cuisine équipée": .7, "Climatisation": .3}),
+    "Maison": (3.0, 100.0, {"WiFi": .9, "Parking": .85, "Jardin": .75, "Barbecue": .5, "TV": .7,
+                            "Cuisine équipée": .9, "Lave-linge": .8, "Lave-vaisselle": .6}),
+    "Villa": (1.0, 220.0, {"WiFi": .95, "Piscine": .7, "Jardin": .9, "Parking": .9, "Climatisation": .7,
+                           "Barbecue": .6, "Lave-vaisselle": .9, "Lave-linge": .9}),
+    "Chalet": (0.5, 120.0, {"WiFi": .7, "Parking": .8, "Cuisine équipée": .9, "Balcon": .6, "TV": .5}),
+}
+AMENITY_NAMES = ["WiFi", "Parking", "TV", "Cuisine équipée", "Jardin", "Barbecue", "Balcon",
+                 "Climatisation", "Lave-linge", "Lave-vaisselle", "Piscine"]
+FIRST_NAMES = ["Jean", "Marie", "Lucas", "Emma", "Hugo", "Léa", "Louis", "Chloé", "Julien", "Camille"]
+LAST_NAMES = ["Dupont", "Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy"]
+REVIEW_TEXTS = [(5, "Super séjour, je recommande vivement !"), (5, "Logement parfait, hôte très accueillant."),
+                (4, "Très bien situé, propre et confortable."), (4, "Bon rapport qualité/prix."),
+                (3, "Correct mais un peu bruyant la nuit."), (2, "Décevant par rapport aux photos."),
+                (1, "Logement sale, à éviter.")]
+# Poids des notes : la plupart des avis sont positifs
+RATING_WEIGHTS = [0.04, 0.06, 0.15, 0.35, 0.40]
+ZIPF_EXPONENT = 2.0
+ZIPF_MAX_REVIEWS = 500
+# Bits de version (4) et de variante (RFC 4122) d'un UUID aléatoire
+UUID4_CLEAR = ~((0xf000 << 64) | (0xc000 << 48)) & ((1 << 128) - 1)
+UUID4_SET = (0x4000 << 64) | (0x8000 << 48)
+
+
+def reviews_per_place_sampler(spec, rng, max_reviews):
+    """Return a function drawing the number of reviews of one place
+
+    spec is a fixed count, or 'zipf' for P(k) ∝ 1/(k+1)^s: most places
+    have few reviews, a handful have hundreds.
+    """
+    if spec != 'zipf':
+        count = int(spec)
+        if count < 0 or count > max_reviews:
+            raise ValueError(f"reviews per place must be between 0 and {max_reviews}")
+        return lambda: count
+    upper = min(ZIPF_MAX_REVIEWS, max_reviews)
+    cumulative, total = [], 0.0
+    for k in range(upper + 1):
+        total += 1 / (k + 1) ** ZIPF_EXPONENT
+        cumulative.append(total)
+    return lambda: bisect.bisect_left(cumulative, rng.random() * total)
+
+
+def random_uuid(rng):
+    """Same string as str(uuid.UUID(int=rng.getrandbits(128), version=4)), several times faster"""
+    value = rng.getrandbits(128) & UUID4_CLEAR | UUID4_SET
+    digits = '%032x' % value
+    return f'{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}'
+
+
+def bulk_inserter(table, columns, chunk_size):
+    """Return insert(rows), an executemany of tuples in `columns` order, one transaction per chunk
+
+    The INSERT is compiled once by Core and the tuples go straight to the
+    driver: no per-value processing, which dominates at millions of rows.
+    """
+    pragmas = LOAD_PRAGMAS if db.engine.dialect.name == 'sqlite' else ()
+    compiled = table.insert().compile(dialect=db.engine.dialect, column_keys=list(columns))
+    statement = str(compiled)
+    if compiled.positional:
+        order = [columns.index(name) for name in compiled.positiontup]
+        convert = (lambda row: row) if order == list(range(len(columns))) else operator.itemgetter(*order)
+    else:
+        convert = lambda row: dict(zip(columns, row))
+
+    def insert(rows):
+        for offset in range(0, len(rows), chunk_size):
+            with transaction():
+                connection = db.session.connection()
+                for pragma in pragmas:
+                    connection.exec_driver_sql(pragma)
+                connection.exec_driver_sql(statement, [convert(row) for row in rows[offset:offset + chunk_size]])
+    return insert
+
+
+def generate(users, places, reviews_per_place='zipf', amenities=len(AMENITY_NAMES), seed=0,
+             chunk_size=GENERATED_CHUNK_SIZE, progress=None):
+    """Insert a synthetic dataset in the database of the current app
+
+    The same seed always gives the same ids, names, places and reviews.
+    The accounts are user<i>@generated.hbnb.io and GENERATED_ADMIN_EMAIL,
+    all with GENERATED_PASSWORD. Return the number of reviews inserted.
+    """
+    # Tout est vérifié avant de toucher aux index : une erreur ici laisse la base intacte
+    if users < 0 or places < 0 or amenities < 0:
+        raise ValueError("users, places and amenities must be positive")
+    if places and users < 2:
+        raise ValueError("At least 2 users are needed to review places")
+    rng = random.Random(seed)
+    draw_reviews = reviews_per_place_sampler(reviews_per_place, rng, users - 1) if places else None
+    new_id = lambda: random_uuid(rng)
+    sqlite = db.engine.dialect.name == 'sqlite'
+    # Valeurs brutes pour le pilote : SQLite stocke les dates en texte, au format de SQLAlchemy
+    stamp = (lambda value: value.isoformat(' ', 'microseconds')) if sqlite else (lambda value: value)
+    start = datetime(2024, 1, 1)
+    report = progress or (lambda message: None)
+    # Un seul bcrypt pour tous les comptes
+    password = password_hasher.hash(GENERATED_PASSWORD)
+
+    # Index secondaires reconstruits en une fois à la fin : bien plus rapide
+    # que de les tenir à jour ligne par ligne
+    indexes = [index for model in (User, Place, AmenityPlace, Review) for index in model.__table__.indexes]
+    review_count = 0
+    try:
+        for index in indexes:
+            db.session.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        db.session.commit()
+        if sqlite:
+            # Réindexation en une passe à la fin plutôt qu'un trigger par ligne
+            for trigger in PLACES_FTS_TRIGGERS:
+                db.session.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            db.session.commit()
+
+        user_columns = ('id', 'first_name', 'last_name', 'email', 'password', 'is_admin', 'created_at', 'updated_at')
+        insert_users = bulk_inserter(User.__table__, user_columns, chunk_size)
+        insert_users([(new_id(), 'Admin', 'Generated', GENERATED_ADMIN_EMAIL, password, True,
+                       stamp(start), stamp(start))])
+        user_ids = []
+        for offset in range(0, users, chunk_size):
+            rows = []
+            for i in range(offset, min(users, offset + chunk_size)):
+                created = stamp(start + timedelta(seconds=i))
+                rows.append((new_id(), rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), f'user{i}@generated.hbnb.io',
+                             password, False, created, created))
+            insert_users(rows)
+            user_ids += [row[0] for row in rows]
+        report(f"👥 {users} utilisateurs")
+
+        names = [AMENITY_NAMES[i] if i < len(AMENITY_NAMES)
+                 else f"{AMENITY_NAMES[i % len(AMENITY_NAMES)]} {i // len(AMENITY_NAMES) + 1}" for i in range(amenities)]
+        amenity_ids = {name: new_id() for name in names}
+        bulk_inserter(Amenity.__table__, ('id', 'name', 'created_at', 'updated_at'), chunk_size)(
+            [(amenity_id, name, stamp(start), stamp(start)) for name, amenity_id in amenity_ids.items()])
+        extra_amenities = list(amenity_ids.values())[len(AMENITY_NAMES):]
+        report(f"🛠️  {amenities} équipements")
+
+        cities, kinds = CITIES, list(PLACE_KINDS)
+        city_weights = list(itertools.accumulate(weight for _, _, _, weight, _ in cities))
+        kind_weights = list(itertools.accumulate(PLACE_KINDS[kind][0] for kind in kinds))
+        rating_weights = list(itertools.accumulate(RATING_WEIGHTS))
+        texts = {rating: [text_ for stars, text_ in REVIEW_TEXTS if stars == rating] for rating in range(1, 6)}
+        mixes = {kind: [(amenity_ids[name], probability) for name, probability in mix.items() if name in amenity_ids]
+                 for kind, (_, _, mix) in PLACE_KINDS.items()}
+        rating_columns = [f'rating_{rating}_count' for rating in range(1, 6)]
+        insert_places = bulk_inserter(Place.__table__, (
+            'id', 'title', 'description', 'price', 'latitude', 'longitude', 'geohash', 'user_id',
+            'created_at', 'updated_at', 'review_count', 'rating_sum', *rating_columns), chunk_size)
+        insert_links = bulk_inserter(AmenityPlace.__table__, ('place_id', 'amenity_id'), chunk_size)
+        insert_reviews = bulk_inserter(Review.__table__, (
+            'id', 'text', 'rating', 'place_id', 'user_id', 'created_at', 'updated_at'), chunk_size)
+
+        for offset in range(0, places, chunk_size):
+            place_rows, link_rows, review_rows = [], [], []
+            for i in range(offset, min(places, offset + chunk_size)):
+                city, lat, lon, _, spread_km = cities[bisect.bisect(city_weights, rng.random() * city_weights[-1])]
+                kind = kinds[bisect.bisect(kind_weights, rng.random() * kind_weights[-1])]
+                lat = round(lat + rng.gauss(0, spread_km / 111.32), 6)
+                lon = round(lon + rng.gauss(0, spread_km / 78.0), 6)
+                place_id = new_id()
+                created = start + timedelta(seconds=30 * i)
+                owner = rng.randrange(len(user_ids))
+                for amenity_id, probability in mixes[kind]:
+                    if rng.random() < probability:
+                        link_rows.append((place_id, amenity_id))
+                if extra_amenities and rng.random() < 0.2:
+                    link_rows.append((place_id, rng.choice(extra_amenities)))
+
+                counts = [0] * 5
+                count = draw_reviews()
+                if count:
+                    reviewers = rng.sample(range(len(user_ids)), count + 1)
+                    if owner in reviewers:
+                        reviewers.remove(owner)
+                    for reviewer in reviewers[:count]:
+                        rating = bisect.bisect(rating_weights, rng.random() * rating_weights[-1]) + 1
+                        counts[rating - 1] += 1
+                        review_date = stamp(created + timedelta(days=rng.randint(1, 365)))
+                        review_rows.append((new_id(), rng.choice(texts[rating]), rating, place_id,
+                                            user_ids[reviewer], review_date, review_date))
+                created = stamp(created)
+                place_rows.append((place_id, f"{kind} à {city}", f"{kind} à {city}, logement n°{i + 1}",
+                                   round(PLACE_KINDS[kind][1] * rng.lognormvariate(0, 0.35), 2),
+                                   lat, lon, encode_geohash(lat, lon), user_ids[owner],
+                                   created, created, count,
+                                   sum(rating * n for rating, n in enumerate(counts, 1)), *counts))
+            insert_places(place_rows)
+            insert_links(link_rows)
+            insert_reviews(review_rows)
+            review_count += len(review_rows)
+            report(f"🏠 {offset + len(place_rows)}/{places} places, {review_count} avis")
+    finally:
+        db.session.rollback()
+        for index in indexes:
+            db.session.execute(CreateIndex(index, if_not_exists=True))
+        db.session.commit()
+        if sqlite:
+            facade.place_repo.rebuild_search_index()
+    return review_count
+
+
+def generate_main(argv):
+    """Command line of the generator"""
+    parser = argparse.ArgumentParser(description="Generate a large synthetic HBnB dataset")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--reviews-per-place', default='zipf',
+                        help="Number of reviews of each place, or 'zipf' (default)")
+    parser.add_argument('--amenities', type=int, default=len(AMENITY_NAMES))
+    parser.add_argument('--seed', type=int, default=0, help='Same seed, same data')
+    parser.add_argument('--chunk-size', type=int, default=GENERATED_CHUNK_SIZE,
+                        help='Rows per INSERT transaction')
+    parser.add_argument('--database-uri', help='Target database (default: the development database)')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate every table first')
+    args = parser.parse_args(argv)
+
+    config_class = config.DevelopmentConfig
+    if args.database_uri:
+        config_class = type('GeneratorConfig', (config.DevelopmentConfig,),
+                            {'SQLALCHEMY_DATABASE_URI': args.database_uri})
+    app = create_app(config_class)
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        if User.query.filter_by(email=GENERATED_ADMIN_EMAIL).first():
+            print("❌ Des données générées existent déjà, relancer avec --reset")
+            return 1
+        started = time.perf_counter()
+        try:
+            generate(args.users, args.places, args.reviews_per_place, args.amenities, args.seed,
+                     args.chunk_size, progress=lambda message: print(f"   {message}"))
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Données générées en {time.perf_counter() - started:.1f}s")
+        print(f"   Email admin: {GENERATED_ADMIN_EMAIL}")
+        print(f"   Password: {GENERATED_PASSWORD}")
+    return 0
+
+
 def main():
     """
     Fonction principale
@@ -353,4 +638,6 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(generate_main(sys.argv[1:]))
     main()